@@ -0,0 +1,147 @@
+"""
+bilgi_bankasi.py — Veri.xlsx (bitki bilgileri) ve verimler.xls (geçmiş verimler) bilgi bankası.
+
+Yan etkisiz modül: LLM istemcisi, API anahtarı veya önbellek dosyası yoktur. RAG, gömme ve
+yönlendirici modülleri TarimBilgiBankasi'ni buradan alır; dataset_olusturucu da yeniden dışa aktarır.
+Kaynak dosya yoksa / okunamazsa FileNotFoundError / ValueError fırlatılır.
+
+    db = TarimBilgiBankasi(VERI_DOSYASI_PATH, VERIM_DOSYASI_PATH)
+"""
+
+import os
+import re
+import random
+
+import pandas as pd
+
+import bilgi_snapshot
+from verim_ayristirici import verim_tablosu_ayristir, verim_sozlugu
+from turkce import tr_kucuk
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VERI_DOSYASI_PATH = os.path.join(BASE_DIR, "Veri.xlsx")
+VERIM_DOSYASI_PATH = os.path.join(BASE_DIR, "verimler.xls")
+
+
+class TarimBilgiBankasi:
+    SNAPSHOT_SURUM = 4  # Ayrıştırma mantığı değişince artırın
+
+    def __init__(self, veri_path, verim_path, snapshot_path=None):
+        # Excel ayrıştırması yalnızca kaynaklar değiştiğinde yapılır (bilgi_snapshot.py)
+        snapshot_path = snapshot_path or os.path.join(os.path.dirname(os.path.abspath(veri_path)),
+                                                      "tarim_bilgi.snapshot.pkl")
+        durum = bilgi_snapshot.yukle_veya_derle(
+            [veri_path, verim_path], lambda: self._derle(veri_path, verim_path),
+            snapshot_path, surum=self.SNAPSHOT_SURUM)
+        self.bitki_bilgileri = durum["bitki_bilgileri"]
+        self.gecmis_verimler = durum["gecmis_verimler"]
+        self.verim_tablosu = durum["verim_tablosu"]
+        self._indeks_kur()
+
+    def _indeks_kur(self):
+        """
+        Yükleme anında bir kez kurulan indeksler (Türkçe küçük harfli anahtarlar):
+          bitki_indeksi: tam isim -> bilgiler
+          tur_cesitleri: tür -> [tam isimler]
+          tur_verimleri: tür -> {yıl: verim} (eşleşen ilk geçmiş verim serisi)
+        """
+        self._bitki_listesi = list(self.bitki_bilgileri.values())
+        self.bitki_indeksi = {tr_kucuk(ad): b for ad, b in self.bitki_bilgileri.items()}
+        self.tur_cesitleri = {}
+        for b in self._bitki_listesi:
+            self.tur_cesitleri.setdefault(tr_kucuk(b["tur"]), []).append(b["tam_isim"])
+
+        # Eski doğrusal taramayla aynı kural: tür adı ürün adının içinde ya da tersi, ilk eşleşme
+        urunler = [(tr_kucuk(k), v) for k, v in self.gecmis_verimler.items()]
+        self.tur_verimleri = {}
+        for tur in self.tur_cesitleri:
+            self.tur_verimleri[tur] = next((v for k, v in urunler if tur in k or k in tur), {})
+
+    def bitki_getir(self, ad):
+        """Tam isme göre (büyük/küçük harf duyarsız) bitki bilgisi veya None."""
+        return self.bitki_indeksi.get(tr_kucuk(ad))
+
+    def verim_getir(self, tur):
+        """Türün geçmiş yıl verimleri {yıl: verim}; bilinmiyorsa {}."""
+        return self.tur_verimleri.get(tr_kucuk(tur), {})
+
+    def verim_getir_toplu(self, turler):
+        return [self.verim_getir(t) for t in turler]
+
+    def _derle(self, veri_path, verim_path):
+        self.veri_df = self._dosya_oku_robust(veri_path)
+        self.verim_df = self._dosya_oku_robust(verim_path, header=None)  # Hiyerarşik okuma için header yok
+        self.bitki_bilgileri = {}
+        self.gecmis_verimler = {}
+        self._verileri_islee()
+        self._verimleri_isle()
+        return {"bitki_bilgileri": self.bitki_bilgileri, "gecmis_verimler": self.gecmis_verimler,
+                "verim_tablosu": self.verim_tablosu}
+
+    def _dosya_oku_robust(self, path, header=0):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"'{path}' dosyası bulunamadı!")
+        _, ext = os.path.splitext(path)
+        try:
+            if ext.lower() in ['.xls', '.xlsx']:
+                return pd.read_excel(path, header=header)
+            return pd.read_csv(path, sep=None, engine='python', header=header)
+        except Exception as e:
+            raise ValueError(f"Dosya okuma hatası ({path}): {e}") from e
+
+    def _temizle_sayisal_aralik(self, deger):
+        if pd.isna(deger) or str(deger).strip() == "": return None
+        deger = str(deger).strip().replace(" mm", "").replace(" C", "")
+        aralik_match = re.match(r"(\d+)-(\d+)", deger)
+        if aralik_match: return {"min": float(aralik_match.group(1)), "max": float(aralik_match.group(2))}
+        sayi_match = re.match(r"(\d+)", deger)
+        if sayi_match: return {"min": float(sayi_match.group(1)), "max": float(sayi_match.group(1))}
+        return deger
+
+    def _verileri_islee(self):
+        parametreler = self.veri_df.iloc[:, 0].fillna("Bilinmiyor").tolist()
+        bitki_isimleri = self.veri_df.columns[1:]
+
+        for bitki in bitki_isimleri:
+            bilgiler = {}
+            col_data = self.veri_df[bitki].tolist()
+            for i, param in enumerate(parametreler):
+                if i >= len(col_data): break
+
+                raw_val = col_data[i]
+                clean_val = self._temizle_sayisal_aralik(raw_val)
+                key = str(param).strip().lower()
+
+                if "ideal sıcaklık" in key:
+                    key = "ideal_sicaklik"
+                elif "ekim yapılan gün" in key:
+                    key = "ekim_zamani"
+                elif "ürün miktarı" in key:
+                    key = "tohum_miktari"
+                elif "yağış miktarı" in key:
+                    key = "yagis_ihtiyaci"
+
+                if clean_val: bilgiler[key] = clean_val
+                # Tarih aralıkları ("16 kasım-15 aralık") sayıya indirgenince anlamını yitirir: ham metin de saklanır
+                if key in ("ekim_zamani", "hasat yapılan gün") and not pd.isna(raw_val) and str(raw_val).strip():
+                    bilgiler["ekim_zamani_metin" if key == "ekim_zamani" else "hasat_zamani_metin"] = \
+                        str(raw_val).strip()
+
+            ana_isim = bitki.split("-")[0].strip() if "-" in str(bitki) else str(bitki).strip()
+            bilgiler["tam_isim"] = bitki
+            bilgiler["tur"] = ana_isim
+            self.bitki_bilgileri[bitki] = bilgiler
+
+    def _verimleri_isle(self):
+        # Hiyerarşik okuma: "Kg/Dekar" başlık satırı ürünü belirler, alt satırlar yıl/verim taşır.
+        # Ayrıştırma vektörel (verim_ayristirici.py); düzenli tablo da saklanır.
+        print("Geçmiş verim verileri işleniyor...")
+        urunler, self.verim_tablosu = verim_tablosu_ayristir(self.verim_df)
+        self.gecmis_verimler = verim_sozlugu(urunler, self.verim_tablosu)
+
+    def bitki_getir_random(self):
+        return random.choice(self._bitki_listesi)
+
+    def bitki_getir_random_toplu(self, n):
+        """n adet rastgele bitki (iadeli örnekleme)."""
+        return random.choices(self._bitki_listesi, k=n)
@@ -0,0 +1,93 @@
+"""
+bilgi_snapshot.py — TarimBilgiBankasi için derlenmiş (pickle) bilgi bankası snapshot'ı.
+
+Veri.xlsx / verimler.xls her başlangıçta pandas + openpyxl/xlrd ile yeniden
+ayrıştırılmaz: ilk derlemenin sonucu (bitki_bilgileri, verim tabloları) tek bir
+pickle dosyasına yazılır. Geçerlilik kontrolü:
+  1) kaynak dosyaların boyutu + mtime'ı aynıysa -> doğrudan yükle (hash yok, hızlı yol)
+  2) mtime değişmiş ama SHA-256 aynıysa -> yükle, meta güncellenir
+  3) aksi halde -> yeniden derle
+Ayrıştırma mantığı değişirse sınıfın SNAPSHOT_SURUM'u artırılmalıdır.
+"""
+
+import os
+import pickle
+import hashlib
+
+BICIM = 1  # Snapshot dosya biçimi
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for parca in iter(lambda: f.read(1 << 20), b""):
+            h.update(parca)
+    return h.hexdigest()
+
+
+def _imza(path, hash_hesapla=True):
+    st = os.stat(path)
+    return {
+        "boyut": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": _sha256(path) if hash_hesapla else None,
+    }
+
+
+def _gecerli_mi(meta, kaynaklar, surum):
+    """(geçerli_mi, meta_güncellenmeli_mi)"""
+    if meta.get("bicim") != BICIM or meta.get("surum") != surum:
+        return False, False
+    kayitli = meta.get("kaynaklar", {})
+    if sorted(kayitli) != sorted(os.path.abspath(p) for p in kaynaklar):
+        return False, False
+    guncelle = False
+    for path in kaynaklar:
+        eski = kayitli[os.path.abspath(path)]
+        st = os.stat(path)
+        if st.st_size != eski["boyut"]:
+            return False, False
+        if st.st_mtime_ns != eski["mtime_ns"]:
+            # Dosyaya dokunulmuş (kopyalama, checkout); içerik aynı olabilir
+            if _sha256(path) != eski["sha256"]:
+                return False, False
+            guncelle = True
+    return True, guncelle
+
+
+def _yaz(snapshot_path, meta, durum):
+    gecici = f"{snapshot_path}.tmp"
+    with open(gecici, "wb") as f:
+        pickle.dump({"meta": meta, "durum": durum}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(gecici, snapshot_path)  # Yarım yazılmış snapshot asla okunmaz
+
+
+def yukle_veya_derle(kaynaklar, derle, snapshot_path, surum=1):
+    """
+    Geçerli snapshot varsa içindeki durumu döndürür; yoksa derle() çağrılır,
+    sonucu (pickle edilebilir dict) snapshot'a yazılır ve döndürülür.
+    """
+    if os.path.exists(snapshot_path):
+        try:
+            with open(snapshot_path, "rb") as f:
+                veri = pickle.load(f)
+            gecerli, guncelle = _gecerli_mi(veri["meta"], kaynaklar, surum)
+            if gecerli:
+                if guncelle:
+                    veri["meta"]["kaynaklar"] = {os.path.abspath(p): _imza(p) for p in kaynaklar}
+                    _yaz(snapshot_path, veri["meta"], veri["durum"])
+                return veri["durum"]
+        except Exception as e:
+            print(f"Snapshot okunamadı, yeniden derleniyor ({snapshot_path}): {e}")
+
+    durum = derle()
+    meta = {
+        "bicim": BICIM,
+        "surum": surum,
+        "kaynaklar": {os.path.abspath(p): _imza(p) for p in kaynaklar},
+    }
+    try:
+        _yaz(snapshot_path, meta, durum)
+    except OSError as e:
+        print(f"UYARI: Snapshot yazılamadı ({snapshot_path}): {e}")
+    return durum
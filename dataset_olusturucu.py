@@ -1,11 +1,17 @@
-import json
 import random
-import time
 import datetime
 import os
 import sys
-import re
-import requests
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import hiz_limiti
+import http_istemci
+from hava_onbellek import HavaSerisiDeposu
+from kontrol_noktasi import KontrolNoktasi, satir_anahtari
+from disk_onbellek import DiskLRU, icerik_anahtari
+from bilgi_bankasi import TarimBilgiBankasi, VERI_DOSYASI_PATH, VERIM_DOSYASI_PATH
 
 # --- ZAI CLIENT ENTEGRASYONU ---
 try:
@@ -39,120 +45,45 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # --- AYARLAR ---
 CIKTI_DOSYASI = os.path.join(BASE_DIR, "gercek_api_egitim_verisi_ai.jsonl")
 HEDEF_VERI_SAYISI = 5000
-BEKLEME_SURESI = 0.5
+KONTROL_NOKTASI_BATCH = 10  # Çökmede kaybedilecek en fazla AI cevabı
+PARALEL_URETIM = True  # False: eski tek tek üretim döngüsü
+LLM_PARALEL = 8  # Aynı anda uçuşta olan en fazla LLM çağrısı
+LLM_MODEL = "glm-4.6v-flash"
+# Sabit bekleme yerine Open-Meteo ve ZAI için ayrı token bucket'lar (hiz_limiti.py)
 
-# Dosya Yolları
-VERI_DOSYASI_PATH = os.path.join(BASE_DIR, "Veri.xlsx")
-VERIM_DOSYASI_PATH = os.path.join(BASE_DIR, "verimler.xls")
+# Dosya Yolları (Veri.xlsx / verimler.xls yolları bilgi_bankasi.py'de)
 GRID_DOSYASI_PATH = os.path.join(BASE_DIR, "grid_urfa_genis.csv")
 
+# Open-Meteo günlük serileri karo başına bir kez çekilir (hava_onbellek.py)
+HAVA_DEPOSU = HavaSerisiDeposu(os.path.join(BASE_DIR, "weather_cache"))
 
-# --- TARIM KÜTÜPHANESİ ---
-class TarimBilgiBankasi:
-    def __init__(self, veri_path, verim_path):
-        self.veri_df = self._dosya_oku_robust(veri_path)
-        self.verim_df = self._dosya_oku_robust(verim_path, header=None)  # Hiyerarşik okuma için header yok
-        self.bitki_bilgileri = {}
-        self.gecmis_verimler = {}
-        self._verileri_islee()
-        self._verimleri_isle()
-
-    def _dosya_oku_robust(self, path, header=0):
-        if not os.path.exists(path):
-            print(f"HATA: '{path}' dosyası bulunamadı!")
-            sys.exit(1)
-        _, ext = os.path.splitext(path)
-        try:
-            if ext.lower() in ['.xls', '.xlsx']:
-                return pd.read_excel(path, header=header)
-            return pd.read_csv(path, sep=None, engine='python', header=header)
-        except Exception as e:
-            print(f"Dosya okuma hatası ({path}): {e}")
-            sys.exit(1)
-
-    def _temizle_sayisal_aralik(self, deger):
-        if pd.isna(deger) or str(deger).strip() == "": return None
-        deger = str(deger).strip().replace(" mm", "").replace(" C", "")
-        aralik_match = re.match(r"(\d+)-(\d+)", deger)
-        if aralik_match: return {"min": float(aralik_match.group(1)), "max": float(aralik_match.group(2))}
-        sayi_match = re.match(r"(\d+)", deger)
-        if sayi_match: return {"min": float(sayi_match.group(1)), "max": float(sayi_match.group(1))}
-        return deger
-
-    def _verileri_islee(self):
-        parametreler = self.veri_df.iloc[:, 0].fillna("Bilinmiyor").tolist()
-        bitki_isimleri = self.veri_df.columns[1:]
-
-        for bitki in bitki_isimleri:
-            bilgiler = {}
-            col_data = self.veri_df[bitki].tolist()
-            for i, param in enumerate(parametreler):
-                if i >= len(col_data): break
-
-                raw_val = col_data[i]
-                clean_val = self._temizle_sayisal_aralik(raw_val)
-                key = str(param).strip().lower()
-
-                if "ideal sıcaklık" in key:
-                    key = "ideal_sicaklik"
-                elif "ekim yapılan gün" in key:
-                    key = "ekim_zamani"
-                elif "ürün miktarı" in key:
-                    key = "tohum_miktari"
-                elif "yağış miktarı" in key:
-                    key = "yagis_ihtiyaci"
-
-                if clean_val: bilgiler[key] = clean_val
-
-            ana_isim = bitki.split("-")[0].strip() if "-" in str(bitki) else str(bitki).strip()
-            bilgiler["tam_isim"] = bitki
-            bilgiler["tur"] = ana_isim
-            self.bitki_bilgileri[bitki] = bilgiler
-
-    def _verimleri_isle(self):
-        # Düzeltilmiş Hiyerarşik Okuma Mantığı
-        print("Geçmiş verim verileri işleniyor...")
-        current_urun = None
-
-        for index, row in self.verim_df.iterrows():
-            row_values = [str(x).strip() for x in row.values]
-            full_row_str = " ".join(row_values)
-
-            # Ürün Adı Bul
-            if "Kg/Dekar" in full_row_str:
-                match = re.search(r"\((.*?)\)", full_row_str)
-                if match:
-                    raw_name = match.group(1).split("(")[0].strip()
-                    current_urun = raw_name
-                else:
-                    current_urun = full_row_str.split("-")[0].strip()[:30]
-
-                if current_urun and current_urun not in self.gecmis_verimler:
-                    self.gecmis_verimler[current_urun] = {}
-
-            # Veri Bul
-            if current_urun:
-                yil = None
-                verim = None
-                for cell in row_values:
-                    try:
-                        val = float(cell)
-                        if 2010 < val < 2030 and val.is_integer():
-                            yil = int(val)
-                        elif val > 0 and val != yil:
-                            verim = val
-                    except:
-                        continue
+# Aynı (sistem prompt, soru) için LLM'e ikinci kez ödeme yapılmaz.
+# SQLite dosyası ilk LLM çağrısında açılır: TarimBilgiBankasi için import eden modüller dosya oluşturmaz.
+YANIT_ONBELLEGI_PATH = os.path.join(BASE_DIR, "llm_cache.sqlite")
+_yanit_onbellegi = None
+_yanit_onbellegi_kilit = threading.Lock()
 
-                if yil and verim:
-                    self.gecmis_verimler[current_urun][yil] = verim
 
-    def bitki_getir_random(self):
-        return self.bitki_bilgileri[random.choice(list(self.bitki_bilgileri.keys()))]
+def _yanit_onbellegi_al():
+    global _yanit_onbellegi
+    with _yanit_onbellegi_kilit:  # uret_paralel aynı anda çağırır: tek bağlantı açılsın
+        if _yanit_onbellegi is None:
+            _yanit_onbellegi = DiskLRU(YANIT_ONBELLEGI_PATH, max_mb=512)
+    return _yanit_onbellegi
 
 
 # --- HELPER FONKSİYONLAR ---
 def get_historical_weather(lat, lon, date_obj):
+    # Önce toplu seriden (karo başına tek istek); aralık dışı veya hata -> tek gün isteği
+    try:
+        gun = HAVA_DEPOSU.gun_degeri("open_meteo", lat, lon, date_obj)
+    except Exception:
+        gun = None
+    if gun and gun["temperature_2m_max"] is not None and gun["temperature_2m_min"] is not None:
+        mx, mn = round(gun["temperature_2m_max"], 1), round(gun["temperature_2m_min"], 1)
+        rain = round(gun["precipitation_sum"] or 0.0, 1)
+        return {"temp": round((mx + mn) / 2, 1), "rain": rain, "max": mx, "min": mn}
+
     date_str = date_obj.strftime("%Y-%m-%d")
     url = "https://archive-api.open-meteo.com/v1/archive"
     params = {
@@ -162,7 +93,7 @@ def get_historical_weather(lat, lon, date_obj):
         "timezone": "auto"
     }
     try:
-        r = requests.get(url, params=params, timeout=5)
+        r = hiz_limiti.istek("open_meteo", http_istemci.get, url, params=params, timeout=5)
         if r.status_code == 200:
             d = r.json().get("daily", {})
             if d.get("temperature_2m_max"):
@@ -177,7 +108,7 @@ def get_historical_weather(lat, lon, date_obj):
 
 
 # --- AI GENERATOR ---
-def generate_ai_response(soru, weather, target_date, bitki_bilgisi, gecmis_verimler):
+def generate_ai_response(soru, weather, target_date, bitki_bilgisi, gecmis_verimler, istemci=None):
     gecmis_text = ""
     if gecmis_verimler:
         gecmis_text = "BÖLGE GEÇMİŞ YIL VERİMLERİ (REFERANS):\n"
@@ -217,20 +148,177 @@ Markdown kullan. Eğer ekim/ilaçlama uygunsa cevabın sonuna şunu ekle:
 [GÖREV: <Eylem> | <Detay> | YYYY-MM-DD HH:MM]
 """
 
+    anahtar = icerik_anahtari(LLM_MODEL, system_prompt, soru)
+    onbellek = _yanit_onbellegi_al()
+    onbellekte = onbellek.al(anahtar)
+    if onbellekte is not None:
+        return onbellekte
+
+    istemci = istemci or client
     try:
-        response = client.chat.completions.create(
-            model="glm-4.6v-flash",
+        response = hiz_limiti.istek(
+            "zai", istemci.chat.completions.create,
+            model=LLM_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": soru}
             ]
         )
-        return response.choices[0].message.content
+        cevap = response.choices[0].message.content
+        if cevap:
+            onbellek.koy(anahtar, cevap)
+        return cevap
     except Exception as e:
         print(f"AI Hatası: {e}")
         return None
 
 
+# --- ÖRNEK HAZIRLAMA ---
+def _ornek_sec(db, grid_df):
+    """Rastgele (konum, tarih, bitki) seçer; kontrol noktası anahtarıyla birlikte döner."""
+    row = grid_df.sample(1).iloc[0]
+    lat, lon = row["lat"], row["lon"]
+
+    days_diff = (datetime.date(2024, 12, 1) - datetime.date(2020, 1, 1)).days
+    target_date = datetime.date(2020, 1, 1) + datetime.timedelta(days=random.randrange(days_diff))
+
+    bitki_bilgisi = db.bitki_getir_random()
+    return {
+        "anahtar": satir_anahtari(lat, lon, target_date.isoformat(), bitki_bilgisi["tam_isim"]),
+        "lat": lat, "lon": lon, "target_date": target_date, "bitki_bilgisi": bitki_bilgisi,
+    }
+
+
+def _ornek_tamamla(db, ornek):
+    """Hava durumu, geçmiş verim ve soruyu ekler. Hava verisi yoksa None."""
+    lat, lon, target_date = ornek["lat"], ornek["lon"], ornek["target_date"]
+    weather = get_historical_weather(lat, lon, target_date)
+    if not weather:
+        return None
+
+    bitki_adi = ornek["bitki_bilgisi"]["tam_isim"]
+
+    # Geçmiş Veri (indeksten, O(1))
+    gecmis_data = db.verim_getir(ornek["bitki_bilgisi"]["tur"])
+
+    # Soru
+    adres = "Şanlıurfa"
+    soru = f"{adres} konumunda tarlam var. Tarih {target_date.strftime('%d.%m.%Y')}. Geçen günlerde hava ortalama {weather['temp']}°C idi ve {weather['rain']}mm yağış düştü. {bitki_adi} ekimi için şartlar nasıldı?"
+
+    ornek.update({"weather": weather, "gecmis_data": gecmis_data, "adres": adres, "soru": soru})
+    return ornek
+
+
+def _veri_satiri(ornek, ai_cevap):
+    weather = ornek["weather"]
+    return {
+        "instruction": ornek["soru"],
+        "input": f"Lokasyon: {ornek['lat']},{ornek['lon']} ({ornek['adres']}) | Tarih: {ornek['target_date']} | Veri: Temp={weather['temp']}C, Rain={weather['rain']}mm",
+        "output": ai_cevap
+    }
+
+
+def _cevap_uret(ornek, istemci=None):
+    return generate_ai_response(ornek["soru"], ornek["weather"], ornek["target_date"],
+                                ornek["bitki_bilgisi"], ornek["gecmis_data"], istemci=istemci)
+
+
+# --- PARALEL ÜRETİM HATTI ---
+def uret_paralel(db, grid_df, cp, hedef, istemci=None, llm_paralel=LLM_PARALEL):
+    """
+    Üretici/tüketici hattı:
+      1) Hazırlık thread'i: örnek seçer, hava durumunu çeker, soruyu kurar
+      2) LLM havuzu: en fazla llm_paralel çağrı aynı anda uçuşta
+      3) Yazıcı (bu thread): cevapları sıra numarasına göre sıralı yazar, cp batch'ler halinde flush eder
+    Başarısız cevaplar yazılmaz ve kotaları iade edilir; böylece tam olarak 'hedef' satıra ulaşılır.
+    Yerel bir stub ZaiClient 'istemci' olarak verilerek test edilebilir (bkz. uretim_denemesi.py).
+    """
+    kalan = hedef - cp.satir_sayisi
+    if kalan <= 0:
+        return cp.satir_sayisi
+
+    kota = threading.Semaphore(kalan)  # Yazılmış + uçuştaki örnek sayısı hedefi aşmasın
+    ucusta = threading.BoundedSemaphore(llm_paralel)
+    hazir = queue.Queue(maxsize=llm_paralel * 2)
+    sonuclar = queue.Queue()
+    dur = threading.Event()
+    islenen_anahtarlar = set()  # Hattaki anahtarlar (aynı kombinasyon iki kez gönderilmesin)
+
+    def hazirla():
+        sira = 0
+        while not dur.is_set():
+            if not kota.acquire(timeout=0.5):
+                continue
+            try:
+                ornek = _ornek_sec(db, grid_df)
+                if cp.tamamlandi(ornek["anahtar"]) or ornek["anahtar"] in islenen_anahtarlar:
+                    kota.release()
+                    continue
+                if _ornek_tamamla(db, ornek) is None:
+                    kota.release()
+                    continue
+            except Exception as e:
+                print(f"Hazırlık hatası: {e}")
+                kota.release()
+                continue
+            islenen_anahtarlar.add(ornek["anahtar"])
+            ornek["sira"] = sira
+            sira += 1
+            while not dur.is_set():
+                try:
+                    hazir.put(ornek, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def llm_cagir(ornek):
+        try:
+            cevap = _cevap_uret(ornek, istemci)
+        except Exception as e:
+            print(f"AI Hatası: {e}")
+            cevap = None
+        finally:
+            ucusta.release()
+        sonuclar.put((ornek, cevap))
+
+    def dagit(havuz):
+        while not dur.is_set():
+            try:
+                ornek = hazir.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            ucusta.acquire()
+            havuz.submit(llm_cagir, ornek)
+
+    count = cp.satir_sayisi
+    bekleyen = {}  # sira -> (ornek, cevap); sırası gelmemiş sonuçlar
+    siradaki = 0
+    with ThreadPoolExecutor(max_workers=llm_paralel) as havuz:
+        uretici = threading.Thread(target=hazirla, daemon=True)
+        dagitici = threading.Thread(target=dagit, args=(havuz,), daemon=True)
+        uretici.start()
+        dagitici.start()
+        try:
+            while count < hedef:
+                ornek, cevap = sonuclar.get()
+                bekleyen[ornek["sira"]] = (ornek, cevap)
+                while siradaki in bekleyen:
+                    ornek, cevap = bekleyen.pop(siradaki)
+                    siradaki += 1
+                    islenen_anahtarlar.discard(ornek["anahtar"])
+                    if not cevap:
+                        kota.release()
+                        continue
+                    cp.ekle(ornek["anahtar"], _veri_satiri(ornek, cevap))
+                    count += 1
+                    print(f"[{count}/{hedef}] Yazıldı: {ornek['bitki_bilgisi']['tam_isim']} - {ornek['target_date']}")
+        finally:
+            dur.set()
+            uretici.join()
+            dagitici.join()
+    return count
+
+
 def main():
     print("Veritabanı yükleniyor...")
     if not os.path.exists(VERI_DOSYASI_PATH):
@@ -245,77 +333,54 @@ def main():
     db = TarimBilgiBankasi(VERI_DOSYASI_PATH, VERIM_DOSYASI_PATH)
 
     # --- DEVAM ETME MANTIĞI (RESUME LOGIC) ---
-    mevcut_satir_sayisi = 0
-    if os.path.exists(CIKTI_DOSYASI):
-        print(f"Mevcut dosya kontrol ediliyor: {CIKTI_DOSYASI}")
-        with open(CIKTI_DOSYASI, "r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip():  # Boş satırları sayma
-                    mevcut_satir_sayisi += 1
-        print(f"⚠️ Dosyada zaten {mevcut_satir_sayisi} satır veri var. Kaldığı yerden devam edilecek.")
-
-    if mevcut_satir_sayisi >= HEDEF_VERI_SAYISI:
-        print(f"Hedeflenen veri sayısına ({HEDEF_VERI_SAYISI}) zaten ulaşılmış. İşlem yapılmayacak.")
-        return
-
-    print(f"Veri Üretimi Başlıyor... Hedef: {HEDEF_VERI_SAYISI} (Kalan: {HEDEF_VERI_SAYISI - mevcut_satir_sayisi})")
-
-    # "a" (append) modu ile açıyoruz, üzerine eklemesi için.
-    with open(CIKTI_DOSYASI, "a", encoding="utf-8") as f:
+    # Satır saymak yerine kontrol noktası günlüğü: (lat, lon, tarih, bitki) anahtarları
+    # tutulur, önceden üretilmiş bir kombinasyon tekrar örneklenirse atlanır.
+    with KontrolNoktasi(CIKTI_DOSYASI, KONTROL_NOKTASI_BATCH) as cp:
+        mevcut_satir_sayisi = cp.satir_sayisi
+        if mevcut_satir_sayisi:
+            print(f"⚠️ Dosyada zaten {mevcut_satir_sayisi} satır veri var. Kaldığı yerden devam edilecek.")
+
+        if mevcut_satir_sayisi >= HEDEF_VERI_SAYISI:
+            print(f"Hedeflenen veri sayısına ({HEDEF_VERI_SAYISI}) zaten ulaşılmış. İşlem yapılmayacak.")
+            return
+
+        print(f"Veri Üretimi Başlıyor... Hedef: {HEDEF_VERI_SAYISI} (Kalan: {HEDEF_VERI_SAYISI - mevcut_satir_sayisi})")
         count = mevcut_satir_sayisi
 
+        if PARALEL_URETIM:
+            print(f"Paralel üretim: {LLM_PARALEL} LLM çağrısı aynı anda.")
+            count = uret_paralel(db, grid_df, cp, HEDEF_VERI_SAYISI)
+
         while count < HEDEF_VERI_SAYISI:
             try:
                 # 1. Veri Hazırlığı
-                row = grid_df.sample(1).iloc[0]
-                lat, lon = row["lat"], row["lon"]
-
-                days_diff = (datetime.date(2024, 12, 1) - datetime.date(2020, 1, 1)).days
-                target_date = datetime.date(2020, 1, 1) + datetime.timedelta(days=random.randrange(days_diff))
-
-                weather = get_historical_weather(lat, lon, target_date)
-                if not weather:
-                    time.sleep(0.5)
+                ornek = _ornek_sec(db, grid_df)
+                if cp.tamamlandi(ornek["anahtar"]):
                     continue
 
-                bitki_bilgisi = db.bitki_getir_random()
-                bitki_tur = bitki_bilgisi["tur"]
-                bitki_adi = bitki_bilgisi["tam_isim"]
-
-                # 2. Geçmiş Veri
-                gecmis_data = {}
-                for k, v in db.gecmis_verimler.items():
-                    if bitki_tur.lower() in k.lower() or k.lower() in bitki_tur.lower():
-                        gecmis_data = v
-                        break
-
-                # 3. Soru ve Cevap
-                adres = "Şanlıurfa"
-                soru = f"{adres} konumunda tarlam var. Tarih {target_date.strftime('%d.%m.%Y')}. Geçen günlerde hava ortalama {weather['temp']}°C idi ve {weather['rain']}mm yağış düştü. {bitki_adi} ekimi için şartlar nasıldı?"
+                # 2. Hava durumu, geçmiş veri ve soru
+                if _ornek_tamamla(db, ornek) is None:
+                    continue
 
                 # Ekrana basarken hangi satırda olduğumuzu göster
-                print(f"[{count + 1}/{HEDEF_VERI_SAYISI}] Üretiliyor: {bitki_adi} - {target_date}...")
+                print(f"[{count + 1}/{HEDEF_VERI_SAYISI}] Üretiliyor: {ornek['bitki_bilgisi']['tam_isim']} - {ornek['target_date']}...")
 
-                ai_cevap = generate_ai_response(soru, weather, target_date, bitki_bilgisi, gecmis_data)
+                # 3. Cevap
+                ai_cevap = _cevap_uret(ornek)
 
                 if ai_cevap:
-                    veri_satiri = {
-                        "instruction": soru,
-                        "input": f"Lokasyon: {lat},{lon} ({adres}) | Tarih: {target_date} | Veri: Temp={weather['temp']}C, Rain={weather['rain']}mm",
-                        "output": ai_cevap
-                    }
-                    f.write(json.dumps(veri_satiri, ensure_ascii=False) + "\n")
-                    # Dosyayı anında diske yazması için flush edelim (çökme durumuna karşı)
-                    f.flush()
+                    # Batch dolunca çıktı + günlük fsync ile diske yazılır (çökme durumuna karşı)
+                    cp.ekle(ornek["anahtar"], _veri_satiri(ornek, ai_cevap))
                     count += 1
 
-                time.sleep(BEKLEME_SURESI)
-
             except Exception as e:
                 print(f"Döngü hatası: {e}")
                 continue
 
     print(f"✅ İŞLEM TAMAMLANDI! Toplam {count} satır veri hazır: {CIKTI_DOSYASI}")
+    hiz_limiti.ozet_yazdir()
+    if _yanit_onbellegi is not None:
+        print(f"  LLM önbelleği: isabet={_yanit_onbellegi.isabet} ıskalama={_yanit_onbellegi.iskalama}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+"""
+disk_onbellek.py — İçerik adresli, boyut sınırlı disk önbelleği (SQLite).
+
+Anahtar, normalize edilmiş girdilerin SHA-256 özetidir; toplam boyut sınırı
+aşılınca en uzun süredir erişilmeyen kayıtlar silinir (LRU).
+
+    cache = DiskLRU("llm_cache.sqlite", max_mb=512)
+    anahtar = icerik_anahtari("glm-4.6v-flash", sistem_prompt, soru)
+    cevap = cache.al(anahtar)
+"""
+
+import time
+import hashlib
+import sqlite3
+import threading
+
+
+def normalize(metin):
+    """Boşluk farklılıkları (girinti, satır sonu, çift boşluk) aynı anahtarı versin."""
+    return " ".join(str(metin).split())
+
+
+def icerik_anahtari(*parcalar):
+    h = hashlib.sha256()
+    for p in parcalar:
+        h.update(normalize(p).encode("utf-8"))
+        h.update(b"\x1f")  # Parça ayırıcı: ("ab", "c") ile ("a", "bc") çakışmasın
+    return h.hexdigest()
+
+
+class DiskLRU:
+    def __init__(self, path, max_mb=256):
+        self.path = str(path)
+        self.max_bayt = int(max_mb * 1024 * 1024)
+        self.isabet = 0
+        self.iskalama = 0
+        self._kilit = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS kayit ("
+            " anahtar TEXT PRIMARY KEY, deger BLOB, boyut INTEGER, son_erisim REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_son_erisim ON kayit (son_erisim)")
+        self._db.commit()
+        self.toplam_bayt = self._db.execute("SELECT COALESCE(SUM(boyut), 0) FROM kayit").fetchone()[0]
+
+    def al(self, anahtar):
+        """Değer (bytes veya str) ya da None."""
+        with self._kilit:
+            row = self._db.execute("SELECT deger FROM kayit WHERE anahtar = ?", (anahtar,)).fetchone()
+            if row is None:
+                self.iskalama += 1
+                return None
+            self._db.execute("UPDATE kayit SET son_erisim = ? WHERE anahtar = ?", (time.time(), anahtar))
+            self._db.commit()
+            self.isabet += 1
+            return row[0]
+
+    def koy(self, anahtar, deger):
+        boyut = len(deger.encode("utf-8")) if isinstance(deger, str) else len(deger)
+        with self._kilit:
+            eski = self._db.execute("SELECT boyut FROM kayit WHERE anahtar = ?", (anahtar,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO kayit (anahtar, deger, boyut, son_erisim) VALUES (?, ?, ?, ?)",
+                (anahtar, deger, boyut, time.time()),
+            )
+            self.toplam_bayt += boyut - (eski[0] if eski else 0)
+            if self.toplam_bayt > self.max_bayt:
+                self._tahliye()
+            self._db.commit()
+
+    def _tahliye(self):
+        # Her seferinde sınırın %90'ına inilir ki her yeni kayıtta tekrar silme yapılmasın
+        hedef = int(self.max_bayt * 0.9)
+        while self.toplam_bayt > hedef:
+            eskiler = self._db.execute(
+                "SELECT anahtar, boyut FROM kayit ORDER BY son_erisim LIMIT 256").fetchall()
+            if not eskiler:
+                break
+            for anahtar, boyut in eskiler:
+                self._db.execute("DELETE FROM kayit WHERE anahtar = ?", (anahtar,))
+                self.toplam_bayt -= boyut
+                if self.toplam_bayt <= hedef:
+                    break
+
+    def __len__(self):
+        with self._kilit:
+            return self._db.execute("SELECT COUNT(*) FROM kayit").fetchone()[0]
+
+    def kapat(self):
+        with self._kilit:
+            self._db.close()
@@ -0,0 +1,253 @@
+"""
+etiket_motoru.py — veri_topla.build_comment / build_input kurallarının toplu (vektörel) hali.
+
+Örnekler tek tek dict olarak değil, sütunlu bir tablo (pandas DataFrame) olarak
+işlenir: her pH, toprak nemi, sıcaklık, nem, yağış ve güneş kuralı tüm satırlara
+aynı anda uygulanan bir maskedir. Metinler sözlük kodlamasıyla kurulur: sayılar ve
+(değer, durum) çiftleri yalnızca tekil değerler için biçimlenir, sabit metinli kurallar
+tek bir bit maskesine katlanır. CROPS rehberi değiştiğinde yüz binlerce kayıtlı gözlem yeniden API'ye gitmeden
+etiketlenebilir:
+
+    python etiket_motoru.py [gozlem_dizini] [cikti.jsonl]
+
+Çıktılar build_comment / build_input ile birebir aynıdır. Sayıların yazımı (16 ile
+16.0) sütun tipinden gelir: tam sayı sütunları int64 / Int64, diğerleri float olmalıdır
+(ornekleri_tabloya bunu dict listesinden kendisi çıkarır).
+"""
+
+import os
+import sys
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from veri_topla import CROPS, OBSERVATION_STORE_DIR
+from gozlem_deposu import GozlemDeposu
+
+SUTUNLAR = ["lat", "lon", "date_iso", "plant", "temperature", "humidity", "rain_mm",
+            "solar_irr", "soil_ph", "soil_moisture", "admin_area", "disease"]
+
+HASTALIK_YOK = "Şu an belirgin bir hastalık bulgusu yok."
+
+# build_comment'teki sabit metinli kurallar, değerlendirilme sırasıyla
+SABIT_KURALLAR = [
+    "Düşük bağıl nem ve yüksek sıcaklık; buharlaşma artar, sulamayı/sıklığı artırın.",
+    "Yüksek bağıl nem hastalık riskini artırır, yaprak ıslaklığını azaltın.",
+    "Son yağış yüksek; ek sulamayı azaltın ve drenajı kontrol edin.",
+    "Düşük güneşlenme; gelişme yavaşlayabilir, azot uygulamasını abartmayın.",
+    "pH düşük: kireç veya organik madde ekleyin.",
+    "pH yüksek: kükürt ile dengeleyin.",
+]
+
+SAYISAL_SUTUNLAR = ["lat", "lon", "temperature", "humidity", "rain_mm", "solar_irr", "soil_ph", "soil_moisture"]
+
+
+def ornekleri_tabloya(samples):
+    """
+    harvest_point çıktısı dict listesi -> tablo. Tek tipli sayısal sütunlar
+    Int64 / float64 olur; int ile float karışıksa yazım farkı korunsun diye object kalır.
+    """
+    df = pd.DataFrame(list(samples), columns=SUTUNLAR, dtype=object)
+    for col in SAYISAL_SUTUNLAR:
+        tip = pd.api.types.infer_dtype(df[col], skipna=True)
+        if tip == "integer":
+            df[col] = df[col].astype("Int64")
+        elif tip == "floating":
+            df[col] = df[col].astype(np.float64)
+    return df
+
+
+def _sayi(df, col):
+    if col not in df:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+
+def _sozluk(df, col, eksik="?"):
+    """
+    f"{sample.get(col, eksik)}" karşılığı sözlük kodlaması -> (kodlar, metinler)
+    metinler[kodlar] satır metinleridir; sütun yoksa eksik, değer boşsa 'None'.
+    """
+    n = len(df)
+    if col not in df:
+        return np.zeros(n, dtype=np.intp), np.array([eksik], dtype=object)
+    s = df[col]
+    if s.dtype == object:
+        # Karışık tipler (16 / 16.0) ayrı yazılmalı; eleman başına str()
+        degerler = s.to_numpy(dtype=object)
+        metin = np.fromiter(map(str, degerler), dtype=object, count=n)
+        metin[pd.isna(degerler)] = "None"
+        return np.arange(n), metin
+    # Tipli sütun: yalnızca tekil değerler biçimlenir (yuvarlanmış ölçümlerde çok az)
+    if s.dtype.kind == "f":
+        # -0.0 ile 0.0 eşit sayılır ama farklı yazılır: bit deseni üzerinden gruplanır
+        degerler = s.to_numpy(dtype=np.float64)
+        kodlar, tekiller = pd.factorize(degerler.view(np.int64))
+        kodlar[np.isnan(degerler)] = -1
+        tekiller = tekiller.view(np.float64)
+    else:
+        kodlar, tekiller = pd.factorize(s)
+    metin = np.array([str(v) for v in tekiller.tolist()] + ["None"], dtype=object)
+    return kodlar % len(metin), metin  # -1 (eksik) son elemana, "None"a düşer
+
+
+def _goster(df, col, eksik="?"):
+    kodlar, metin = _sozluk(df, col, eksik)
+    return metin[kodlar]
+
+
+def _koordinat(degerler):
+    """f"{x:.5f}"; ızgara noktaları tekrar ettiğinden yalnızca tekil değerler biçimlenir."""
+    kodlar, tekiller = pd.factorize(degerler.view(np.int64))
+    metin = np.array([f"{v:.5f}" for v in tekiller.view(np.float64).tolist()], dtype=object)
+    return metin[kodlar]
+
+
+def _rehber(plant, anahtar, i):
+    """Her satır için CROPS[plant][anahtar][i]; rehberi olmayan bitki -> NaN."""
+    esleme = {p: g[anahtar][i] for p, g in CROPS.items()}
+    return plant.map(esleme).to_numpy(dtype=float)
+
+
+def _parca(metin, maske):
+    """maske'nin doğru olduğu satırlarda metin, diğerlerinde "" (nesne dizisi)."""
+    return np.where(maske, metin, "").astype(object)
+
+
+def _durum_yorumlari(val, sozluk, lo, hi, ad, birim):
+    """_status(): düşük / yüksek / uygun; satır başına en fazla biri dolu tek parça."""
+    with np.errstate(invalid="ignore"):
+        durum = np.select([np.isnan(val) | np.isnan(lo), val < lo, val > hi], [0, 1, 2], 3)
+    # (değer, durum) çiftleri az sayıdadır: metin yalnızca tekil çiftler için kurulur
+    kodlar, metinler = sozluk
+    cift_kodlari, ciftler = pd.factorize(kodlar * 4 + durum)
+    etiketler = ("", "düşük", "yüksek", "uygun")
+    metin = np.array([f"{ad} {etiketler[c % 4]} ({metinler[c // 4]}{birim})." if c % 4 else ""
+                      for c in ciftler.tolist()], dtype=object)
+    return metin[cift_kodlari]
+
+
+def _birlestir(parcalar, n):
+    """Satır başına boş olmayan parçaları boşlukla birleştirir (tek geçiş)."""
+    if not parcalar:
+        return [""] * n
+    return [" ".join(filter(None, satir)) for satir in zip(*parcalar)]
+
+
+def build_comments_batch(df):
+    """Tablodaki her satır için build_comment(sample) çıktısı (pd.Series)."""
+    n = len(df)
+    if n == 0:
+        return pd.Series([], index=df.index, dtype=object)
+    plant = df["plant"] if "plant" in df else pd.Series(None, index=df.index, dtype=object)
+
+    ph_lo, ph_hi = _rehber(plant, "ph", 0), _rehber(plant, "ph", 1)
+    sm_lo, sm_hi = _rehber(plant, "soil_moist", 0), _rehber(plant, "soil_moist", 1)
+    t_lo, t_hi = _rehber(plant, "temp", 0), _rehber(plant, "temp", 1)
+    rehber_var = ~np.isnan(ph_lo)
+
+    ph, sm = _sayi(df, "soil_ph"), _sayi(df, "soil_moisture")
+    T, H, R, S = _sayi(df, "temperature"), _sayi(df, "humidity"), _sayi(df, "rain_mm"), _sayi(df, "solar_irr")
+
+    # 1) Eşik durumları
+    parcalar = [
+        _durum_yorumlari(ph, _sozluk(df, "soil_ph"), ph_lo, ph_hi, "Toprak pH", ""),
+        _durum_yorumlari(sm, _sozluk(df, "soil_moisture"), sm_lo, sm_hi, "Toprak nemi", "%"),
+        _durum_yorumlari(T, _sozluk(df, "temperature"), t_lo, t_hi, "Sıcaklık", "°C"),
+    ]
+
+    with np.errstate(invalid="ignore"):
+        th = rehber_var & ~np.isnan(T) & ~np.isnan(H)
+        ph_var = rehber_var & ~np.isnan(ph)
+        kurallar = [
+            # 2) Nem / sıcaklık birleşik kuralları
+            th & (H < 25) & (T > t_hi),
+            th & (H > 85) & (T < (t_lo + t_hi) / 2),
+            # 3) Yağış, 4) Güneşlenme
+            R > 10,
+            S < 3.5,
+            # 5) pH düzeltme önerileri
+            ph_var & (ph < ph_lo),
+            ph_var & ~(ph < ph_lo) & (ph > ph_hi),
+        ]
+    # Sabit metinli kurallar tek bit maskesine katlanır; metin yalnızca görülen maskeler için kurulur
+    maske = np.zeros(n, dtype=np.int64)
+    for j, kural in enumerate(kurallar):
+        maske |= kural.astype(np.int64) << j
+    kodlar, tekiller = pd.factorize(maske)
+    sabit = np.array([" ".join(m for j, m in enumerate(SABIT_KURALLAR) if k >> j & 1) for k in tekiller],
+                     dtype=object)
+    parcalar.append(sabit[kodlar])
+
+    # 6) Hastalık: sütun neredeyse hep boş; yalnızca dolu satırlar tek tek biçimlenir
+    hastalik = np.full(n, HASTALIK_YOK, dtype=object)
+    if "disease" in df:
+        dolu = df["disease"].notna().to_numpy()
+        for i, dis in zip(np.flatnonzero(dolu), df["disease"].to_numpy()[dolu]):
+            if dis and dis.get("detected"):
+                sy = dis.get("symptoms") or []
+                hastalik[i] = (f"{dis.get('name', 'Hastalık')} şüphesi var{(': ' + ', '.join(sy)) if sy else ''}. "
+                               f"Uygun ilaç ve hijyen önlemleri alın.")
+    parcalar.append(hastalik)
+
+    # 7) Konum
+    if "admin_area" in df:
+        admin = df["admin_area"]
+        dolu = (admin.notna() & (admin.astype(str) != "")).to_numpy()
+        parcalar.append(_parca("Konum: " + _goster(df, "admin_area") + " civarı için öneriler.", dolu))
+
+    yorumlar = pd.Series(_birlestir(parcalar, n), index=df.index, dtype=object)
+    return yorumlar.where(yorumlar != "", "Koşullar normal görünüyor.")
+
+
+def build_inputs_batch(df):
+    """Tablodaki her satır için build_input(sample) çıktısı (pd.Series)."""
+    if len(df) == 0:
+        return pd.Series([], index=df.index, dtype=object)
+    lat, lon = _koordinat(_sayi(df, "lat")), _koordinat(_sayi(df, "lon"))
+    var = np.full(len(df), "Yok", dtype=object)
+    if "disease" in df:
+        tespit = df["disease"].map(lambda d: bool(d and d.get("detected")), na_action="ignore")
+        var[tespit.fillna(False).astype(bool).to_numpy()] = "Var"
+    sutunlar = [lat, lon] + [_goster(df, c) for c in
+                             ("plant", "date_iso", "temperature", "humidity", "rain_mm", "solar_irr",
+                              "soil_ph", "soil_moisture")] + [var]
+    # Her satır tek bir f-string ile kurulur (ara birleştirme dizisi oluşmaz)
+    girdiler = [
+        f"Konum: ({la}, {lo}). Bitki: {p}. Tarih: {d}. Sıcaklık: {t}°C, Nem: %{h}, Yağış: {r} mm, "
+        f"Güneş: {so} kWh/m²/gün. Toprak pH: {ph}, Toprak nemi: %{sm}. Hastalık: {v}."
+        for la, lo, p, d, t, h, r, so, ph, sm, v in zip(*sutunlar)
+    ]
+    return pd.Series(girdiler, index=df.index, dtype=object)
+
+
+def etiketle(df):
+    """Tablo -> veri_topla çıktısıyla aynı {"input", "output"} sütunlu DataFrame."""
+    return pd.DataFrame({"input": build_inputs_batch(df), "output": build_comments_batch(df)}, index=df.index)
+
+
+def yeniden_etiketle(depo_dizini, cikti_path):
+    """Gözlem deposunu parça parça etiketleyip JSONL'e yazar (ağ çağrısı yok). Yazılan satır sayısı."""
+    depo = GozlemDeposu(depo_dizini)
+    gecici = f"{cikti_path}.tmp"
+    n = 0
+    with open(gecici, "w", encoding="utf-8") as f:
+        for parca in depo.parcalar():
+            etiketler = etiketle(parca)
+            f.writelines(
+                json.dumps({"input": i, "output": o}, ensure_ascii=False) + "\n"
+                for i, o in zip(etiketler["input"].tolist(), etiketler["output"].tolist())
+            )
+            n += len(etiketler)
+    os.replace(gecici, cikti_path)  # Yarım dosya eski veri setinin yerini almaz
+    return n
+
+
+if __name__ == "__main__":
+    depo_dizini = sys.argv[1] if len(sys.argv) > 1 else OBSERVATION_STORE_DIR
+    cikti = sys.argv[2] if len(sys.argv) > 2 else "dataset_yeniden_etiketli.jsonl"
+    t0 = time.perf_counter()
+    n = yeniden_etiketle(depo_dizini, cikti)
+    print(f"{depo_dizini} -> {cikti}: {n} satır, {time.perf_counter() - t0:.2f} sn")
@@ -0,0 +1,216 @@
+"""
+fiyat_serisi.py — hal fiyatları için sadece eklemeli (append-only) zaman serisi ve özetler.
+
+Ürün kimliği kararlıdır: Türkçe küçük harfli (ad, cins, birim) üçlüsünün SHA-1'i.
+Böylece aynı ürün farklı günlerde / taramalarda aynı id'yi alır ve kıyaslanabilir.
+
+Depo bir dizindir:
+  urunler.json        ürün sözlüğü; listedeki sıra = matris satırı (yalnızca sona eklenir)
+  gun_YYYY-MM-DD.npz  o günün (urun, fiyat) dizileri; bir gün yeniden yazılabilir, eskiler değişmez
+  ozet.json           fiyat ekranı için önceden hesaplanmış özet (ozet_kaydet)
+
+Hesaplar (n_urun x n_gun) matris üzerinde vektöreldir: son iki gözleme göre günlük
+değişim (%), NaN'a dayanıklı hareketli ortalamalar (7 / 30 gün) ve trend etiketi.
+
+    seri = FiyatSerisi("hal_serisi")
+    seri.ekle("2026-10-18", [(name, variety, price, unit), ...])
+    seri.ozet_kaydet()
+    seri.fiyat_ekrani()          # [{"id", "name", "price", "unit", "trend", "changeRate", ...}]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from turkce import tr_kucuk
+
+TREND_ESIGI = float(os.getenv("HAL_TREND_ESIGI", "0.5"))  # |değişim| bu yüzdenin altındaysa "stable"
+PENCERELER = (7, 30)
+
+
+def urun_kimligi(name, variety, unit):
+    anahtar = "\x1f".join(tr_kucuk(x) for x in (name, variety, unit))
+    return hashlib.sha1(anahtar.encode("utf-8")).hexdigest()[:16]
+
+
+def _atomik_yaz(yol, yazici):
+    gecici = yol.with_suffix(yol.suffix + ".tmp")
+    with open(gecici, "wb") as f:
+        yazici(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(gecici, yol)
+
+
+# ---------------------------
+# Vektörel hesaplar
+# ---------------------------
+def son_iki_gozlem(P):
+    """(n, d) NaN'lı matris -> (son, onceki, son_gun_indeksi); gözlem yoksa NaN / -1."""
+    n, d = P.shape
+    satir = np.arange(n)
+    gozlem = ~np.isnan(P)
+    # Her gün için o güne kadarki son gözlem indeksi (-1: henüz yok)
+    son_idx = np.maximum.accumulate(np.where(gozlem, np.arange(d), -1), axis=1)
+    L = son_idx[:, -1] if d else np.full(n, -1)
+    onceki_L = np.where(L > 0, son_idx[satir, np.maximum(L - 1, 0)], -1)
+    son = np.where(L >= 0, P[satir, np.maximum(L, 0)], np.nan)
+    onceki = np.where(onceki_L >= 0, P[satir, np.maximum(onceki_L, 0)], np.nan)
+    return son, onceki, L
+
+
+def hareketli_ortalama(P, k):
+    """Her gün için son k günün (gözlenenler) ortalaması; pencerede gözlem yoksa NaN."""
+    gozlem = ~np.isnan(P)
+    toplam = np.concatenate([np.zeros((P.shape[0], 1)), np.cumsum(np.where(gozlem, P, 0.0), axis=1)], axis=1)
+    adet = np.concatenate([np.zeros((P.shape[0], 1)), np.cumsum(gozlem, axis=1)], axis=1)
+    j = np.arange(1, P.shape[1] + 1)
+    bas = np.maximum(j - k, 0)
+    pay = toplam[:, j] - toplam[:, bas]
+    payda = adet[:, j] - adet[:, bas]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(payda > 0, pay / np.maximum(payda, 1), np.nan)
+
+
+def trend_etiketi(degisim, esik=TREND_ESIGI):
+    return np.where(degisim > esik, "up", np.where(degisim < -esik, "down", "stable"))
+
+
+class FiyatSerisi:
+    def __init__(self, dizin="hal_serisi"):
+        self.dizin = Path(dizin)
+        self.dizin.mkdir(parents=True, exist_ok=True)
+        self._urunler_yolu = self.dizin / "urunler.json"
+        self.urunler = []
+        if self._urunler_yolu.exists():
+            with open(self._urunler_yolu, "r", encoding="utf-8") as f:
+                self.urunler = json.load(f)
+        self._indeks = {u["id"]: i for i, u in enumerate(self.urunler)}
+        self._ozet = None
+        self._ozet_mtime = None
+
+    # ---------------------------
+    # Yazma
+    # ---------------------------
+    def _urun_no(self, name, variety, unit):
+        kimlik = urun_kimligi(name, variety, unit)
+        no = self._indeks.get(kimlik)
+        if no is None:
+            no = len(self.urunler)
+            self.urunler.append({"id": kimlik, "name": name, "variety": variety, "unit": unit})
+            self._indeks[kimlik] = no
+        return no
+
+    def ekle(self, tarih, satirlar):
+        """Bir günün fiyatları [(name, variety, price, unit)]; aynı ürün tekrar ederse sonuncusu kalır."""
+        eski_sayi = len(self.urunler)
+        gunluk = {}
+        for name, variety, price, unit in satirlar:
+            gunluk[self._urun_no(name, variety, unit)] = price
+        if len(self.urunler) != eski_sayi:
+            veri = json.dumps(self.urunler, ensure_ascii=False).encode("utf-8")
+            _atomik_yaz(self._urunler_yolu, lambda f: f.write(veri))
+        urun = np.fromiter(gunluk.keys(), dtype=np.int32, count=len(gunluk))
+        fiyat = np.fromiter(gunluk.values(), dtype=np.float64, count=len(gunluk))
+        _atomik_yaz(self.dizin / f"gun_{tarih}.npz", lambda f: np.savez_compressed(f, urun=urun, fiyat=fiyat))
+        return len(gunluk)
+
+    def depodan_aktar(self, depo):
+        """HalDeposu'ndaki, serideki son günden eski olmayan tarihleri seriye yazar."""
+        gunler = self.gunler()
+        yazilan = 0
+        for tarih in depo.tarihler():
+            if gunler and tarih < gunler[-1]:
+                continue  # Geçmiş günler değişmez (append-only)
+            yazilan += self.ekle(tarih, depo.tarih_fiyatlari(tarih))
+        return yazilan
+
+    # ---------------------------
+    # Okuma / hesap
+    # ---------------------------
+    def gunler(self):
+        return sorted(p.stem[4:] for p in self.dizin.glob("gun_*.npz"))
+
+    def matris(self):
+        """(tarihler, P): P[urun, gun] fiyat, gözlem yoksa NaN."""
+        tarihler = self.gunler()
+        P = np.full((len(self.urunler), len(tarihler)), np.nan)
+        for j, tarih in enumerate(tarihler):
+            with np.load(self.dizin / f"gun_{tarih}.npz") as z:
+                P[z["urun"], j] = z["fiyat"]
+        return tarihler, P
+
+    def hesapla(self, pencereler=PENCERELER, esik=TREND_ESIGI):
+        """Ürün başına son fiyat, günlük değişim, hareketli ortalamalar ve trend (diziler)."""
+        tarihler, P = self.matris()
+        son, onceki, L = son_iki_gozlem(P)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            degisim = np.where(onceki > 0, (son - onceki) / onceki * 100.0, 0.0)
+        sonuc = {"tarihler": tarihler, "son": son, "onceki": onceki, "son_gun": L,
+                 "degisim": np.round(degisim, 1), "trend": trend_etiketi(degisim, esik)}
+        for k in pencereler:
+            ma = hareketli_ortalama(P, k)
+            sonuc[f"ma{k}"] = ma[:, -1] if ma.shape[1] else np.full(len(P), np.nan)
+        return sonuc
+
+    def ozet_kaydet(self):
+        """Fiyat ekranı özetini ozet.json'a yazar (istek anında hesap / tarama yapılmaz)."""
+        h = self.hesapla()
+        tarihler = h["tarihler"]
+        kayitlar = []
+        for i in np.flatnonzero(h["son_gun"] >= 0):
+            u = self.urunler[i]
+            kayit = {
+                "id": u["id"],
+                "name": f"{u['name']} ({u['variety']})",
+                # Eski float32 günler de 13.100000381469727 yerine 13.1 versin
+                "price": round(float(h["son"][i]), 2),
+                "unit": u["unit"],
+                "trend": str(h["trend"][i]),
+                "changeRate": float(h["degisim"][i]),
+                "date": tarihler[h["son_gun"][i]],
+            }
+            for k in PENCERELER:
+                kayit[f"ma{k}"] = None if np.isnan(h[f"ma{k}"][i]) else round(float(h[f"ma{k}"][i]), 2)
+            kayitlar.append(kayit)
+        kayitlar.sort(key=lambda k: tr_kucuk(k["name"]))
+        ozet = {"olusturma": time.time(), "son_gun": tarihler[-1] if tarihler else None, "urunler": kayitlar}
+        veri = json.dumps(ozet, ensure_ascii=False).encode("utf-8")
+        _atomik_yaz(self.dizin / "ozet.json", lambda f: f.write(veri))
+        return ozet
+
+    def ozet(self):
+        """ozet.json (değişmediyse bellekten); hiç hesaplanmadıysa None."""
+        yol = self.dizin / "ozet.json"
+        try:
+            mtime = yol.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if self._ozet is None or mtime != self._ozet_mtime:
+            with open(yol, "r", encoding="utf-8") as f:
+                self._ozet = json.load(f)
+            self._ozet_mtime = mtime
+        return self._ozet
+
+    def fiyat_ekrani(self):
+        ozet = self.ozet()
+        return ozet["urunler"] if ozet else []
+
+
+if __name__ == "__main__":
+    from hal_deposu import HalDeposu
+
+    depo_yolu = sys.argv[1] if len(sys.argv) > 1 else "hal_fiyatlari.sqlite"
+    seri = FiyatSerisi(sys.argv[2] if len(sys.argv) > 2 else "hal_serisi")
+    depo = HalDeposu(depo_yolu)
+    t0 = time.perf_counter()
+    yazilan = seri.depodan_aktar(depo)
+    ozet = seri.ozet_kaydet()
+    depo.kapat()
+    print(f"{yazilan} fiyat aktarıldı; {len(ozet['urunler'])} ürün özeti ({len(seri.gunler())} gün, "
+          f"{time.perf_counter() - t0:.2f} sn).")
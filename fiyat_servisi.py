@@ -0,0 +1,279 @@
+"""
+fiyat_servisi.py — hal fiyatları için TTL'li, bayat-iken-yenile (stale-while-revalidate) anlık görüntü servisi.
+
+Tarama (hal_fiyatları.fetch_hal_prices) yalnızca arka plandaki yenileyicide çalışır.
+İstekler bellekteki son görüntüden okunur; hiçbir istek taramayı beklemez:
+  - Görüntü diske de yazılır (FIYAT_SNAPSHOT_PATH); servis yeniden başlarsa ilk istek
+    taramayı beklemez, diskteki görüntü (bayat olsa da) hemen sunulur.
+  - Yaşı FIYAT_TTL_SN'yi geçen görüntü sunulmaya devam eder, yenileme arka planda başlar
+    (aynı anda tek yenileme). Tarama hata verir veya boş dönerse eski görüntü kalır.
+  - Ad öneki (Türkçe harf / ASCII katlamalı, "cilek" -> "Çilek") ve birim filtreleri
+    görüntüyle birlikte kurulan sıralı indekste ikili arama ile bulunur.
+  - Zayıf ETag = görüntü özeti + sorgu; If-None-Match tutarsa gövde üretilmeden 304 döner.
+
+    python fiyat_servisi.py [port]
+    GET /prices?q=dom&unit=kg&page=1&limit=50
+"""
+
+import os
+import sys
+import json
+import gzip
+import time
+import bisect
+import hashlib
+import datetime
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from turkce import katla, tr_kucuk
+
+FIYAT_TTL_SN = int(os.getenv("FIYAT_TTL_SN", "3600"))  # Bu yaştan sonra arka planda yenilenir
+FIYAT_SWR_SN = int(os.getenv("FIYAT_SWR_SN", "86400"))  # İstemciye ilan edilen stale-while-revalidate süresi
+FIYAT_SNAPSHOT_PATH = os.getenv("FIYAT_SNAPSHOT_PATH", "hal_fiyat_snapshot.json")
+FIYAT_PORT = int(os.getenv("FIYAT_PORT", "8081"))
+FIYAT_YENIDEN_DENEME_SN = 60  # Başarısız yenilemeden sonra yeni deneme için en az bekleme
+FIYAT_SAYFA_BOYUTU = 50
+FIYAT_MAKS_SAYFA_BOYUTU = 500
+_YANIT_ONBELLEGI = 512  # Görüntü başına saklanan hazır (sıkıştırılmış) yanıt sayısı
+
+
+def _anahtar(metin):
+    return katla(tr_kucuk(metin or "").strip())
+
+
+class FiyatGoruntusu:
+    """Değişmez anlık görüntü: ürünler + ad / birim indeksi + hazır yanıtlar."""
+
+    def __init__(self, urunler, zaman=None):
+        self.zaman = time.time() if zaman is None else zaman
+        self.urunler = sorted(urunler, key=lambda u: _anahtar(u["name"]))
+        veri = json.dumps(self.urunler, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        self.ozet = hashlib.sha256(veri).hexdigest()[:16]
+        # birim -> (sıralı ad anahtarları, aynı sıradaki ürünler); None: tüm birimler
+        self.indeks = {None: ([_anahtar(u["name"]) for u in self.urunler], self.urunler)}
+        for u in self.urunler:
+            birim = _anahtar(u.get("unit"))
+            anahtarlar, liste = self.indeks.setdefault(birim, ([], []))
+            anahtarlar.append(_anahtar(u["name"]))
+            liste.append(u)
+        self._yanitlar = {}
+        self._kilit = threading.Lock()
+
+    def yas(self):
+        return time.time() - self.zaman
+
+    def ara(self, onek="", birim=None):
+        """Ad öneki ve birime uyan ürünler (ada göre sıralı)."""
+        anahtarlar, liste = self.indeks.get(_anahtar(birim) if birim else None, ([], []))
+        onek = _anahtar(onek)
+        if not onek:
+            return liste
+        bas = bisect.bisect_left(anahtarlar, onek)
+        son = bisect.bisect_left(anahtarlar, onek + "\uffff", lo=bas)
+        return liste[bas:son]
+
+    def etag(self, sorgu):
+        return f'W/"{self.ozet}-{hashlib.sha1(sorgu.encode("utf-8")).hexdigest()[:8]}"'
+
+    def yanit(self, onek, birim, sayfa, limit):
+        """(json bayt, gzip bayt); aynı sorgu aynı görüntüde bir kez üretilir."""
+        anahtar = (_anahtar(onek), _anahtar(birim), sayfa, limit)
+        with self._kilit:
+            hazir = self._yanitlar.get(anahtar)
+        if hazir is not None:
+            return hazir
+        eslesen = self.ara(onek, birim)
+        govde = json.dumps({
+            "urunler": eslesen[(sayfa - 1) * limit:sayfa * limit],
+            "toplam": len(eslesen),
+            "sayfa": sayfa,
+            "limit": limit,
+            "guncelleme": datetime.datetime.fromtimestamp(self.zaman).isoformat(timespec="seconds"),
+        }, ensure_ascii=False).encode("utf-8")
+        hazir = (govde, gzip.compress(govde, compresslevel=5))
+        with self._kilit:
+            if len(self._yanitlar) >= _YANIT_ONBELLEGI:
+                self._yanitlar.clear()
+            self._yanitlar[anahtar] = hazir
+        return hazir
+
+
+class FiyatServisi:
+    def __init__(self, yukleyici=None, ttl=FIYAT_TTL_SN, snapshot_path=FIYAT_SNAPSHOT_PATH):
+        if yukleyici is None:
+            from hal_fiyatları import fetch_hal_prices
+            yukleyici = fetch_hal_prices
+        self.yukleyici = yukleyici
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.goruntu = self._diskten_yukle()
+        self.hata = None
+        self._son_deneme = 0.0
+        self._yenileniyor = threading.Lock()
+        self._dur = threading.Event()
+
+    # ---------------------------
+    # Disk
+    # ---------------------------
+    def _diskten_yukle(self):
+        if not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                veri = json.load(f)
+            goruntu = FiyatGoruntusu(veri["urunler"], veri["zaman"])
+            print(f"Fiyat görüntüsü diskten yüklendi ({len(goruntu.urunler)} ürün, {goruntu.yas():.0f} sn önce).")
+            return goruntu
+        except Exception as e:
+            print(f"UYARI: Fiyat görüntüsü okunamadı ({e}), ilk yenileme beklenecek.")
+            return None
+
+    def _diske_yaz(self, goruntu):
+        gecici = f"{self.snapshot_path}.tmp"
+        with open(gecici, "w", encoding="utf-8") as f:
+            json.dump({"zaman": goruntu.zaman, "urunler": goruntu.urunler}, f, ensure_ascii=False)
+        os.replace(gecici, self.snapshot_path)  # Yarım yazılmış görüntü asla okunmaz
+
+    # ---------------------------
+    # Yenileme
+    # ---------------------------
+    def yenile(self):
+        """Taramayı çalıştırır; aynı anda yalnızca bir yenileme. Başka biri yeniliyorsa False."""
+        if not self._yenileniyor.acquire(blocking=False):
+            return False
+        try:
+            self._son_deneme = time.time()
+            t0 = time.perf_counter()
+            urunler = self.yukleyici()
+            if not urunler:
+                raise RuntimeError("tarama boş döndü")
+            yeni = FiyatGoruntusu(urunler)
+            eski = self.goruntu
+            if eski is not None and eski.ozet == yeni.ozet:
+                # İçerik aynı: ETag'ler korunur, istemciler 304 almaya devam eder
+                eski.zaman = yeni.zaman
+                with eski._kilit:
+                    eski._yanitlar.clear()  # "guncelleme" alanı yeni zamanı göstersin
+                yeni = eski
+            else:
+                self.goruntu = yeni
+            self._diske_yaz(yeni)
+            self.hata = None
+            print(f"Fiyat görüntüsü yenilendi: {len(yeni.urunler)} ürün ({time.perf_counter() - t0:.1f} sn).")
+            return True
+        except Exception as e:
+            self.hata = str(e)
+            print(f"UYARI: Fiyat yenilemesi başarısız ({e}); eski görüntü sunulmaya devam ediyor.")
+            return False
+        finally:
+            self._yenileniyor.release()
+
+    def _arka_planda_yenile(self):
+        # Yoklama trafiği tarama fırtınasına dönmesin: tek yenileme + deneme aralığı
+        if not self._yenileniyor.locked() and time.time() - self._son_deneme >= FIYAT_YENIDEN_DENEME_SN:
+            threading.Thread(target=self.yenile, daemon=True).start()
+
+    def al(self):
+        """
+        Güncel görüntü. TTL geçmişse bayat görüntü döner ve yenileme arka planda başlar.
+        Hiç görüntü yoksa (ilk açılış, disk boş) None: istek beklemez, 503 döner.
+        """
+        goruntu = self.goruntu
+        if goruntu is None or goruntu.yas() > self.ttl:
+            self._arka_planda_yenile()
+        return goruntu
+
+    def baslat(self):
+        """Görüntüyü TTL aralıklarla tazeleyen arka plan iş parçacığı."""
+        def dongu():
+            while not self._dur.is_set():
+                goruntu = self.goruntu
+                if goruntu is None or goruntu.yas() >= self.ttl:
+                    self.yenile()
+                    goruntu = self.goruntu
+                kalan = self.ttl - goruntu.yas() if goruntu is not None else self.ttl
+                # Başarısız yenilemeden sonra da en geç 60 sn içinde yeniden denenir
+                self._dur.wait(max(1.0, min(kalan, self.ttl if self.hata is None else FIYAT_YENIDEN_DENEME_SN)))
+
+        threading.Thread(target=dongu, daemon=True).start()
+        return self
+
+    def durdur(self):
+        self._dur.set()
+
+
+# ---------------------------
+# HTTP
+# ---------------------------
+def _tamsayi(deger, varsayilan, en_az, en_cok):
+    try:
+        return min(max(int(deger), en_az), en_cok)
+    except (TypeError, ValueError):
+        return varsayilan
+
+
+def istek_isleyici(servis):
+    class FiyatIsleyici(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _gonder(self, kod, govde=b"", basliklar=()):
+            self.send_response(kod)
+            for ad, deger in basliklar:
+                self.send_header(ad, deger)
+            self.send_header("Content-Length", str(len(govde)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(govde)
+
+        def do_GET(self):
+            adres = urlsplit(self.path)
+            if adres.path.rstrip("/") != "/prices":
+                return self._gonder(404, b'{"hata": "bulunamadi"}', [("Content-Type", "application/json")])
+            goruntu = servis.al()
+            if goruntu is None:
+                return self._gonder(503, b'{"hata": "fiyatlar hazir degil"}',
+                                    [("Content-Type", "application/json"), ("Retry-After", "30")])
+
+            p = parse_qs(adres.query)
+            onek = p.get("q", [""])[0]
+            birim = p.get("unit", [None])[0]
+            sayfa = _tamsayi(p.get("page", [1])[0], 1, 1, 10 ** 6)
+            limit = _tamsayi(p.get("limit", [FIYAT_SAYFA_BOYUTU])[0], FIYAT_SAYFA_BOYUTU, 1, FIYAT_MAKS_SAYFA_BOYUTU)
+
+            etag = goruntu.etag(f"{_anahtar(onek)}\x1f{_anahtar(birim)}\x1f{sayfa}\x1f{limit}")
+            kalan = max(0, int(servis.ttl - goruntu.yas()))
+            basliklar = [("ETag", etag), ("Vary", "Accept-Encoding"),
+                         ("Cache-Control", f"public, max-age={kalan}, stale-while-revalidate={FIYAT_SWR_SN}"),
+                         ("Last-Modified", self.date_time_string(goruntu.zaman))]
+            if etag in [e.strip() for e in self.headers.get("If-None-Match", "").split(",")]:
+                return self._gonder(304, basliklar=basliklar)
+
+            govde, sikistirilmis = goruntu.yanit(onek, birim, sayfa, limit)
+            basliklar.append(("Content-Type", "application/json; charset=utf-8"))
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                basliklar.append(("Content-Encoding", "gzip"))
+                govde = sikistirilmis
+            self._gonder(200, govde, basliklar)
+
+        do_HEAD = do_GET
+
+        def log_message(self, format, *args):
+            pass  # Her istek için satır basılmaz (yoklama trafiği)
+
+    return FiyatIsleyici
+
+
+def sunucu(servis, port=FIYAT_PORT, adres="0.0.0.0"):
+    return ThreadingHTTPServer((adres, port), istek_isleyici(servis))
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else FIYAT_PORT
+    servis = FiyatServisi().baslat()
+    print(f"Fiyat servisi: http://0.0.0.0:{port}/prices (TTL {servis.ttl} sn)")
+    try:
+        sunucu(servis, port).serve_forever()
+    except KeyboardInterrupt:
+        servis.durdur()
@@ -1,6 +1,15 @@
 import csv
-import random
-from datetime import date, timedelta
+import math
+import time
+from datetime import date
+
+import numpy as np
+
+# Sobol / Halton için scipy.stats.qmc opsiyonel; yoksa Halton NumPy ile üretilir
+try:
+    from scipy.stats import qmc
+except ImportError:
+    qmc = None
 
 # --- AYARLAR ---
 # Veriyi büyütmek için satır sayısını ciddi oranda artırdık.
@@ -18,6 +27,12 @@ LON_MIN, LON_MAX = 37.80, 40.25
 TARIH_BASLANGIC = date(2020, 1, 1)
 TARIH_BITIS = date(2025, 12, 30)
 
+# Örnekleme yöntemi: "rastgele" | "katmanli" | "sobol" | "halton"
+# katmanli/sobol/halton kutuyu eşit kaplar; yakın noktalar geocode / toprak karolarını ortak kullanır.
+ORNEKLEME = "halton"
+PARCA_BOYUTU = 100_000  # Bellekte aynı anda tutulan satır sayısı
+TOHUM = None  # Tekrarlanabilir grid için sabit bir sayı verin
+
 # Ürün çeşitliliği
 BITKILER = [
     "Buğday",
@@ -34,46 +49,135 @@ BITKILER = [
 
 # --- AYARLAR SONU ---
 
-def random_date(start, end):
-    """Verilen iki tarih arasında rastgele bir tarih döndürür."""
-    delta = end - start
-    int_delta = (delta.days)
-    random_day = random.randrange(int_delta)
-    return start + timedelta(days=random_day)
+# ---------------------------
+# Vektörel / akışlı üretici
+# ---------------------------
+def _radikal_ters(indeks, taban):
+    """Van der Corput dizisi: indeksin taban tabanındaki basamaklarının ters çevrilmişi."""
+    indeks = indeks.astype(np.int64)
+    sonuc = np.zeros(len(indeks))
+    carpan = 1.0 / taban
+    while np.any(indeks > 0):
+        sonuc += (indeks % taban) * carpan
+        indeks //= taban
+        carpan /= taban
+    return sonuc
+
+
+class _BirimKareOrnekleyici:
+    """[0, 1)^2 içinde parça parça nokta üretir; parçalar birbirinin devamıdır."""
+
+    def __init__(self, yontem, toplam, rng):
+        self.yontem = yontem
+        self.rng = rng
+        self.sira = 0
+        if yontem in ("sobol", "halton") and qmc is not None:
+            motor = qmc.Sobol if yontem == "sobol" else qmc.Halton
+            self.qmc = motor(d=2, scramble=True, seed=rng)
+        else:
+            if yontem == "sobol":
+                print("UYARI: scipy bulunamadı, Sobol yerine Halton dizisi kullanılıyor ('pip install scipy').")
+            self.qmc = None
+            # Sabit bir başlangıç kayması: her çalıştırma dizinin farklı bir bölümünü kullanır
+            self.kayma = int(rng.integers(0, 1 << 20))
+        if yontem == "katmanli":
+            # ~toplam hücreli k x k ızgara; hücreler LCG permütasyonuyla karıştırılır (O(1) bellek)
+            self.k = max(1, math.isqrt(max(toplam - 1, 0)) + 1)
+            self.hucre = self.k * self.k
+            # i -> (a*i + c) mod M, gcd(a, M) = 1 olduğu sürece bir permütasyondur.
+            # a ≈ altın oran * M: ardışık indeksler ızgaraya düzgün dağılır.
+            self.lcg_a = int(self.hucre * 0.6180339887) | 1
+            while math.gcd(self.lcg_a, self.hucre) != 1:
+                self.lcg_a += 2
+            self.lcg_c = int(rng.integers(0, self.hucre))
+
+    def __call__(self, n):
+        baslangic, self.sira = self.sira, self.sira + n
+        if self.yontem == "rastgele":
+            return self.rng.random((n, 2))
+        if self.yontem == "katmanli":
+            i = np.arange(baslangic, baslangic + n, dtype=np.int64)
+            hucre = (i * self.lcg_a + self.lcg_c) % self.hucre
+            satir, sutun = np.divmod(hucre, self.k)
+            titresim = self.rng.random((n, 2))
+            return np.column_stack([(satir + titresim[:, 0]) / self.k, (sutun + titresim[:, 1]) / self.k])
+        if self.qmc is not None:
+            return self.qmc.random(n)
+        i = np.arange(baslangic, baslangic + n) + self.kayma + 1
+        return np.column_stack([_radikal_ters(i, 2), _radikal_ters(i, 3)])
+
+
+def grid_parcalari(toplam, yontem=ORNEKLEME, parca_boyutu=PARCA_BOYUTU,
+                   kutu=(LAT_MIN, LAT_MAX, LON_MIN, LON_MAX),
+                   baslangic=TARIH_BASLANGIC, bitis=TARIH_BITIS, bitkiler=None, tohum=TOHUM):
+    """{"lat", "lon", "date_iso", "plant"} NumPy dizisi parçaları üretir (bellek parça boyutuyla sınırlı)."""
+    bitkiler = np.array(bitkiler or BITKILER)
+    lat_min, lat_max, lon_min, lon_max = kutu
+    rng = np.random.default_rng(tohum)
+    ornekleyici = _BirimKareOrnekleyici(yontem, toplam, rng)
+    gun_sayisi = (bitis - baslangic).days  # [baslangic, bitis): bitiş günü hariç
+    t0 = np.datetime64(baslangic.isoformat(), "D")
+
+    uretilen = 0
+    while uretilen < toplam:
+        n = min(parca_boyutu, toplam - uretilen)
+        u = ornekleyici(n)
+        yield {
+            "lat": np.round(lat_min + u[:, 0] * (lat_max - lat_min), 5),
+            "lon": np.round(lon_min + u[:, 1] * (lon_max - lon_min), 5),
+            "date_iso": (t0 + rng.integers(0, gun_sayisi, n)).astype(str),
+            "plant": bitkiler[rng.integers(0, len(bitkiler), n)],
+        }
+        uretilen += n
+
+
+def grid_yaz(cikti, toplam, **kwargs):
+    """Parçaları CSV'ye (veya .parquet uzantısında Parquet'e) akış halinde yazar; satır sayısını döndürür."""
+    parquet = str(cikti).endswith(".parquet")
+    if parquet:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet çıktısı için 'pip install pyarrow' gerekli.")
+
+    alanlar = ["lat", "lon", "date_iso", "plant"]
+    yazilan = 0
+    yazici = None
+    f = None
+    try:
+        if not parquet:
+            f = open(cikti, "w", newline="", encoding="utf-8")
+            csv_yazici = csv.writer(f)
+            csv_yazici.writerow(alanlar)
+        for parca in grid_parcalari(toplam, **kwargs):
+            if parquet:
+                tablo = pa.table({a: parca[a] for a in alanlar})
+                if yazici is None:
+                    yazici = pq.ParquetWriter(cikti, tablo.schema)
+                yazici.write_table(tablo)
+            else:
+                # DictWriter çıktısıyla aynı biçim (yuvarlanmış float'ların repr'i), satır başına dict yok
+                csv_yazici.writerows(zip(*(parca[a].tolist() for a in alanlar)))
+            yazilan += len(parca["lat"])
+            print(f"-> {yazilan} satır üretildi...")
+    finally:
+        if yazici is not None:
+            yazici.close()
+        if f is not None:
+            f.close()
+    return yazilan
 
 
 def main():
     print(f"Büyük Veri Seti Oluşturuluyor: '{CIKTI_DOSYASI}'")
-    print(f"Hedef: {HEDEFLENEN_SATIR_SAYISI} satır | Kapsam: Tüm Şanlıurfa İli")
-
-    rows = []
-    # İlerleme çubuğu benzeri bir çıktı için
-    for i in range(HEDEFLENEN_SATIR_SAYISI):
-        lat = round(random.uniform(LAT_MIN, LAT_MAX), 5)
-        lon = round(random.uniform(LON_MIN, LON_MAX), 5)
-        d = random_date(TARIH_BASLANGIC, TARIH_BITIS)
-        plant = random.choice(BITKILER)
-
-        rows.append({
-            "lat": lat,
-            "lon": lon,
-            "date_iso": d.isoformat(),
-            "plant": plant
-        })
-
-        if (i + 1) % 5000 == 0:
-            print(f"-> {i + 1} satır üretildi...")
-
-    # CSV dosyasına yaz
-    try:
-        with open(CIKTI_DOSYASI, 'w', newline='', encoding='utf-8') as f:
-            fieldnames = ["lat", "lon", "date_iso", "plant"]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-
-            writer.writeheader()
-            writer.writerows(rows)
+    print(f"Hedef: {HEDEFLENEN_SATIR_SAYISI} satır | Kapsam: Tüm Şanlıurfa İli | Örnekleme: {ORNEKLEME}")
 
-        print(f"\nİŞLEM BAŞARILI: '{CIKTI_DOSYASI}' dosyası {len(rows)} satır ile hazır.")
+    t0 = time.perf_counter()
+    try:
+        yazilan = grid_yaz(CIKTI_DOSYASI, HEDEFLENEN_SATIR_SAYISI)
+        print(f"\nİŞLEM BAŞARILI: '{CIKTI_DOSYASI}' dosyası {yazilan} satır ile hazır "
+              f"({time.perf_counter() - t0:.1f} sn).")
         print("İpucu: Bu dosyayı 'dataset_olusturucu.py' içinde GRID_DOSYASI_PATH olarak tanımlamayı unutmayın.")
 
     except IOError as e:
@@ -81,4 +185,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
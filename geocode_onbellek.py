@@ -0,0 +1,69 @@
+"""
+geocode_onbellek.py — reverse geocoding sonuçları için kalıcı (SQLite) karo önbelleği.
+
+Koordinatlar `karo_derece` boyutunda karolara yuvarlanır; aynı karoya düşen tüm
+noktalar tek bir OpenCage sonucunu (country_code, admin) paylaşır.
+0.05° ≈ 5 km: il sınırına çok yakın noktalarda hassasiyeti artırmak için küçültün.
+"""
+
+import math
+import time
+import sqlite3
+import threading
+
+
+class GeocodeOnbellek:
+    def __init__(self, path="geocode_cache.sqlite", karo_derece=0.05, ttl_gun=180):
+        self.path = str(path)
+        self.karo_derece = float(karo_derece)
+        self.ttl_sn = ttl_gun * 86400 if ttl_gun else None
+        self.isabet = 0
+        self.iskalama = 0
+        self._kilit = threading.Lock()
+        # Async toplayıcı fetcher'ları thread'lerde çalıştırdığı için tek bağlantı + kilit
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            " karo TEXT PRIMARY KEY, country_code TEXT, admin TEXT, zaman REAL)"
+        )
+        self._db.commit()
+
+    def karo(self, lat, lon):
+        """Karo anahtarı; karo boyutu anahtara dahil, böylece farklı hassasiyetler çakışmaz."""
+        d = self.karo_derece
+        # round(): 38.8 / 0.05 = 775.9999... gibi kayan nokta hatalarını önler
+        return f"{d:g}:{math.floor(round(lat / d, 9))}:{math.floor(round(lon / d, 9))}"
+
+    def al(self, lat, lon):
+        """Önbellekte geçerli kayıt varsa (code, admin), yoksa None."""
+        with self._kilit:
+            row = self._db.execute(
+                "SELECT country_code, admin, zaman FROM geocode WHERE karo = ?",
+                (self.karo(lat, lon),),
+            ).fetchone()
+            if row is None or (self.ttl_sn and time.time() - row[2] > self.ttl_sn):
+                self.iskalama += 1
+                return None
+            self.isabet += 1
+            return row[0], row[1]
+
+    def koy(self, lat, lon, code, admin):
+        with self._kilit:
+            self._db.execute(
+                "INSERT OR REPLACE INTO geocode (karo, country_code, admin, zaman) VALUES (?, ?, ?, ?)",
+                (self.karo(lat, lon), code, admin, time.time()),
+            )
+            self._db.commit()
+
+    def temizle_suresi_dolanlar(self):
+        if not self.ttl_sn:
+            return 0
+        with self._kilit:
+            cur = self._db.execute("DELETE FROM geocode WHERE zaman < ?", (time.time() - self.ttl_sn,))
+            self._db.commit()
+            return cur.rowcount
+
+    def kapat(self):
+        with self._kilit:
+            self._db.close()
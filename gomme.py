@@ -0,0 +1,192 @@
+"""
+gomme.py — RAG yolu için önbellekli ve toplu gömme (embedding) katmanı.
+
+Çiftçiler gün boyu neredeyse aynı soruları sorar; her soru için Ollama'ya gitmek
+RAG yanıt süresinin en büyük kalemidir. Burada:
+  - Anahtar: model adı + normalize metin (Türkçe küçük harf, sade boşluk) SHA-256'sı
+  - Değer: float32 vektör baytları, boyut sınırlı disk LRU'da (disk_onbellek.DiskLRU)
+  - embed_many: tekrarları ayıklar, önbellekte olmayanları tek ollama.embed çağrısında
+    parti parti gönderir
+
+    gomucu = GommeKatmani()
+    vec = gomucu.embed("Biber ekimi için sıcaklık kaç derece olmalı?")
+    matris = gomucu.embed_many(sorular)              # (n, d) float32
+
+Bilgi bankasını (Veri.xlsx bitki satırları + verim serileri) gömmek için:
+    python gomme.py [koleksiyon] [qdrant_url]         # -> vektor_indeksi/<koleksiyon>.vidx (+ Qdrant)
+
+qdrant_url verilirse sunucudaki <koleksiyon> SİLİNİP yeniden oluşturulur (içeriği tamamen değişir).
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from disk_onbellek import DiskLRU, icerik_anahtari
+from turkce import tr_kucuk
+
+try:
+    import ollama
+except ImportError:
+    ollama = None
+    print("UYARI: 'ollama' kütüphanesi bulunamadı. Gömme için 'pip install ollama' komutuyla kurun.")
+
+GOMME_MODELI = os.getenv("GOMME_MODELI", "embeddinggemma")
+GOMME_ONBELLEK_PATH = os.getenv("GOMME_ONBELLEK_PATH", "embedding_cache.sqlite")
+GOMME_ONBELLEK_MB = int(os.getenv("GOMME_ONBELLEK_MB", "256"))
+GOMME_PARTI = int(os.getenv("GOMME_PARTI", "64"))  # Tek istekte gönderilen metin sayısı
+
+
+def gomme_anahtari(model, metin):
+    """Büyük/küçük harf ve boşluk farkı aynı önbellek kaydına düşer."""
+    return icerik_anahtari("gomme", model, tr_kucuk(metin))
+
+
+def _ollama_gom(model, metinler):
+    """Ollama'dan bir parti gömme. Yeni istemcide embed (liste girdi), eskisinde tek tek embeddings."""
+    if ollama is None:
+        raise RuntimeError("ollama kütüphanesi yüklü değil.")
+    if hasattr(ollama, "embed"):
+        return ollama.embed(model=model, input=list(metinler))["embeddings"]
+    return [ollama.embeddings(model=model, prompt=m)["embedding"] for m in metinler]
+
+
+class GommeKatmani:
+    def __init__(self, model=GOMME_MODELI, onbellek_path=GOMME_ONBELLEK_PATH, max_mb=GOMME_ONBELLEK_MB,
+                 parti=GOMME_PARTI, gomucu=None):
+        self.model = model
+        self.parti = parti
+        self.onbellek = DiskLRU(onbellek_path, max_mb) if onbellek_path else None
+        self._gomucu = gomucu or _ollama_gom  # (model, [metin]) -> [[float]]
+        self.istek_sayisi = 0
+        self.gomulen_metin = 0
+
+    def embed_many(self, metinler):
+        """Metin listesi -> (n, d) float32 matris (girdi sırasıyla)."""
+        metinler = list(metinler)
+        if not metinler:
+            return np.empty((0, 0), dtype=np.float32)
+        anahtarlar = [gomme_anahtari(self.model, m) for m in metinler]
+
+        # Aynı anahtar bir kez çözülür; önce önbellek
+        vektorler = {}
+        eksik = {}
+        for anahtar, metin in zip(anahtarlar, metinler):
+            if anahtar in vektorler or anahtar in eksik:
+                continue
+            kayit = self.onbellek.al(anahtar) if self.onbellek is not None else None
+            if kayit is not None:
+                vektorler[anahtar] = np.frombuffer(kayit, dtype=np.float32)
+            else:
+                eksik[anahtar] = metin
+
+        eksik_anahtarlar = list(eksik)
+        for i in range(0, len(eksik_anahtarlar), self.parti):
+            parti = eksik_anahtarlar[i:i + self.parti]
+            sonuc = self._gomucu(self.model, [eksik[a] for a in parti])
+            self.istek_sayisi += 1
+            self.gomulen_metin += len(parti)
+            for anahtar, vec in zip(parti, sonuc):
+                v = np.asarray(vec, dtype=np.float32)
+                vektorler[anahtar] = v
+                if self.onbellek is not None:
+                    self.onbellek.koy(anahtar, v.tobytes())
+
+        return np.vstack([vektorler[a] for a in anahtarlar])
+
+    def embed(self, metin):
+        return self.embed_many([metin])[0]
+
+    def ozet(self):
+        o = {"istek": self.istek_sayisi, "gomulen_metin": self.gomulen_metin}
+        if self.onbellek is not None:
+            o.update(isabet=self.onbellek.isabet, iskalama=self.onbellek.iskalama, kayit=len(self.onbellek))
+        return o
+
+    def kapat(self):
+        if self.onbellek is not None:
+            self.onbellek.kapat()
+
+
+_varsayilan = None
+
+
+def varsayilan_katman():
+    """Süreç genelinde paylaşılan katman (tek önbellek bağlantısı)."""
+    global _varsayilan
+    if _varsayilan is None:
+        _varsayilan = GommeKatmani()
+    return _varsayilan
+
+
+# ---------------------------
+# Bilgi bankası aktarımı
+# ---------------------------
+def _deger_metni(deger):
+    if isinstance(deger, dict) and "min" in deger:
+        lo, hi = deger["min"], deger["max"]
+        return f"{lo:g}" if lo == hi else f"{lo:g}-{hi:g}"
+    return str(deger)
+
+
+def bilgi_belgeleri(db):
+    """TarimBilgiBankasi -> test_rag payload biçiminde belgeler ({"kaynak", "tam_metin"})."""
+    belgeler = []
+    for ad, bilgi in db.bitki_bilgileri.items():
+        alanlar = "; ".join(f"{k}: {_deger_metni(v)}" for k, v in bilgi.items()
+                            if k not in ("tam_isim", "tur", "bilinmiyor"))
+        belgeler.append({"kaynak": "Veri.xlsx", "bitki": ad,
+                         "tam_metin": f"{ad} ({bilgi['tur']}) yetiştirme bilgileri: {alanlar}."})
+    tablo = db.verim_tablosu
+    for urun, yil, verim in zip(tablo["urun"].tolist(), tablo["yil"].tolist(), tablo["verim"].tolist()):
+        belgeler.append({"kaynak": "verimler.xls", "urun": urun, "yil": int(yil),
+                         "tam_metin": f"Şanlıurfa {urun} verimi {int(yil)} yılında {verim:g} kg/dekar."})
+    return belgeler
+
+
+def bilgi_bankasini_gom(db, koleksiyon="tarim_bilgi_bankasi", hedef_dizin="vektor_indeksi", katman=None):
+    """Belgeleri büyük partilerle gömüp yerel vektör indeksine (vektor_indeksi.py) yazar."""
+    from vektor_indeksi import YerelIstemci
+
+    katman = katman or varsayilan_katman()
+    belgeler = bilgi_belgeleri(db)
+    matris = katman.embed_many([b["tam_metin"] for b in belgeler])
+    return YerelIstemci(hedef_dizin).koleksiyon_yaz(koleksiyon, matris, belgeler)
+
+
+def qdrant_yukle(qdrant_client, koleksiyon, matris, belgeler, parti=512):
+    """
+    Aynı belgeleri Qdrant koleksiyonuna yükler. Koleksiyon varsa silinip kosinüs ile yeniden
+    oluşturulur: eski noktalar (0..N-1 dışındaki id'ler) aramaya karışmaz, gömme boyutu değişebilir.
+    """
+    from qdrant_client.models import Distance, PointStruct, VectorParams
+
+    if qdrant_client.collection_exists(koleksiyon):
+        qdrant_client.delete_collection(koleksiyon)
+    qdrant_client.create_collection(koleksiyon, vectors_config=VectorParams(size=matris.shape[1],
+                                                                             distance=Distance.COSINE))
+    for i in range(0, len(belgeler), parti):
+        qdrant_client.upsert(koleksiyon, points=[
+            PointStruct(id=j, vector=matris[j].tolist(), payload=belgeler[j])
+            for j in range(i, min(i + parti, len(belgeler)))
+        ])
+
+
+if __name__ == "__main__":
+    from bilgi_bankasi import TarimBilgiBankasi, VERI_DOSYASI_PATH, VERIM_DOSYASI_PATH
+
+    koleksiyon = sys.argv[1] if len(sys.argv) > 1 else "tarim_bilgi_bankasi"
+    t0 = time.perf_counter()
+    db = TarimBilgiBankasi(VERI_DOSYASI_PATH, VERIM_DOSYASI_PATH)
+    katman = varsayilan_katman()
+    indeks = bilgi_bankasini_gom(db, koleksiyon, katman=katman)
+    if len(sys.argv) > 2:
+        # İkinci argüman Qdrant adresi: sunucudaki koleksiyon bu gömmelerle değiştirilir
+        from qdrant_client import QdrantClient
+
+        belgeler = bilgi_belgeleri(db)
+        qdrant_yukle(QdrantClient(url=sys.argv[2]), koleksiyon,
+                     katman.embed_many([b["tam_metin"] for b in belgeler]), belgeler)
+    print(f"{koleksiyon}: {len(indeks)} belge gömüldü ({time.perf_counter() - t0:.1f} sn). {katman.ozet()}")
@@ -0,0 +1,177 @@
+"""
+gozlem_deposu.py — veri_topla ham gözlemleri için sütunlu (npz) depo.
+
+dataset_*.jsonl yalnızca üretilmiş {"input", "output"} metinlerini içerir; yorum
+kuralları değiştiğinde ham değerler (sıcaklık, nem, yağış, güneş, pH, konum) gerekir.
+Toplayıcı her örneği buraya da yazar; etiket_motoru.py bu depodan ağ çağrısı
+yapmadan yeni JSONL üretir:
+
+    python etiket_motoru.py gozlemler dataset_urfa_yeni.jsonl
+
+Depo bir dizindir; her parça sıkıştırılmış bir .npz dosyasıdır (sütun başına bir
+dizi). Parçalar os.replace ile atomik yazılır. KontrolNoktasi'na eşlik edecek
+şekilde (flush her checkpoint batch'inden önce) kullanılır; çökme sonrası tekrar
+toplanan noktalar okumada anahtara göre tekilleştirilir: en son yazılan gözlem kalır
+(parça numaraları ve parça içi sıra yazma sırasını izler; birlestir() bu sırayı korur).
+"""
+
+import os
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BICIM = 1
+SAYISAL = ["lat", "lon", "temperature", "humidity", "rain_mm", "solar_irr", "soil_ph", "soil_moisture"]
+METIN = ["date_iso", "plant", "admin_area"]
+
+
+class GozlemDeposu:
+    def __init__(self, dizin="gozlemler", parca_boyutu=5000):
+        self.dizin = Path(dizin)
+        self.dizin.mkdir(parents=True, exist_ok=True)
+        self.parca_boyutu = parca_boyutu  # birlestir() bu boyuttan küçük parçaları toplar
+        self._tampon = []
+        mevcut = self.parca_yollari()
+        self._sira = int(mevcut[-1].stem.split("_")[1]) + 1 if mevcut else 0
+
+    def parca_yollari(self):
+        return sorted(self.dizin.glob("parca_*.npz"))
+
+    def ekle(self, anahtar, sample):
+        """satir_anahtari ve harvest_point çıktısı dict'i tampona alır."""
+        self._tampon.append((anahtar, sample))
+
+    def flush(self):
+        """Tampondaki gözlemleri yeni bir parça olarak diske yazar."""
+        if not self._tampon:
+            return
+        anahtarlar = [a for a, _ in self._tampon]
+        ornekler = [s for _, s in self._tampon]
+        self._yaz(_sutunlara(anahtarlar, ornekler))
+        self._tampon = []
+
+    def _yaz(self, sutunlar):
+        yol = self.dizin / f"parca_{self._sira:06d}.npz"
+        gecici = yol.with_suffix(".tmp")
+        with open(gecici, "wb") as f:
+            np.savez_compressed(f, **sutunlar)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(gecici, yol)  # Yarım parça asla okunmaz
+        self._sira += 1
+        return yol
+
+    def birlestir(self):
+        """Küçük parçaları (checkpoint batch'leri) tek parçada toplar; silme yazmadan sonra yapılır."""
+        kucukler = [p for p in self.parca_yollari() if _satir_sayisi(p) < self.parca_boyutu]
+        if len(kucukler) < 2:
+            return 0
+        tablo = pd.concat([_oku(p) for p in kucukler], ignore_index=True)
+        self._yaz(_tablodan_sutunlara(tablo))
+        for p in kucukler:
+            p.unlink()
+        return len(kucukler)
+
+    def parcalar(self, tekil=True):
+        """
+        Parça parça DataFrame akışı (bellekte tek parça), yazma sırasıyla.
+        tekil: aynı anahtarın en son yazılanı kalır (çökme sonrası tekrar toplanan nokta eskisini ezer).
+        """
+        yollar = self.parca_yollari()
+        maskeler = _son_kayit_maskeleri(yollar) if tekil else {}
+        for yol in yollar:
+            df = _oku(yol)
+            if tekil:
+                df = df[maskeler[yol]]
+            if len(df):
+                yield df
+
+    def tablo(self):
+        parcalar = list(self.parcalar())
+        if not parcalar:
+            return _oku_bos()
+        return pd.concat(parcalar, ignore_index=True)
+
+    def kapat(self):
+        self.flush()
+        self.birlestir()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.kapat()
+
+
+# ---------------------------
+# Sütun dönüşümleri
+# ---------------------------
+def _sutunlara(anahtarlar, ornekler):
+    """dict listesi -> npz sütunları. Tam sayı sütunlar (WeatherAPI nemi gibi) işaretlenir."""
+    sutunlar = {"bicim": np.array(BICIM), "anahtar": np.array(anahtarlar, dtype=str)}
+    for col in SAYISAL:
+        degerler = [s.get(col) for s in ornekler]
+        sutunlar[col] = np.array([np.nan if v is None else v for v in degerler], dtype=np.float64)
+        # Tamamı boş sütun da "tam" sayılır; birleştirmede dolu tam sayı parçalarla Int64 kalsın
+        sutunlar[f"{col}__tam"] = np.array(all(isinstance(v, (int, np.integer)) for v in degerler if v is not None))
+    for col in METIN:
+        sutunlar[col] = np.array(["" if s.get(col) is None else str(s.get(col)) for s in ornekler], dtype=str)
+        sutunlar[f"{col}__bos"] = np.array([s.get(col) is None for s in ornekler], dtype=bool)
+    # Hastalık nadiren dolu bir dict; JSON metni olarak saklanır
+    sutunlar["disease"] = np.array(
+        ["" if s.get("disease") is None else json.dumps(s["disease"], ensure_ascii=False) for s in ornekler],
+        dtype=str)
+    return sutunlar
+
+
+def _tablodan_sutunlara(df):
+    sutunlar = {"bicim": np.array(BICIM), "anahtar": df["anahtar"].to_numpy(dtype=str)}
+    for col in SAYISAL:
+        sutunlar[col] = df[col].astype("Float64").to_numpy(dtype=np.float64, na_value=np.nan)
+        sutunlar[f"{col}__tam"] = np.array(str(df[col].dtype) == "Int64")
+    for col in METIN:
+        bos = df[col].isna().to_numpy()
+        sutunlar[col] = np.where(bos, "", df[col].astype(object).to_numpy()).astype(str)
+        sutunlar[f"{col}__bos"] = bos
+    sutunlar["disease"] = np.array(
+        ["" if d is None else json.dumps(d, ensure_ascii=False) for d in df["disease"].tolist()], dtype=str)
+    return sutunlar
+
+
+def _oku(yol):
+    """npz parça -> etiket_motoru'nun beklediği tipli DataFrame."""
+    with np.load(yol, allow_pickle=False) as z:
+        if int(z["bicim"]) != BICIM:
+            raise ValueError(f"Desteklenmeyen gözlem parçası biçimi: {yol}")
+        df = pd.DataFrame({"anahtar": z["anahtar"].astype(object)})
+        for col in SAYISAL:
+            seri = pd.Series(z[col])
+            df[col] = seri.round().astype("Int64") if bool(z[f"{col}__tam"]) else seri
+        for col in METIN:
+            df[col] = pd.Series(z[col].astype(object)).mask(z[f"{col}__bos"], None)
+        df["disease"] = [json.loads(d) if d else None for d in z["disease"].tolist()]
+    return df
+
+
+def _son_kayit_maskeleri(yollar):
+    """Yalnızca anahtar sütunları, yeniden eskiye okunur: {yol: her anahtarın son kaydı için True maske}."""
+    gorulen = set()
+    maskeler = {}
+    for yol in reversed(yollar):
+        with np.load(yol, allow_pickle=False) as z:
+            anahtar = pd.Series(z["anahtar"].astype(object))
+        maske = ~anahtar.duplicated(keep="last") & ~anahtar.isin(gorulen)
+        gorulen.update(anahtar[maske].tolist())
+        maskeler[yol] = maske.to_numpy()
+    return maskeler
+
+
+def _oku_bos():
+    return pd.DataFrame(columns=["anahtar"] + SAYISAL + METIN + ["disease"])
+
+
+def _satir_sayisi(yol):
+    with np.load(yol, allow_pickle=False) as z:
+        return len(z["anahtar"])
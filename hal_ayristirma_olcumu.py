@@ -0,0 +1,102 @@
+"""
+hal_ayristirma_olcumu.py — hal sayfası ayrıştırıcılarının (lxml / bs4) hız karşılaştırması.
+
+Her sayfa için taramanın yaptığı işin tamamı ölçülür: ağaç kurma + ürün satırları +
+gizli alanlar + pager linkleri + aktif sayfa. İki ayrıştırıcının çıktıları da
+karşılaştırılır (farklıysa belirtilir).
+
+    HAL_HTML_DIZINI=hal_sayfalari HAL_MOD=paralel python hal_fiyatları.py   # sayfaları kaydet
+    python hal_ayristirma_olcumu.py hal_sayfalari [tekrar]
+
+Dizin verilmezse (veya boşsa) gerçek sayfa yapısını taklit eden sentetik sayfalar
+(büyük ViewState, iç içe pager tablosu, Türkçe karakterler) üretilir.
+"""
+
+import os
+import sys
+import time
+import base64
+import random
+import importlib
+
+hal = importlib.import_module("hal_fiyatları")
+
+
+def sentetik_sayfa(no, satir=20, viewstate_kb=200, tohum=0):
+    rng = random.Random(tohum + no)
+    viewstate = base64.b64encode(rng.randbytes(viewstate_kb * 768)).decode()
+    urunler = ["Domates", "Biber (Sivri)", "Patlıcan", "Salatalık", "Üzüm", "Çilek", "Şeftali", "İncir"]
+    govde = "".join(
+        f"<tr class='{'alt' if i % 2 else 'row'}'><td> {rng.choice(urunler)} </td><td>Çeşit {i}</td>"
+        f"<td>{rng.randint(5, 40)},00</td><td><span>{rng.randint(5, 80)},{rng.randint(0, 99):02d}</span></td>"
+        f"<td><!-- hacim -->{rng.randint(100, 9000)}</td><td>Kg</td></tr>"
+        for i in range(satir)
+    )
+    bas = (no - 1) // 10 * 10 + 1
+    linkler = "".join(
+        f"<td><span>{p}</span></td>" if p == no else
+        f"<td><a href=\"javascript:__doPostBack('ctl00$ctl37$g_1$gvFiyatlar','Page${p}')\">{p}</a></td>"
+        for p in range(bas, bas + 10)
+    ) + f"<td><a href=\"javascript:__doPostBack('ctl00$ctl37$g_1$gvFiyatlar','Page${bas + 10}')\">...</a></td>"
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Fiyat Detayları</title>"
+        "<script>var x = '<td>1</td>';</script></head><body><form method='post'>"
+        f"<input type='hidden' name='__VIEWSTATE' id='__VIEWSTATE' value='{viewstate}' />"
+        "<input type='hidden' name='__VIEWSTATEGENERATOR' id='__VIEWSTATEGENERATOR' value='A1B2C3D4' />"
+        f"<input type='hidden' name='__EVENTVALIDATION' id='__EVENTVALIDATION' value='{viewstate[:4000]}' />"
+        "<input name='ctl00$txtTarih' id='ctl00_txtTarih' value='17.10.2026' />"
+        "<div class='menu'>" + "<a href='/x'>bağlantı</a>" * 200 + "</div>"
+        "<table class='gridView' cellspacing='0'><tr><th>Ürün Adı</th><th>Ürün Cinsi</th><th>En Düşük</th>"
+        f"<th>Ortalama</th><th>Hacim</th><th>Birim</th></tr>{govde}"
+        f"<tr class='pager'><td colspan='6'><table><tr>{linkler}</tr></table></td></tr></table>"
+        "</form></body></html>"
+    ).encode("utf-8")
+
+
+def sayfayi_isle(content, ayristirici):
+    doc = hal.sayfa_ayristir(content, ayristirici)
+    return (hal.parse_rows(doc), hal.get_hidden_payload(doc), hal.sayfa_linkleri(doc),
+            hal.aktif_sayfa(doc), hal.sayfa_tarihi(doc))
+
+
+def olc(sayfalar, ayristirici, tekrar=3):
+    """En iyi turun sayfa/sn değeri ve son turun çıktıları."""
+    en_iyi = float("inf")
+    for _ in range(tekrar):
+        t0 = time.perf_counter()
+        ciktilar = [sayfayi_isle(s, ayristirici) for s in sayfalar]
+        en_iyi = min(en_iyi, time.perf_counter() - t0)
+    return len(sayfalar) / en_iyi, ciktilar
+
+
+if __name__ == "__main__":
+    dizin = sys.argv[1] if len(sys.argv) > 1 else None
+    tekrar = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    dosyalar = sorted(os.path.join(dizin, f) for f in os.listdir(dizin) if f.endswith(".html")) \
+        if dizin and os.path.isdir(dizin) else []
+    if dosyalar:
+        sayfalar = []
+        for yol in dosyalar:
+            with open(yol, "rb") as f:
+                sayfalar.append(f.read())
+        kaynak = f"{dizin} ({len(sayfalar)} kayıtlı sayfa)"
+    else:
+        sayfalar = [sentetik_sayfa(n) for n in range(1, 41)]
+        kaynak = f"sentetik ({len(sayfalar)} sayfa)"
+    boyut = sum(map(len, sayfalar)) / len(sayfalar) / 1024
+    print(f"Kaynak: {kaynak}, ortalama {boyut:.0f} KB/sayfa")
+
+    sonuclar = {}
+    for ayristirici in ("bs4", "lxml"):
+        if ayristirici == "lxml" and hal.etree is None:
+            print("lxml kurulu değil, atlandı.")
+            continue
+        hiz, ciktilar = olc(sayfalar, ayristirici, tekrar)
+        sonuclar[ayristirici] = (hiz, ciktilar)
+        satir = sum(len(c[0]) for c in ciktilar)
+        print(f"  {ayristirici:<5} {hiz:8.1f} sayfa/sn  ({satir} satır)")
+
+    if len(sonuclar) == 2:
+        (hb, cb), (hl, cl) = sonuclar["bs4"], sonuclar["lxml"]
+        ayni = cb == cl
+        print(f"  lxml / bs4 = {hl / hb:.1f}x, çıktılar {'aynı' if ayni else 'FARKLI'}")
@@ -0,0 +1,120 @@
+"""
+hal_deposu.py — hal.gov.tr fiyatları için yerel SQLite deposu (artımlı senkronizasyon).
+
+  fiyat: (name, variety, date) anahtarlı upsert. Değeri değişmeyen satır yeniden
+         yazılmaz; aynı gün tekrar çekmek deposu büyütmez.
+  sayfa: son senkronizasyonda her sayfanın içerik özeti (SHA-256). Özeti aynı kalan
+         sayfa yeniden yazılmaz; ilk sayfalar değişmemişse tarama hiç başlamaz.
+  durum: anahtar / değer (ör. "eksik": son senkronizasyon sayfa atladıysa "1").
+
+    depo = HalDeposu("hal_fiyatlari.sqlite")
+    depo.upsert([(name, variety, price, unit), ...], "2026-10-18")
+    depo.guncel_fiyatlar()       # ürün başına en son tarihli satır
+"""
+
+import time
+import sqlite3
+import threading
+
+
+class HalDeposu:
+    def __init__(self, path="hal_fiyatlari.sqlite"):
+        self.path = str(path)
+        self._kilit = threading.Lock()
+        # Paralel tarama oturumları aynı depoya yazar: tek bağlantı + kilit
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fiyat ("
+            " name TEXT NOT NULL, variety TEXT NOT NULL, date TEXT NOT NULL,"
+            " price REAL, unit TEXT, guncelleme REAL,"
+            " PRIMARY KEY (name, variety, date)) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sayfa ("
+            " sayfa INTEGER PRIMARY KEY, ozet TEXT, date TEXT, guncelleme REAL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS durum (anahtar TEXT PRIMARY KEY, deger TEXT)")
+        self._db.commit()
+
+    def upsert(self, satirlar, tarih):
+        """[(name, variety, price, unit)] -> eklenen veya değeri değişen satır sayısı."""
+        simdi = time.time()
+        with self._kilit:
+            once = self._db.total_changes
+            self._db.executemany(
+                "INSERT INTO fiyat (name, variety, date, price, unit, guncelleme) VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (name, variety, date) DO UPDATE SET"
+                " price = excluded.price, unit = excluded.unit, guncelleme = excluded.guncelleme"
+                " WHERE price IS NOT excluded.price OR unit IS NOT excluded.unit",
+                [(n, v, tarih, p, u, simdi) for n, v, p, u in satirlar],
+            )
+            self._db.commit()
+            return self._db.total_changes - once
+
+    # ---------------------------
+    # Sayfa özetleri (değişmeyen sayfa tespiti)
+    # ---------------------------
+    def sayfa_ozetleri(self):
+        """{sayfa: ozet} (son senkronizasyon)."""
+        with self._kilit:
+            return dict(self._db.execute("SELECT sayfa, ozet FROM sayfa").fetchall())
+
+    def sayfa_kaydet(self, sayfa, ozet, tarih):
+        with self._kilit:
+            self._db.execute("INSERT OR REPLACE INTO sayfa (sayfa, ozet, date, guncelleme) VALUES (?, ?, ?, ?)",
+                             (sayfa, ozet, tarih, time.time()))
+            self._db.commit()
+
+    def sayfalari_kirp(self, son_sayfa):
+        """Liste kısaldıysa son_sayfa'dan sonraki eski özetler silinir."""
+        with self._kilit:
+            self._db.execute("DELETE FROM sayfa WHERE sayfa > ?", (son_sayfa,))
+            self._db.commit()
+
+    def sayfalari_sil(self, sayfalar):
+        """Alınamayan sayfaların özetleri silinir (bir sonraki senkronizasyonda yeniden yazılır)."""
+        with self._kilit:
+            self._db.executemany("DELETE FROM sayfa WHERE sayfa = ?", [(n,) for n in sayfalar])
+            self._db.commit()
+
+    def durum_kaydet(self, anahtar, deger):
+        with self._kilit:
+            self._db.execute("INSERT OR REPLACE INTO durum (anahtar, deger) VALUES (?, ?)", (anahtar, deger))
+            self._db.commit()
+
+    def durum_oku(self, anahtar):
+        with self._kilit:
+            satir = self._db.execute("SELECT deger FROM durum WHERE anahtar = ?", (anahtar,)).fetchone()
+        return satir[0] if satir else None
+
+    # ---------------------------
+    # Okuma
+    # ---------------------------
+    def guncel_fiyatlar(self):
+        """Ürün (name, variety) başına en son tarihli satır: [(name, variety, date, price, unit)]."""
+        with self._kilit:
+            return self._db.execute(
+                "SELECT f.name, f.variety, f.date, f.price, f.unit FROM fiyat f"
+                " JOIN (SELECT name, variety, MAX(date) AS date FROM fiyat GROUP BY name, variety) s"
+                " USING (name, variety, date) ORDER BY f.name, f.variety"
+            ).fetchall()
+
+    def tarihler(self):
+        with self._kilit:
+            return [r[0] for r in self._db.execute("SELECT DISTINCT date FROM fiyat ORDER BY date")]
+
+    def tarih_fiyatlari(self, tarih):
+        """Bir günün satırları: [(name, variety, price, unit)]."""
+        with self._kilit:
+            return self._db.execute(
+                "SELECT name, variety, price, unit FROM fiyat WHERE date = ? ORDER BY name, variety", (tarih,)
+            ).fetchall()
+
+    def __len__(self):
+        with self._kilit:
+            return self._db.execute("SELECT COUNT(*) FROM fiyat").fetchone()[0]
+
+    def kapat(self):
+        with self._kilit:
+            self._db.close()
@@ -1,39 +1,140 @@
+"""
+hal_fiyatları.py — hal.gov.tr fiyat listesi (ASP.NET GridView) tarayıcısı.
+
+İki mod (HAL_MOD ortam değişkeni veya fetch_hal_prices(mod=...)):
+  - "sirali": tek oturum; her sayfa bir önceki sayfanın __VIEWSTATE'i ile istenir.
+  - "paralel": hal_senkronize(). Önce ilk HAL_DEGISMEDI_ESIGI sayfa çekilir. İçerik özetleri
+    son senkronizasyondakiyle aynıysa liste değişmemiştir ve tarama orada biter. Aksi halde
+    HAL_OTURUM kadar bağımsız oturum (ayrı çerez / ViewState) HAL_BLOK sayfalık ayrık
+    aralıkları paylaşır. Fiyatlar hal_deposu.HalDeposu'na (name, variety, date) ile upsert edilir.
+    Değişen günler fiyat_serisi.FiyatSerisi'ne eklenir. Dönen liste (trend, changeRate dahil)
+    serinin önceden hesaplanmış özetidir.
+
+Ayrıştırıcı (HAL_AYRISTIRICI): "lxml" sayfayı libxml2 ile ağaca çevirir ve yalnızca gridView
+satırlarını, pager linklerini ve üç gizli alanı XPath ile okur; "bs4" eski BeautifulSoup
+(html.parser) yoludur. Aşağıdaki fonksiyonların hepsi iki ağaç tipini de kabul eder.
+Karşılaştırma: python hal_ayristirma_olcumu.py [kayitli_html_dizini]
+"""
+
+import os
+import datetime
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from bs4 import BeautifulSoup
-import uuid
-import random
 import re
 import time
 
+import hiz_limiti
+from hal_deposu import HalDeposu
+from fiyat_serisi import FiyatSerisi, urun_kimligi
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+    print("UYARI: 'lxml' bulunamadı; hal sayfaları BeautifulSoup (html.parser) ile ayrıştırılacak.")
+
+HAL_URL = "https://www.hal.gov.tr/Sayfalar/FiyatDetaylari.aspx"
+HAL_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+HAL_MOD = os.getenv("HAL_MOD", "paralel")  # "paralel" | "sirali"
+HAL_DEPO_PATH = os.getenv("HAL_DEPO_PATH", "hal_fiyatlari.sqlite")
+HAL_OTURUM = int(os.getenv("HAL_OTURUM", "4"))  # Aynı anda açık bağımsız ASP.NET oturumu
+HAL_BLOK = int(os.getenv("HAL_BLOK", "50"))  # Bir oturumun tek seferde üstlendiği ardışık sayfa sayısı
+HAL_DEGISMEDI_ESIGI = int(os.getenv("HAL_DEGISMEDI_ESIGI", "3"))  # İlk kaç sayfa aynıysa tarama durur
+HAL_MAX_SAYFA = 6000
+HAL_SAYFA_DENEME = int(os.getenv("HAL_SAYFA_DENEME", "3"))  # Hata veren sayfa kaç temiz oturumla denenir
+HAL_AYRISTIRICI = os.getenv("HAL_AYRISTIRICI", "lxml")  # "lxml" | "bs4"
+HAL_SERI_DIZINI = os.getenv("HAL_SERI_DIZINI", "hal_serisi")  # Fiyat geçmişi ve trend özetleri
+HAL_HTML_DIZINI = os.getenv("HAL_HTML_DIZINI")  # Verilirse paralel moddaki sayfalar buraya kaydedilir
+GIZLI_ALANLAR = ('__VIEWSTATE', '__VIEWSTATEGENERATOR', '__EVENTVALIDATION')
+_SAYFA_LINKI = re.compile(r"__doPostBack\('([^']*)','Page\$(\d+)'\)")
+_TARIH = re.compile(r"(\d{1,2})[./](\d{1,2})[./](\d{4})")
+
+
+# ---------------------------
+# Ayrıştırma (BeautifulSoup veya lxml ağacı)
+# ---------------------------
+# ViewState öznitelikleri megabaytlarca olabilir: libxml2'nin 10 MB sınırı kaldırılır
+_LXML_PARSER = etree.HTMLParser(huge_tree=True) if etree is not None else None
+_GRIDVIEW = "//table[contains(concat(' ', normalize-space(@class), ' '), ' gridView ')]"
+if etree is not None:
+    # Derlenmiş XPath'ler: her sayfada yeniden derlenmez
+    _XP_GRIDVIEW = etree.XPath(_GRIDVIEW + "[1]")
+    _XP_SATIRLAR = etree.XPath("./tr | ./thead/tr | ./tbody/tr | ./tfoot/tr")
+    _XP_GIZLI = etree.XPath("//input[" + " or ".join(f"@id='{a}'" for a in GIZLI_ALANLAR) + "]")
+    _XP_POSTBACK = etree.XPath("//a[contains(@href, '__doPostBack')]/@href")
+    _XP_PAGER = etree.XPath(_GRIDVIEW + "[1]//a[contains(@href, 'Page$')][1]/ancestor::tr[1]")
+    _XP_INPUT = etree.XPath("//input")
+
+
+def sayfa_ayristir(content, ayristirici=None):
+    """Yanıt gövdesi -> lxml kök elemanı veya BeautifulSoup (ayristirici: "lxml" | "bs4")."""
+    if (ayristirici or HAL_AYRISTIRICI) == "lxml" and etree is not None:
+        if not content.strip():
+            content = b"<html></html>"
+        try:
+            # BeautifulSoup gibi önce UTF-8; olmazsa libxml2 meta charset'e bakar
+            content = content.decode("utf-8") if isinstance(content, bytes) else content
+        except UnicodeDecodeError:
+            pass
+        return etree.fromstring(content, _LXML_PARSER)
+    return BeautifulSoup(content, 'html.parser')
+
+
+def _lxml_mu(doc):
+    return etree is not None and isinstance(doc, etree._Element)
+
+
+def _metin(td):
+    # get_text(strip=True) ile aynı: her metin parçası kırpılıp bitişik birleştirilir
+    return "".join(t.strip() for t in td.itertext())
+
 
 def get_hidden_payload(soup):
     """
     ASP.NET sayfaları için gerekli hidden field'ları (ViewState vb.) toplar.
     """
+    if _lxml_mu(soup):
+        payload = {}
+        for inp in _XP_GIZLI(soup):
+            payload.setdefault(inp.get('id'), inp.get('value'))
+        return payload
     payload = {}
-    for item in ['__VIEWSTATE', '__VIEWSTATEGENERATOR', '__EVENTVALIDATION']:
+    for item in GIZLI_ALANLAR:
         element = soup.find('input', {'id': item})
         if element:
             payload[item] = element.get('value')
     return payload
 
 
-def parse_products_from_soup(soup):
+def parse_rows(soup):
     """
-    Verilen HTML içeriğindeki (soup) tabloyu bulur ve ürünleri listeye çevirir.
+    GridView tablosundaki ürün satırları -> [(name, variety, price, unit)].
     """
+    if _lxml_mu(soup):
+        return _parse_rows_lxml(soup)
     # GridView tablosunu bul (class='gridView' genellikle sabittir)
     table = soup.find("table", {"class": "gridView"})
 
     if not table:
         return []
 
-    products = []
+    satirlar = []
     rows = table.find_all("tr")
 
     # İlk satır başlık olduğu için atlıyoruz
     for row in rows[1:]:
-        cols = row.find_all("td")
+        # Pager'ın iç tablosundaki satırlar (sayfa numaraları) ürün değildir
+        if row.find_parent("table") is not table:
+            continue
+        cols = row.find_all("td", recursive=False)
         # Paginasyon satırını veya boş satırları atla
         if len(cols) < 6:
             continue
@@ -48,32 +149,340 @@ def parse_products_from_soup(soup):
         except:
             price = 0.0
 
-        # Trend ve Değişim Oranı (Simülasyon - Sitede olmadığı için)
-        trend_options = ["up", "down", "stable"]
-        trend = random.choice(trend_options)
-        change_rate = round(random.uniform(0.1, 5.0), 1) if trend != "stable" else 0.0
-
-        item = {
-            "id": str(uuid.uuid4()),
-            "name": f"{name} ({variety})",
-            "price": price,
-            "unit": unit,
-            "trend": trend,
-            "changeRate": change_rate
-        }
-        products.append(item)
-    return products
-
-
-def fetch_hal_prices():
-    url = "https://www.hal.gov.tr/Sayfalar/FiyatDetaylari.aspx"
-
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-        "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
+        satirlar.append((name, variety, price, unit))
+    return satirlar
+
+
+def _parse_rows_lxml(root):
+    tablolar = _XP_GRIDVIEW(root)
+    if not tablolar:
+        return []
+    satirlar = []
+    # Yalnızca tablonun kendi satırları (pager'ın iç tablosu hariç); ilki başlık
+    for row in _XP_SATIRLAR(tablolar[0])[1:]:
+        cols = row.findall("td")
+        if len(cols) < 6:
+            continue
+        try:
+            price = float(_metin(cols[3]).replace(",", "."))
+        except ValueError:
+            price = 0.0
+        satirlar.append((_metin(cols[0]), _metin(cols[1]), price, _metin(cols[5])))
+    return satirlar
+
+
+def parse_products_from_soup(soup):
+    """
+    Verilen HTML içeriğindeki (soup) tabloyu bulur ve ürünleri listeye çevirir.
+    """
+    return [_urun(*satir) for satir in parse_rows(soup)]
+
+
+def _urun(name, variety, price, unit, trend="stable", change_rate=0.0):
+    # id kararlıdır (ad + cins + birim); trend / değişim fiyat_serisi özetinden gelir
+    return {
+        "id": urun_kimligi(name, variety, unit),
+        "name": f"{name} ({variety})",
+        "price": price,
+        "unit": unit,
+        "trend": trend,
+        "changeRate": change_rate
     }
 
+
+def trend_ekle(urunler, seri=None):
+    """Ürünlere fiyat serisinin önceden hesaplanmış trend / değişim değerlerini işler."""
+    ozet = (seri if seri is not None else FiyatSerisi(HAL_SERI_DIZINI)).ozet()
+    if ozet:
+        kayitlar = {k["id"]: k for k in ozet["urunler"]}
+        for urun in urunler:
+            kayit = kayitlar.get(urun["id"])
+            if kayit:
+                urun["trend"], urun["changeRate"] = kayit["trend"], kayit["changeRate"]
+    return urunler
+
+
+def sayfa_ozeti(satirlar, tarih=""):
+    """
+    Sayfadaki satırların ve liste tarihinin içerik özeti (aynı gün, aynı fiyatlar -> aynı özet).
+    Tarih dahildir: fiyatlar dünküyle aynı olsa da yeni gün seriye "değişmedi" olarak yazılır.
+    """
+    h = hashlib.sha256(tarih.encode("utf-8"))
+    for satir in satirlar:
+        h.update("\x1f".join(map(str, satir)).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+def sayfa_linkleri(soup):
+    """Paginasyon linkleri -> (event_target, {görünen sayfa numaraları})."""
+    if _lxml_mu(soup):
+        hrefler = _XP_POSTBACK(soup)
+    else:
+        hrefler = [link.get('href') for link in soup.find_all('a', href=re.compile(r"__doPostBack"))]
+    hedef, sayfalar = None, set()
+    for href in hrefler:
+        match = _SAYFA_LINKI.search(href or "")
+        if match:
+            hedef = hedef or match.group(1)
+            sayfalar.add(int(match.group(2)))
+    return hedef, sayfalar
+
+
+def aktif_sayfa(soup):
+    """Pager satırındaki link olmayan (span) sayfa numarası; pager yoksa None."""
+    if _lxml_mu(soup):
+        pager = _XP_PAGER(soup)
+        for span in pager[0].iter("span") if pager else []:
+            metin = _metin(span)
+            if metin.isdigit():
+                return int(metin)
+        return None
+    table = soup.find("table", {"class": "gridView"})
+    link = table.find('a', href=_SAYFA_LINKI) if table else None
+    pager = link.find_parent("tr") if link else None
+    if pager is None:
+        return None
+    for span in pager.find_all("span"):
+        metin = span.get_text(strip=True)
+        if metin.isdigit():
+            return int(metin)
+    return None
+
+
+def sayfa_tarihi(soup):
+    """Listenin tarihi (id'sinde Tarih/Date geçen input); bulunamazsa bugün. ISO biçiminde."""
+    girdiler = _XP_INPUT(soup) if _lxml_mu(soup) else soup.find_all('input')
+    for inp in girdiler:
+        kimlik = (inp.get('id') or inp.get('name') or "").lower()
+        if "tarih" in kimlik or "date" in kimlik:
+            match = _TARIH.search(inp.get('value') or "")
+            if match:
+                g, a, y = map(int, match.groups())
+                return datetime.date(y, a, g).isoformat()
+    return datetime.date.today().isoformat()
+
+
+# ---------------------------
+# Paralel mod: bağımsız oturumlar
+# ---------------------------
+class HalOturumu:
+    """
+    Kendi çerezi ve ViewState'i olan tek bir ASP.NET oturumu.
+    git(n): n görünen linklerdeyse tek POST; değilse önce doğrudan Page$n denenir
+    (EventValidation reddederse bir daha denenmez), sonra pager üzerinden ileri atlanır.
+    """
+
+    def __init__(self, url=HAL_URL):
+        self.url = url
+        self.session = requests.Session()
+        self.session.headers.update(HAL_HEADERS)
+        self.soup = None
+        self.sayfa = None
+        self.event_target = None
+        self.dogrudan_atlama = None  # None: denenmedi
+        self.istek_sayisi = 0
+
+    def _yukle(self, response, beklenen):
+        response.raise_for_status()
+        self.istek_sayisi += 1
+        self.soup = sayfa_ayristir(response.content)
+        if HAL_HTML_DIZINI:
+            os.makedirs(HAL_HTML_DIZINI, exist_ok=True)
+            with open(os.path.join(HAL_HTML_DIZINI, f"sayfa_{beklenen:05d}.html"), "wb") as f:
+                f.write(response.content)
+        hedef, _ = sayfa_linkleri(self.soup)
+        self.event_target = hedef or self.event_target
+        self.sayfa = aktif_sayfa(self.soup) or beklenen
+        return self.soup
+
+    def baslat(self):
+        return self._yukle(hiz_limiti.istek("hal", self.session.get, self.url, timeout=15), 1)
+
+    def _post(self, n, deneme=3):
+        payload = get_hidden_payload(self.soup)
+        payload['__EVENTTARGET'] = self.event_target
+        payload['__EVENTARGUMENT'] = f'Page${n}'
+        return self._yukle(hiz_limiti.istek("hal", self.session.post, self.url, data=payload, timeout=15,
+                                            deneme=deneme), n)
+
+    def git(self, n):
+        """n. sayfanın soup'u; liste n'den kısaysa None."""
+        if self.soup is None:
+            self.baslat()
+        while self.sayfa != n:
+            _, gorunen = sayfa_linkleri(self.soup)
+            if n in gorunen:
+                self._post(n)
+                return self.soup if self.sayfa == n else None
+            if self.dogrudan_atlama is not False and self.event_target and n > self.sayfa:
+                try:
+                    self._post(n, deneme=1)  # Reddedilirse tekrar denemeye gerek yok
+                except requests.RequestException:
+                    self.dogrudan_atlama = False
+                    self.baslat()
+                    continue
+                if self.sayfa == n:
+                    self.dogrudan_atlama = True
+                    return self.soup
+                if not any(p > self.sayfa for p in sayfa_linkleri(self.soup)[1]):
+                    return None  # Sunucu son sayfayı döndürdü: liste n'den kısa
+                self.dogrudan_atlama = False
+                continue
+            ileri = [p for p in gorunen if self.sayfa < p < n]
+            if n < self.sayfa or not ileri:
+                return None  # Geri gitme gerekmez (bloklar artan sırada); ileri link yoksa liste bitti
+            self._post(max(ileri))
+        return self.soup
+
+
+def hal_senkronize(depo=None, oturum_sayisi=HAL_OTURUM, blok=HAL_BLOK, esik=HAL_DEGISMEDI_ESIGI,
+                   max_sayfa=HAL_MAX_SAYFA, oturum_fabrikasi=HalOturumu, sayfa_deneme=HAL_SAYFA_DENEME):
+    """
+    Artımlı senkronizasyon. Dönüş: {"sayfa", "degisen_sayfa", "yazilan_satir", "eksik_sayfa",
+    "erken_durdu", "sure_sn"}. Hata veren sayfanın aralığı kuyruğa geri konur ve yeni bir oturumla
+    sayfa_deneme kez denenir; yine alınamayan sayfalar "eksik_sayfa"dadır. Eksik kalan bir
+    senkronizasyondan sonra sayfa özetlerine güvenilmez: sonraki çalıştırma erken durmaz.
+    """
+    t0 = time.perf_counter()
+    kendi_deposu = depo is None
+    if kendi_deposu:
+        depo = HalDeposu(HAL_DEPO_PATH)
+    eski = depo.sayfa_ozetleri()
+    onceki_eksik = depo.durum_oku("eksik") == "1"
+    kilit = threading.Lock()
+    # iade: hata yüzünden yarım kalan (baş, son hariç, deneme) aralıkları
+    durum = {"sonraki": 1, "son_sayfa": max_sayfa, "sayfa": 0, "degisen": 0, "yazilan": 0,
+             "iade": [], "eksik": []}
+
+    def isle(n, soup, onceki_ozet):
+        """Sayfayı depoya yazar; (özet, liste bitti mi)."""
+        satirlar = parse_rows(soup) if soup is not None else []
+        tarih = sayfa_tarihi(soup) if satirlar else None
+        ozet = sayfa_ozeti(satirlar, tarih) if satirlar else None
+        # Boş sayfa veya önceki sayfanın tekrarı (ASP.NET son sayfayı tekrar döndürür): liste bitti
+        if not satirlar or ozet == onceki_ozet:
+            with kilit:
+                durum["son_sayfa"] = min(durum["son_sayfa"], n - 1)
+            return ozet, True
+        with kilit:
+            durum["sayfa"] += 1
+        if eski.get(n) != ozet:
+            yazilan = depo.upsert(satirlar, tarih)
+            depo.sayfa_kaydet(n, ozet, tarih)
+            with kilit:
+                durum["degisen"] += 1
+                durum["yazilan"] += yazilan
+        return ozet, False
+
+    def hata(n, son, deneme, e):
+        """n'den itibaren yarım kalan aralığı geri koyar (deneme hakkı bittiyse n eksik sayılır)."""
+        print(f"Hal sayfa {n} hatası ({deneme + 1}/{sayfa_deneme}): {e}")
+        with kilit:
+            if deneme + 1 < sayfa_deneme:
+                durum["iade"].append((n, son, deneme + 1))
+            else:
+                durum["eksik"].append(n)
+                if n + 1 < son:
+                    durum["iade"].append((n + 1, son, 0))
+
+    # 1. Yoklama: ilk sayfalar son senkronizasyondakiyle aynıysa liste güncellenmemiştir
+    yoklayici = oturum_fabrikasi()
+    onceki = None
+    ayni = 0
+    yoklama_tamam = True
+    for n in range(1, esik + 1):
+        try:
+            soup = yoklayici.git(n)
+        except requests.RequestException as e:
+            hata(n, esik + 1, 0, e)
+            yoklayici = oturum_fabrikasi()
+            yoklama_tamam = False
+            break
+        ozet, bitti = isle(n, soup, onceki)
+        if bitti:
+            break
+        ayni += eski.get(n) == ozet
+        onceki = ozet
+    erken = yoklama_tamam and ayni == esik and not onceki_eksik
+    if erken:
+        print(f"Hal: ilk {ayni} sayfa değişmemiş, tarama durduruldu.")
+    elif onceki_eksik and ayni == esik:
+        print("Hal: önceki senkronizasyon eksik kalmıştı, liste yeniden taranıyor.")
+    durum["sonraki"] = esik + 1
+
+    # 2. Paralel tarama: her oturum önce geri konan aralıkları, sonra sıradaki bloğu alır
+    def calisan(oturum):
+        while True:
+            with kilit:
+                if durum["iade"]:
+                    bas, son, deneme = durum["iade"].pop()
+                elif durum["sonraki"] <= durum["son_sayfa"]:
+                    bas, son, deneme = durum["sonraki"], durum["sonraki"] + blok, 0
+                    durum["sonraki"] += blok
+                else:
+                    return oturum.istek_sayisi
+            onceki = None
+            for n in range(bas, son):
+                if n > durum["son_sayfa"]:
+                    break
+                try:
+                    soup = oturum.git(n)
+                except requests.RequestException as e:
+                    hata(n, son, deneme, e)
+                    oturum = oturum_fabrikasi()  # ViewState / çerez bozulmuş olabilir: temiz oturum
+                    break
+                onceki, bitti = isle(n, soup, onceki)
+                if bitti:
+                    break
+
+    if not erken and (durum["son_sayfa"] > esik or durum["iade"]):
+        oturumlar = [yoklayici] + [oturum_fabrikasi() for _ in range(max(0, oturum_sayisi - 1))]
+        with ThreadPoolExecutor(max_workers=len(oturumlar)) as havuz:
+            list(havuz.map(calisan, oturumlar))
+    eksik = sorted(n for n in durum["eksik"] if n <= durum["son_sayfa"])
+    if not erken:
+        if eksik:
+            # Alınamayan sayfaların eski özetleri silinir; sonraki senkronizasyon erken durmaz
+            depo.sayfalari_sil(eksik)
+            print(f"UYARI: Hal senkronizasyonu eksik: {len(eksik)} sayfa alınamadı ({eksik[:10]}...).")
+        elif durum["son_sayfa"] < max_sayfa:
+            depo.sayfalari_kirp(durum["son_sayfa"])
+        depo.durum_kaydet("eksik", "1" if eksik else "0")
+
+    sonuc = {"sayfa": durum["sayfa"], "degisen_sayfa": durum["degisen"], "yazilan_satir": durum["yazilan"],
+             "eksik_sayfa": eksik, "erken_durdu": erken, "sure_sn": round(time.perf_counter() - t0, 2)}
+    if kendi_deposu:
+        depo.kapat()
+    return sonuc
+
+
+def depodan_urunler(depo):
+    """Depodaki güncel fiyatlar -> parse_products_from_soup biçiminde ürün listesi."""
+    return [_urun(name, variety, price, unit) for name, variety, _, price, unit in depo.guncel_fiyatlar()]
+
+
+def fetch_hal_prices(mod=HAL_MOD):
+    if mod == "paralel":
+        depo = HalDeposu(HAL_DEPO_PATH)
+        try:
+            ozet = hal_senkronize(depo)
+            print(f"Hal senkronizasyonu: {ozet}")
+            seri = FiyatSerisi(HAL_SERI_DIZINI)
+            if ozet["yazilan_satir"] or seri.ozet() is None:
+                seri.depodan_aktar(depo)
+                seri.ozet_kaydet()
+            return seri.fiyat_ekrani()
+        except Exception as e:
+            # Sıralı modla aynı: hata yukarı fırlatılmaz, boş liste döner
+            print(f"Bir hata oluştu: {e}")
+            return []
+        finally:
+            depo.kapat()
+
+    url = HAL_URL
+    headers = HAL_HEADERS
+
     session = requests.Session()
     session.headers.update(headers)
     all_products = []
@@ -84,7 +493,7 @@ def fetch_hal_prices():
         # 1. İlk Sayfayı Çek (GET)
         response = session.get(url, timeout=15)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = sayfa_ayristir(response.content)
 
         # İlk sayfa verilerini al
         page_products = parse_products_from_soup(soup)
@@ -94,17 +503,7 @@ def fetch_hal_prices():
         # 2. Paginasyon ID'sini bul (Event Target)
         # Genellikle javascript:__doPostBack('...$gvFiyatlar','Page$2') şeklindedir
         # HTML içinde __doPostBack içeren bir link arıyoruz.
-        event_target = None
-        pagination_links = soup.find_all('a', href=re.compile(r"__doPostBack"))
-
-        for link in pagination_links:
-            href = link.get('href')
-            if "Page$" in href:
-                # Regex ile hedef ID'yi çıkar: __doPostBack('HEDEF_ID','ARGUMAN')
-                match = re.search(r"__doPostBack\('([^']*)','Page\$\d+'\)", href)
-                if match:
-                    event_target = match.group(1)
-                    break
+        event_target, _ = sayfa_linkleri(soup)
 
         if not event_target:
             print("Paginasyon hedefi bulunamadı veya tek sayfa var.")
@@ -113,7 +512,7 @@ def fetch_hal_prices():
         # 3. Diğer Sayfaları Gez (POST)
         # Örnek olarak 5 sayfa gezilecek şekilde sınır koyuyorum.
         # İsterseniz range(2, 20) yapabilirsiniz.
-        for page_num in range(2,6000):
+        for page_num in range(2, HAL_MAX_SAYFA):
             print(f"Sayfa {page_num} çekiliyor...")
 
             # Önceki sayfadan alınan ViewState verilerini hazırla
@@ -126,7 +525,7 @@ def fetch_hal_prices():
 
             # POST isteği at
             response = session.post(url, data=payload, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = sayfa_ayristir(response.content)
 
             new_products = parse_products_from_soup(soup)
 
@@ -147,7 +546,7 @@ def fetch_hal_prices():
             time.sleep(1)
 
         print(f"Bitti! Toplam {len(all_products)} ürün toplandı.")
-        return all_products
+        return trend_ekle(all_products)
 
     except Exception as e:
         print(f"Bir hata oluştu: {e}")
@@ -170,4 +569,4 @@ if __name__ == "__main__":
 
     for p in data[-5:]:
         print(f"{p['name']:<40} | {p['price']} TL")
-    print("-" * 60)
\ No newline at end of file
+    print("-" * 60)
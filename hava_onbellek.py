@@ -0,0 +1,202 @@
+"""
+hava_onbellek.py — NASA POWER ve Open-Meteo arşivi için tarih aralığı toplu önbelleği.
+
+Gün gün (start == end) istek atmak yerine her konum karosu için 2020–2025 arası
+günlük seri tek istekte çekilir ve karo başına sıkıştırılmış .npz (sütun başına bir
+dizi) olarak saklanır. Satır sorgusu: dizi[(tarih - baslangic).days].
+
+Karo çekilemezse hata HAVA_HATA_BEKLEME_SN boyunca bellekte tutulur; o karodaki sonraki
+satırlar 2020–2025 isteğini tekrarlamadan doğrudan tekil isteğe düşer (kesintide istek çoğalmaz).
+
+Toplu ön yükleme (grid'deki tüm karolar):
+    python hava_onbellek.py grid_urfa_genis.csv
+"""
+
+import os
+import sys
+import csv
+import math
+import time
+import datetime
+import threading
+from pathlib import Path
+
+import numpy as np
+
+import hiz_limiti
+import http_istemci
+
+NASA_URL = os.getenv("NASA_POWER_API_URL", "https://power.larc.nasa.gov/api")
+OPEN_METEO_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+
+# kaynak -> çekilen günlük değişkenler
+KAYNAKLAR = {
+    "nasa_power": ["ALLSKY_SFC_SW_DWN"],
+    "open_meteo": ["temperature_2m_max", "temperature_2m_min", "precipitation_sum"],
+}
+NASA_FILL = -999.0
+HAVA_HATA_BEKLEME_SN = float(os.getenv("HAVA_HATA_BEKLEME_SN", "300"))  # Başarısız karo bu süre tekrar çekilmez
+
+
+def _nasa_seri(lat, lon, bas, bit, degiskenler):
+    params = {
+        "latitude": lat,
+        "longitude": lon,
+        "community": "ag",
+        "parameters": ",".join(degiskenler),
+        "start": bas.strftime("%Y%m%d"),
+        "end": bit.strftime("%Y%m%d"),
+        "format": "JSON",
+    }
+    r = hiz_limiti.istek("nasa_power", http_istemci.get, f"{NASA_URL}/temporal/daily/point", params=params, timeout=90)
+    r.raise_for_status()
+    parametre = r.json().get("properties", {}).get("parameter", {})
+    gun_sayisi = (bit - bas).days + 1
+    sonuc = {}
+    for ad in degiskenler:
+        dizi = np.full(gun_sayisi, np.nan, dtype=np.float32)
+        for ymd, val in (parametre.get(ad) or {}).items():
+            i = (datetime.datetime.strptime(ymd, "%Y%m%d").date() - bas).days
+            if 0 <= i < gun_sayisi and val is not None and val != NASA_FILL:
+                dizi[i] = val
+        sonuc[ad] = dizi
+    return sonuc
+
+
+def _open_meteo_seri(lat, lon, bas, bit, degiskenler):
+    params = {
+        "latitude": lat, "longitude": lon,
+        "start_date": bas.isoformat(), "end_date": bit.isoformat(),
+        "daily": ",".join(degiskenler),
+        "timezone": "auto",
+    }
+    r = hiz_limiti.istek("open_meteo", http_istemci.get, OPEN_METEO_ARCHIVE_URL, params=params, timeout=60)
+    r.raise_for_status()
+    daily = r.json().get("daily", {})
+    gun_sayisi = (bit - bas).days + 1
+    sonuc = {}
+    for ad in degiskenler:
+        dizi = np.full(gun_sayisi, np.nan, dtype=np.float32)
+        vals = daily.get(ad) or []
+        n = min(len(vals), gun_sayisi)
+        dizi[:n] = [np.nan if v is None else v for v in vals[:n]]
+        sonuc[ad] = dizi
+    return sonuc
+
+
+_CEKICILER = {"nasa_power": _nasa_seri, "open_meteo": _open_meteo_seri}
+
+
+class HavaSerisiDeposu:
+    def __init__(self, dizin="weather_cache", karo_derece=0.1,
+                 baslangic=datetime.date(2020, 1, 1), bitis=datetime.date(2025, 12, 31),
+                 hata_bekleme=HAVA_HATA_BEKLEME_SN):
+        self.dizin = Path(dizin)
+        self.karo_derece = float(karo_derece)
+        self.baslangic = baslangic
+        # Arşivler birkaç gün geriden gelir; geleceği istemeyelim
+        self.bitis = min(bitis, datetime.date.today() - datetime.timedelta(days=7))
+        self._seriler = {}  # (kaynak, karo) -> {değişken: np.ndarray}
+        self.hata_bekleme = float(hata_bekleme)
+        self._hatalar = {}  # (kaynak, karo) -> (monotonic zaman, hata); negatif önbellek
+        self._kilit = threading.Lock()
+        self._karo_kilitleri = {}
+        self.istek_sayisi = 0
+
+    def karo(self, lat, lon):
+        d = self.karo_derece
+        return math.floor(round(lat / d, 9)), math.floor(round(lon / d, 9))
+
+    def _dosya(self, kaynak, karo):
+        return self.dizin / kaynak / f"{self.karo_derece:g}_{karo[0]}_{karo[1]}.npz"
+
+    def seri_al(self, kaynak, lat, lon):
+        """
+        Karonun tüm günlük serisi; yoksa diskten yükler veya tek istekle çeker.
+        Karo yakın zamanda çekilemediyse istek atmadan RuntimeError fırlatır.
+        """
+        karo = self.karo(lat, lon)
+        anahtar = (kaynak, karo)
+        seri = self._seriler.get(anahtar)
+        if seri is not None:
+            return seri
+        self._hata_kontrol(anahtar)
+
+        with self._kilit:
+            karo_kilidi = self._karo_kilitleri.setdefault(anahtar, threading.Lock())
+        # Aynı karoyu iki thread'in birlikte çekmemesi için
+        with karo_kilidi:
+            seri = self._seriler.get(anahtar)
+            if seri is not None:
+                return seri
+            self._hata_kontrol(anahtar)  # Kilitte beklerken başka thread denemiş ve başaramamış olabilir
+            dosya = self._dosya(kaynak, karo)
+            if dosya.exists():
+                seri = self._diskten_yukle(kaynak, dosya)
+            if seri is None:
+                d = self.karo_derece
+                merkez_lat, merkez_lon = (karo[0] + 0.5) * d, (karo[1] + 0.5) * d
+                self.istek_sayisi += 1
+                try:
+                    seri = _CEKICILER[kaynak](merkez_lat, merkez_lon, self.baslangic, self.bitis, KAYNAKLAR[kaynak])
+                except Exception as e:
+                    self._hatalar[anahtar] = (time.monotonic(), e)
+                    raise
+                self._hatalar.pop(anahtar, None)
+                dosya.parent.mkdir(parents=True, exist_ok=True)
+                np.savez_compressed(dosya, baslangic=self.baslangic.isoformat(), **seri)
+            self._seriler[anahtar] = seri
+            return seri
+
+    def _hata_kontrol(self, anahtar):
+        kayit = self._hatalar.get(anahtar)
+        if kayit is not None and time.monotonic() - kayit[0] < self.hata_bekleme:
+            raise RuntimeError(f"{anahtar[0]} karosu {anahtar[1]} yakın zamanda alınamadı: {kayit[1]}")
+
+    def _diskten_yukle(self, kaynak, dosya):
+        """Kayıtlı seri aynı başlangıçla ve yeterli uzunlukta değilse None (yeniden çekilir)."""
+        gun_sayisi = (self.bitis - self.baslangic).days + 1
+        with np.load(dosya) as npz:
+            if str(npz["baslangic"]) != self.baslangic.isoformat():
+                return None
+            seri = {ad: npz[ad] for ad in KAYNAKLAR[kaynak]}
+        if any(len(dizi) < gun_sayisi for dizi in seri.values()):
+            return None
+        return seri
+
+    def gun_degeri(self, kaynak, lat, lon, tarih):
+        """
+        O günün değerleri {değişken: float veya None}; tarih aralık dışındaysa None
+        (çağıran tekil isteğe düşer).
+        """
+        i = (tarih - self.baslangic).days
+        if not 0 <= i <= (self.bitis - self.baslangic).days:
+            return None
+        seri = self.seri_al(kaynak, lat, lon)
+        return {ad: (None if np.isnan(dizi[i]) else float(dizi[i])) for ad, dizi in seri.items()}
+
+    def on_yukle(self, kaynak, koordinatlar):
+        """Koordinatları karolara gruplar ve her karo için seriyi bir kez çeker."""
+        karolar = {}
+        for lat, lon in koordinatlar:
+            karolar.setdefault(self.karo(lat, lon), (lat, lon))
+        for n, (lat, lon) in enumerate(karolar.values(), 1):
+            try:
+                self.seri_al(kaynak, lat, lon)
+            except Exception as e:
+                print(f"Karo atlandı ({kaynak} {lat:.2f},{lon:.2f}): {e}")
+            if n % 25 == 0:
+                print(f"-> {kaynak}: {n}/{len(karolar)} karo")
+        return len(karolar)
+
+
+if __name__ == "__main__":
+    grid_file = sys.argv[1] if len(sys.argv) > 1 else "grid_urfa_genis.csv"
+    with open(grid_file, "r", encoding="utf-8") as f:
+        koordinatlar = [(float(r["lat"]), float(r["lon"])) for r in csv.DictReader(f)]
+
+    depo = HavaSerisiDeposu()
+    for kaynak in KAYNAKLAR:
+        n = depo.on_yukle(kaynak, koordinatlar)
+        print(f"{kaynak}: {len(koordinatlar)} satır -> {n} karo")
+    print(f"Toplam API isteği: {depo.istek_sayisi}")
@@ -0,0 +1,160 @@
+"""
+hibrit_arama.py — tarim_bilgi_bankasi için BM25 + vektör (hibrit) arama.
+
+Yoğun (dense) arama "2020", "pamuk", "Şanlıurfa" gibi kesin varlıkları sık kaçırır;
+doğru belge ancak büyük bir limit ile gelir. Burada koleksiyonun payload metinlerinden
+süreç içi bir ters indeks kurulur:
+  - Terimler turkce.terimler() ile üretilir (I/İ/ı katlama, ek soyma, ASCII katlama)
+  - BM25 skoru her sorgu terimi için tek bir numpy saçılımıyla (posting listesi) toplanır
+  - Vektör sonuçlarıyla Reciprocal Rank Fusion (RRF): skor = Σ 1 / (rrf_k + sıra)
+
+    hibrit = HibritArama(client)                     # QdrantClient veya YerelIstemci
+    sonuc = hibrit.query_points("tarim_bilgi_bankasi", query=vec, soru=soru, limit=3)
+    for hit in sonuc.points:
+        hit.id, hit.score, hit.payload
+
+Yalnızca BM25 ile denemek için (gömme / sunucu gerekmez):
+    python hibrit_arama.py "Şanlıurfa pamuk verimi 2020 yılında nasıldı?"
+"""
+
+import os
+import sys
+
+import numpy as np
+
+from turkce import terimler
+from vektor_indeksi import Nokta, SorguSonucu
+
+HIBRIT_ADAY = int(os.getenv("HIBRIT_ADAY", "20"))  # Her yöntemden birleştirmeye giren aday sayısı
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+
+class BM25Indeksi:
+    def __init__(self, metinler, k1=1.5, b=0.75):
+        belgeler = [terimler(m) for m in metinler]
+        self.n = len(belgeler)
+        self.k1 = k1
+        self.b = b
+
+        # (terim, belge) çiftleri -> tekil çiftler + frekans (posting listeleri terime göre sıralı)
+        self.sozluk = {}
+        terim_id, belge_id = [], []
+        for i, terimler_ in enumerate(belgeler):
+            for t in terimler_:
+                terim_id.append(self.sozluk.setdefault(t, len(self.sozluk)))
+                belge_id.append(i)
+        uzunluk = np.bincount(np.asarray(belge_id, dtype=np.int64), minlength=self.n).astype(np.float64)
+        anahtar = np.asarray(terim_id, dtype=np.int64) * max(self.n, 1) + np.asarray(belge_id, dtype=np.int64)
+        tekil, tf = np.unique(anahtar, return_counts=True)
+        self.belge = (tekil % max(self.n, 1)).astype(np.int64)
+        self.tf = tf.astype(np.float64)
+        df = np.bincount(tekil // max(self.n, 1), minlength=len(self.sozluk))
+        self.sinirlar = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+        self.idf = np.log1p((self.n - df + 0.5) / (df + 0.5))
+
+        # Belge uzunluğu normalizasyonu sorgudan bağımsız: bir kez hesaplanır
+        ort = uzunluk.mean() if self.n and uzunluk.mean() > 0 else 1.0
+        self.norm = k1 * (1.0 - b + b * uzunluk / ort)
+
+    def __len__(self):
+        return self.n
+
+    def skorlar(self, sorgu):
+        """Sorgu metni -> (n,) BM25 skor dizisi."""
+        skor = np.zeros(self.n)
+        idler = [self.sozluk[t] for t in terimler(sorgu) if t in self.sozluk]
+        for t, adet in zip(*np.unique(np.asarray(idler, dtype=np.int64), return_counts=True)):
+            a, b = self.sinirlar[t], self.sinirlar[t + 1]
+            d, tf = self.belge[a:b], self.tf[a:b]
+            skor[d] += adet * self.idf[t] * tf * (self.k1 + 1.0) / (tf + self.norm[d])
+        return skor
+
+    def ara(self, sorgu, limit=10):
+        """-> [(satır, skor), ...] skor azalan; skoru 0 olan belgeler dönmez."""
+        skor = self.skorlar(sorgu)
+        adaylar = np.flatnonzero(skor > 0)
+        if len(adaylar) > limit:
+            adaylar = adaylar[np.argpartition(-skor[adaylar], limit - 1)[:limit]]
+        adaylar = adaylar[np.argsort(-skor[adaylar], kind="stable")]
+        return list(zip(adaylar.tolist(), skor[adaylar].tolist()))
+
+
+def rrf_birlestir(listeler, k=RRF_K):
+    """Sıralı id listeleri -> [(id, rrf_skoru), ...] skor azalan (eşitlikte ilk görülen önce)."""
+    skor = {}
+    for liste in listeler:
+        for sira, id_ in enumerate(liste, start=1):
+            skor[id_] = skor.get(id_, 0.0) + 1.0 / (k + sira)
+    return sorted(skor.items(), key=lambda x: -x[1])
+
+
+class HibritArama:
+    """Vektör istemcisinin (QdrantClient / YerelIstemci) önüne BM25 + RRF ekler."""
+
+    def __init__(self, client, aday=HIBRIT_ADAY, rrf_k=RRF_K, k1=1.5, b=0.75):
+        self.client = client
+        self.aday = aday
+        self.rrf_k = rrf_k
+        self.k1 = k1
+        self.b = b
+        self._koleksiyonlar = {}  # ad -> (BM25Indeksi, idler, payloadlar, id -> satır)
+
+    def _payloadlar(self, collection_name):
+        if hasattr(self.client, "indeks"):  # YerelIstemci: payload'lar indeks dosyasında
+            indeks = self.client.indeks(collection_name)
+            return list(indeks.idler), list(indeks.payloadlar)
+        idler, payloadlar = [], []
+        ofset = None
+        while True:  # Qdrant: vektörsüz scroll
+            noktalar, ofset = self.client.scroll(collection_name=collection_name, limit=1024, offset=ofset,
+                                                 with_payload=True, with_vectors=False)
+            for p in noktalar:
+                idler.append(p.id)
+                payloadlar.append(p.payload or {})
+            if ofset is None:
+                break
+        return idler, payloadlar
+
+    def koleksiyon(self, collection_name):
+        if collection_name not in self._koleksiyonlar:
+            idler, payloadlar = self._payloadlar(collection_name)
+            bm25 = BM25Indeksi([p.get("tam_metin", "") for p in payloadlar], self.k1, self.b)
+            self._koleksiyonlar[collection_name] = (bm25, idler, payloadlar, {id_: i for i, id_ in enumerate(idler)})
+        return self._koleksiyonlar[collection_name]
+
+    def yenile(self, collection_name=None):
+        """Koleksiyon yeniden yazıldıysa BM25 indeksi bir sonraki sorguda yeniden kurulur."""
+        if collection_name is None:
+            self._koleksiyonlar.clear()
+        else:
+            self._koleksiyonlar.pop(collection_name, None)
+
+    def query_points(self, collection_name, query, soru=None, limit=10, **kwargs):
+        """
+        query: soru gömmesi, soru: ham metin. soru verilmezse yalnızca vektör araması yapılır.
+        Dönen skor RRF skorudur (kosinüs değil).
+        """
+        if soru is None:
+            return self.client.query_points(collection_name=collection_name, query=query, limit=limit, **kwargs)
+        bm25, idler, payloadlar, satir = self.koleksiyon(collection_name)
+        vektor_hitleri = self.client.query_points(collection_name=collection_name, query=query,
+                                                  limit=max(limit, self.aday), **kwargs).points
+        sozcuk_hitleri = bm25.ara(soru, max(limit, self.aday))
+
+        payload = {h.id: h.payload for h in vektor_hitleri}
+        birlesik = rrf_birlestir([[h.id for h in vektor_hitleri], [idler[i] for i, _ in sozcuk_hitleri]],
+                                 self.rrf_k)
+        return SorguSonucu([Nokta(id_, skor, payload.get(id_) or payloadlar[satir[id_]])
+                            for id_, skor in birlesik[:limit]])
+
+
+if __name__ == "__main__":
+    from bilgi_bankasi import TarimBilgiBankasi, VERI_DOSYASI_PATH, VERIM_DOSYASI_PATH
+    from gomme import bilgi_belgeleri
+
+    soru = sys.argv[1] if len(sys.argv) > 1 else "Şanlıurfa pamuk verimi 2020 yılında nasıldı?"
+    belgeler = bilgi_belgeleri(TarimBilgiBankasi(VERI_DOSYASI_PATH, VERIM_DOSYASI_PATH))
+    bm25 = BM25Indeksi([b["tam_metin"] for b in belgeler])
+    print(f"🔎 {soru}  (terimler: {terimler(soru)})")
+    for i, skor in bm25.ara(soru, 3):
+        print(f"📄 [{belgeler[i]['kaynak']}] (BM25: {skor:.2f}): {belgeler[i]['tam_metin']}")
@@ -0,0 +1,225 @@
+"""
+hiz_limiti.py — Veri toplayıcılar için sağlayıcı bazlı hız sınırlayıcı.
+
+Her upstream (OpenCage, WeatherAPI, NASA POWER, SoilGrids, Open-Meteo, ZAI) kendi
+token bucket'ına sahiptir. 429/503 yanıtlarında Retry-After başlığına uyulur,
+hız yarıya düşürülür ve başarılı isteklerle yavaşça eski kotaya geri çıkılır.
+
+Kullanım:
+    r = hiz_limiti.istek("opencage", http_istemci.get, url, params=..., timeout=20)
+    r.raise_for_status()
+    hiz_limiti.ozet_yazdir()
+"""
+
+import os
+import time
+import random
+import threading
+import email.utils
+
+# ---------------------------
+# Varsayılan kotalar (istek/sn, burst)
+# ---------------------------
+# Ortam değişkeniyle ezilebilir: RATE_LIMIT_OPENCAGE=15 gibi.
+VARSAYILAN_LIMITLER = {
+    "opencage": (1.0, 1),  # Ücretsiz plan: 1 istek/sn
+    "weatherapi": (10.0, 10),
+    "nasa_power": (5.0, 5),
+    "soilgrids": (5.0 / 60.0, 2),  # ISRIC fair use: dakikada 5 istek
+    "open_meteo": (8.0, 8),  # Ücretsiz: ~600 istek/dk
+    "zai": (2.0, 4),
+    "hal": (4.0, 4),  # hal.gov.tr: paralel oturumların toplamı
+}
+
+TEKRAR_KODLARI = (429, 503)  # Kota / geçici kapasite; Retry-After taşıyabilir
+MAX_GERI_CEKILME = 60.0
+
+
+def _retry_after(kaynak):
+    """Yanıttan veya exception'dan Retry-After süresini (sn) çıkarır; yoksa None."""
+    resp = kaynak if hasattr(kaynak, "headers") else getattr(kaynak, "response", None)
+    headers = getattr(resp, "headers", None) or {}
+    deger = headers.get("Retry-After") if hasattr(headers, "get") else None
+    if not deger:
+        return None
+    try:
+        return max(0.0, float(deger))
+    except ValueError:
+        pass
+    try:
+        tarih = email.utils.parsedate_to_datetime(deger)
+        return max(0.0, tarih.timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def _durum_kodu(kaynak):
+    """Yanıt veya exception (requests.HTTPError, SDK hataları) için HTTP durum kodu."""
+    kod = getattr(kaynak, "status_code", None)
+    if kod is None:
+        kod = getattr(getattr(kaynak, "response", None), "status_code", None)
+    return kod if isinstance(kod, int) else None
+
+
+class SaglayiciLimiti:
+    """
+    Tek bir sağlayıcı için thread-safe token bucket.
+    Token sayısı eksiye düşebilir: her çağıran bir token rezerve eder ve
+    sırası gelene kadar kilit dışında uyur.
+    """
+
+    def __init__(self, ad, hiz, burst=1, min_hiz=None):
+        self.ad = ad
+        self.taban_hiz = float(hiz)
+        self.hiz = float(hiz)
+        self.min_hiz = min_hiz or self.taban_hiz / 16.0
+        self.burst = max(1, int(burst))
+        self._tokenlar = float(self.burst)
+        self._son = time.monotonic()  # Doluma başlanacak an (kısıtlamada ileri atılır)
+        self._kilit = threading.Lock()
+        self.sayaclar = {
+            "istek": 0,
+            "basarili": 0,
+            "kisitlama": 0,
+            "hata": 0,
+            "yeniden_deneme": 0,
+            "bekleme_sn": 0.0,
+        }
+
+    def _doldur(self, simdi):
+        if simdi > self._son:
+            self._tokenlar = min(self.burst, self._tokenlar + (simdi - self._son) * self.hiz)
+            self._son = simdi
+
+    def bekle(self):
+        """Bir token alır; gerekirse bekler. Beklenen süreyi döndürür."""
+        with self._kilit:
+            simdi = time.monotonic()
+            self._doldur(simdi)
+            self._tokenlar -= 1.0
+            sure = max(0.0, self._son - simdi)
+            if self._tokenlar < 0:
+                sure += -self._tokenlar / self.hiz
+            self.sayaclar["istek"] += 1
+            self.sayaclar["bekleme_sn"] += sure
+        if sure > 0:
+            time.sleep(sure)
+        return sure
+
+    def basarili(self):
+        with self._kilit:
+            self.sayaclar["basarili"] += 1
+            # Toplamsal artış: kısıtlamadan sonra kotaya kademeli dönüş
+            if self.hiz < self.taban_hiz:
+                self.hiz = min(self.taban_hiz, self.hiz + self.taban_hiz * 0.05)
+
+    def hata(self):
+        self.say("hata")
+
+    def say(self, anahtar):
+        with self._kilit:
+            self.sayaclar[anahtar] += 1
+
+    def kisitlandi(self, retry_after=None, deneme=0):
+        """429/503 alındı: hızı yarıya indir, Retry-After (yoksa backoff) kadar herkesi durdur."""
+        sure = retry_after if retry_after is not None else self.geri_cekilme(deneme)
+        with self._kilit:
+            self.sayaclar["kisitlama"] += 1
+            self.hiz = max(self.min_hiz, self.hiz * 0.5)
+            simdi = time.monotonic()
+            self._doldur(simdi)
+            if self._tokenlar >= 0:
+                self._tokenlar = 1.0  # Süre dolunca tek bir deneme isteği; sonrası yeni hızla
+            self._son = max(self._son, simdi + min(sure, MAX_GERI_CEKILME))
+
+    def geri_cekilme(self, deneme):
+        """Üstel backoff (jitter'lı): 0.8, 1.44, 2.6, ... sn"""
+        return min(MAX_GERI_CEKILME, 0.8 * (1.8 ** deneme)) * random.uniform(0.8, 1.2)
+
+    def ozet(self):
+        with self._kilit:
+            d = dict(self.sayaclar)
+            d["hiz"] = round(self.hiz, 3)
+            d["bekleme_sn"] = round(d["bekleme_sn"], 2)
+            return d
+
+
+# ---------------------------
+# Modül seviyesinde kayıt
+# ---------------------------
+_limitler = {}
+_kayit_kilidi = threading.Lock()
+
+
+def limit_al(saglayici):
+    """Sağlayıcının limitçisini döndürür (ilk çağrıda oluşturur)."""
+    with _kayit_kilidi:
+        lim = _limitler.get(saglayici)
+        if lim is None:
+            hiz, burst = VARSAYILAN_LIMITLER.get(saglayici, (1.0, 1))
+            env = os.getenv(f"RATE_LIMIT_{saglayici.upper()}")
+            if env:
+                try:
+                    hiz = float(env)
+                    burst = max(burst, int(hiz))
+                except ValueError:
+                    print(f"UYARI: RATE_LIMIT_{saglayici.upper()} sayı değil, varsayılan kullanılıyor.")
+            lim = SaglayiciLimiti(saglayici, hiz, burst)
+            _limitler[saglayici] = lim
+        return lim
+
+
+def istek(saglayici, fn, *args, deneme=3, **kwargs):
+    """
+    fn(*args, **kwargs) çağrısını sağlayıcının kotasına göre yapar.
+    - 429/503: Retry-After'a uyar, hızı düşürür, tekrar dener
+    - 5xx / ağ hatası: üstel backoff ile tekrar dener
+    Son denemenin yanıtını döndürür (raise_for_status çağıranın işi) veya son hatayı fırlatır.
+    """
+    lim = limit_al(saglayici)
+    for i in range(deneme):
+        son_deneme = i == deneme - 1
+        if i:
+            lim.say("yeniden_deneme")
+        lim.bekle()
+        try:
+            sonuc = fn(*args, **kwargs)
+        except Exception as e:
+            kod = _durum_kodu(e)
+            if kod in TEKRAR_KODLARI:
+                lim.kisitlandi(_retry_after(e), i)
+            else:
+                lim.hata()
+                if not son_deneme:
+                    time.sleep(lim.geri_cekilme(i))
+            if son_deneme:
+                raise
+            continue
+
+        kod = _durum_kodu(sonuc)
+        if kod in TEKRAR_KODLARI:
+            lim.kisitlandi(_retry_after(sonuc), i)
+            if son_deneme:
+                return sonuc
+            continue  # Bir sonraki bekle() kısıtlama süresini uygular
+        if kod is not None and kod >= 500:
+            lim.hata()
+            if son_deneme:
+                return sonuc
+            time.sleep(lim.geri_cekilme(i))
+            continue
+        lim.basarili()
+        return sonuc
+
+
+def ozet():
+    """Tüm sağlayıcıların sayaçları: {ad: {...}}"""
+    with _kayit_kilidi:
+        limitler = list(_limitler.values())
+    return {lim.ad: lim.ozet() for lim in limitler}
+
+
+def ozet_yazdir():
+    for ad, d in ozet().items():
+        print(f"  {ad:<11} istek={d['istek']} ok={d['basarili']} 429={d['kisitlama']} "
+              f"hata={d['hata']} tekrar={d['yeniden_deneme']} bekleme={d['bekleme_sn']}sn hız={d['hiz']}/sn")
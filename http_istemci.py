@@ -0,0 +1,98 @@
+"""
+http_istemci.py — Tüm fetcher'ların paylaştığı HTTP istemcisi.
+
+Çıplak requests.get her çağrıda yeni TCP+TLS bağlantısı açar. Burada tek bir
+requests.Session ve host başına bağlantı havuzu (keep-alive) kullanılır; async
+toplayıcının thread'leri de aynı havuzu paylaşır (urllib3 havuzu thread-safe).
+
+HTTP_HTTP2=1 ve 'httpx[http2]' kuruluysa aynı arayüzle HTTP/2 istemcisi kullanılır.
+Durum kodu bazlı tekrar denemeler (429/5xx) hiz_limiti'ndedir; buradaki Retry yalnızca
+bağlantı kurulamadığında devreye girer.
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (bağlantı, okuma) saniye; çağıran timeout verirse o kullanılır
+VARSAYILAN_TIMEOUT = (
+    float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("HTTP_READ_TIMEOUT", "25")),
+)
+HAVUZ_HOST_SAYISI = int(os.getenv("HTTP_POOL_HOSTS", "16"))
+HAVUZ_BOYUTU = int(os.getenv("HTTP_POOL_SIZE", "32"))  # Host başına açık bağlantı
+BAGLANTI_DENEME = int(os.getenv("HTTP_CONNECT_RETRIES", "2"))
+HTTP2 = os.getenv("HTTP_HTTP2", "0") == "1"
+
+_istemci = None
+_kilit = threading.Lock()
+
+
+def _requests_oturumu():
+    s = requests.Session()
+    retry = Retry(total=BAGLANTI_DENEME, connect=BAGLANTI_DENEME, read=0, status=0,
+                  backoff_factor=0.3, allowed_methods=None)
+    adapter = HTTPAdapter(pool_connections=HAVUZ_HOST_SAYISI, pool_maxsize=HAVUZ_BOYUTU, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"Connection": "keep-alive", "User-Agent": "CiftciApp-veri-toplayici/1.0"})
+    return s
+
+
+def _httpx_istemcisi():
+    try:
+        import httpx
+        import h2  # noqa: F401  (http2=True için gerekli)
+    except ImportError:
+        print("UYARI: HTTP/2 için 'pip install httpx[http2]' gerekli, HTTP/1.1 keep-alive kullanılıyor.")
+        return None
+    limits = httpx.Limits(max_connections=HAVUZ_HOST_SAYISI * HAVUZ_BOYUTU, max_keepalive_connections=HAVUZ_BOYUTU)
+    transport = httpx.HTTPTransport(http2=True, retries=BAGLANTI_DENEME, limits=limits)
+    return httpx.Client(transport=transport, timeout=httpx.Timeout(VARSAYILAN_TIMEOUT[1], connect=VARSAYILAN_TIMEOUT[0]))
+
+
+def istemci():
+    """Paylaşılan istemci (ilk çağrıda oluşturulur)."""
+    global _istemci
+    if _istemci is None:
+        with _kilit:
+            if _istemci is None:
+                _istemci = (_httpx_istemcisi() if HTTP2 else None) or _requests_oturumu()
+    return _istemci
+
+
+def istemci_ayarla(yeni):
+    """Testler veya özel yapılandırma için istemciyi değiştirir (.get/.post arayüzü yeterli)."""
+    global _istemci
+    with _kilit:
+        _istemci = yeni
+
+
+def _timeout_ekle(c, timeout, kwargs):
+    # httpx'te timeout=None "sınırsız" demektir; verilmezse istemcinin varsayılanı kalsın
+    if timeout is None and isinstance(c, requests.Session):
+        timeout = VARSAYILAN_TIMEOUT
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    return kwargs
+
+
+def get(url, params=None, timeout=None, **kwargs):
+    c = istemci()
+    return c.get(url, params=params, **_timeout_ekle(c, timeout, kwargs))
+
+
+def post(url, data=None, json=None, timeout=None, **kwargs):
+    c = istemci()
+    return c.post(url, data=data, json=json, **_timeout_ekle(c, timeout, kwargs))
+
+
+def kapat():
+    global _istemci
+    with _kilit:
+        if _istemci is not None:
+            _istemci.close()
+            _istemci = None
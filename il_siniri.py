@@ -0,0 +1,161 @@
+"""
+il_siniri.py — API çağrısından önce çalışan çevrimdışı il sınırı (point-in-polygon) filtresi.
+
+ge.py'nin sınır kutusu Suriye'yi ve komşu illeri de kapsar; bu noktalar eskiden
+ancak bir OpenCage çağrısından sonra eleniyordu. Burada il poligonu (GeoJSON)
+bir kez okunur ve sınır kutusu hucre_derece boyutlu bir ızgaraya bölünür:
+  - tamamen içeride / tamamen dışarıda kalan hücreler tek dizi okumasıyla yanıtlanır,
+  - yalnızca sınıra yakın hücrelerdeki noktalar için kenarlara karşı
+    ışın testi (çift-tek kuralı) ve kenar uzaklığı hesaplanır.
+tampon_derece: sınır dosyası yaklaşık olduğunda, sınıra bu kadar yakın dış noktalar
+elenmez (karar yine geocode'a kalır).
+
+Depoda sınır dosyası yoktur; bir ADM1 dosyası (geoBoundaries gbOpen TUR ADM1 veya
+GADM gadm41_TUR_1) indirilip yolu verilmelidir. İl, shapeName / NAME_1 alanından seçilir.
+
+    sinir = IlSiniri.geojson_oku("geoBoundaries-TUR-ADM1.geojson", ad="Şanlıurfa", tampon_derece=0.06)
+    sinir.icinde(37.16, 38.79)               # True
+    sinir.icinde_toplu(lat_dizisi, lon_dizisi)
+"""
+
+import json
+import math
+
+import numpy as np
+
+from turkce import tr_kucuk
+
+DISARI, ICERI, SINIR = 0, 1, 2
+_AD_ALANLARI = ("ad", "name", "shapeName", "NAME_1", "il")
+
+
+def _halkalar(geometri):
+    """GeoJSON Polygon / MultiPolygon -> [(N, 2) lon,lat dizisi] (dış halkalar ve delikler)."""
+    if geometri["type"] == "Polygon":
+        poligonlar = [geometri["coordinates"]]
+    elif geometri["type"] == "MultiPolygon":
+        poligonlar = geometri["coordinates"]
+    else:
+        raise ValueError(f"Desteklenmeyen geometri tipi: {geometri['type']}")
+    return [np.asarray(halka, dtype=np.float64)[:, :2] for poligon in poligonlar for halka in poligon]
+
+
+class IlSiniri:
+    def __init__(self, halkalar, ad=None, tampon_derece=0.0, hucre_derece=0.02):
+        self.ad = ad
+        self.tampon = float(tampon_derece)
+        self.hucre = float(hucre_derece)
+
+        # Kenar dizileri: (x1, y1) -> (x2, y2); x=lon, y=lat
+        bas, son = [], []
+        for h in halkalar:
+            if not np.array_equal(h[0], h[-1]):
+                h = np.vstack([h, h[:1]])
+            bas.append(h[:-1])
+            son.append(h[1:])
+        bas, son = np.vstack(bas), np.vstack(son)
+        self.x1, self.y1 = bas[:, 0], bas[:, 1]
+        self.x2, self.y2 = son[:, 0], son[:, 1]
+        # Derece cinsinden uzaklıkta boylam, enlemin kosinüsüyle ölçeklenir
+        self.kx = math.cos(math.radians(float(np.mean(bas[:, 1]))))
+
+        pay = self.tampon + self.hucre
+        self.lon0 = float(min(self.x1.min(), self.x2.min())) - pay
+        self.lat0 = float(min(self.y1.min(), self.y2.min())) - pay
+        self.nx = int(math.ceil((float(max(self.x1.max(), self.x2.max())) + pay - self.lon0) / self.hucre))
+        self.ny = int(math.ceil((float(max(self.y1.max(), self.y2.max())) + pay - self.lat0) / self.hucre))
+        self._izgara_kur()
+
+    @classmethod
+    def geojson_oku(cls, path, ad=None, **kwargs):
+        """GeoJSON'dan il poligonu; ad verilirse özelliklerde o ada sahip feature seçilir."""
+        with open(path, "r", encoding="utf-8") as f:
+            veri = json.load(f)
+        features = veri["features"] if veri.get("type") == "FeatureCollection" else [veri]
+        for feat in features:
+            props = feat.get("properties") or {}
+            f_ad = next((props[k] for k in _AD_ALANLARI if props.get(k)), None)
+            if ad is None or tr_kucuk(f_ad) == tr_kucuk(ad):
+                return cls(_halkalar(feat["geometry"]), ad=f_ad or ad, **kwargs)
+        raise ValueError(f"'{ad}' için sınır bulunamadı: {path}")
+
+    # ---------------------------
+    # Izgara (uzamsal indeks)
+    # ---------------------------
+    def _izgara_kur(self):
+        iy, ix = np.mgrid[0:self.ny, 0:self.nx]
+        merkez_lat = (self.lat0 + (iy.ravel() + 0.5) * self.hucre)
+        merkez_lon = (self.lon0 + (ix.ravel() + 0.5) * self.hucre)
+        icinde = self._ham_icinde(merkez_lat, merkez_lon)
+        uzaklik = self._kenar_uzakligi(merkez_lat, merkez_lon)
+        # Hücre köşesi merkezden en fazla yarım köşegen uzakta (boylam ölçeği <= 1)
+        yarim_kosegen = self.hucre * math.sqrt(2) / 2
+        durum = np.full(len(icinde), SINIR, dtype=np.int8)
+        durum[icinde & (uzaklik > yarim_kosegen)] = ICERI
+        durum[~icinde & (uzaklik > yarim_kosegen + self.tampon)] = DISARI
+        self.durum = durum.reshape(self.ny, self.nx)
+
+    def _hucre_durumu(self, lat, lon):
+        iy = np.floor((lat - self.lat0) / self.hucre).astype(np.int64)
+        ix = np.floor((lon - self.lon0) / self.hucre).astype(np.int64)
+        kutuda = (iy >= 0) & (iy < self.ny) & (ix >= 0) & (ix < self.nx)
+        durum = np.full(len(lat), DISARI, dtype=np.int8)
+        durum[kutuda] = self.durum[iy[kutuda], ix[kutuda]]
+        return durum
+
+    # ---------------------------
+    # Kesin geometri (yalnızca sınır hücreleri için)
+    # ---------------------------
+    def _parcalar(self, n):
+        # Nokta x kenar matrisi ~2M elemanla sınırlı kalsın
+        adim = max(1, 2_000_000 // len(self.x1))
+        for i in range(0, n, adim):
+            yield slice(i, min(n, i + adim))
+
+    def _ham_icinde(self, lat, lon):
+        """Doğuya giden ışının kestiği kenar sayısı tek mi (delikler dahil çift-tek kuralı)."""
+        sonuc = np.zeros(len(lat), dtype=bool)
+        for s in self._parcalar(len(lat)):
+            y, x = lat[s, None], lon[s, None]
+            kesiyor = (self.y1 > y) != (self.y2 > y)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x_kesisim = self.x1 + (y - self.y1) * (self.x2 - self.x1) / (self.y2 - self.y1)
+            sonuc[s] = np.count_nonzero(kesiyor & (x < x_kesisim), axis=1) % 2 == 1
+        return sonuc
+
+    def _kenar_uzakligi(self, lat, lon):
+        """Noktanın en yakın kenara uzaklığı (derece; boylam cos(enlem) ile ölçekli)."""
+        sonuc = np.empty(len(lat))
+        ax, ay = self.x1 * self.kx, self.y1
+        dx, dy = (self.x2 - self.x1) * self.kx, self.y2 - self.y1
+        uzunluk2 = np.maximum(dx * dx + dy * dy, 1e-18)
+        for s in self._parcalar(len(lat)):
+            px, py = lon[s, None] * self.kx, lat[s, None]
+            t = np.clip(((px - ax) * dx + (py - ay) * dy) / uzunluk2, 0.0, 1.0)
+            sonuc[s] = np.sqrt(((ax + t * dx - px) ** 2 + (ay + t * dy - py) ** 2).min(axis=1))
+        return sonuc
+
+    # ---------------------------
+    # Sorgular
+    # ---------------------------
+    def icinde_toplu(self, lat, lon):
+        """lat, lon dizileri -> bool dizi. Tampon içindeki dış noktalar da True sayılır."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        durum = self._hucre_durumu(lat, lon)
+        sonuc = durum == ICERI
+        sinirda = np.flatnonzero(durum == SINIR)
+        if len(sinirda):
+            ic = self._ham_icinde(lat[sinirda], lon[sinirda])
+            if self.tampon > 0:
+                ic |= self._kenar_uzakligi(lat[sinirda], lon[sinirda]) <= self.tampon
+            sonuc[sinirda] = ic
+        return sonuc
+
+    def icinde(self, lat, lon):
+        return bool(self.icinde_toplu([lat], [lon])[0])
+
+    def ozet(self):
+        sayim = np.bincount(self.durum.ravel(), minlength=3)
+        return {"hucre": int(self.durum.size), "iceri": int(sayim[ICERI]),
+                "disari": int(sayim[DISARI]), "sinir": int(sayim[SINIR]), "kenar": len(self.x1)}
@@ -0,0 +1,111 @@
+"""
+kontrol_noktasi.py — JSONL üreticileri için çökmeye dayanıklı kontrol noktası.
+
+Çıktı dosyasının yanında bir günlük (<çıktı>.keys) tutulur. Her batch önce çıktıya
+yazılıp fsync edilir, ardından günlüğe tek satır olarak işlenir:
+    {"k": [anahtarlar], "n": yazılan satır sayısı, "o": batch sonrası çıktı boyutu}
+Yeniden başlatmada günlüğün son tam satırındaki "o" ofsetine kadar çıktı kesilir;
+böylece günlüğe girmemiş (yarım) batch tekrar üretilir ve en fazla bir batch kaybedilir.
+
+Filtreye takılan (çıktı üretmeyen) noktalar da anahtar olarak işlenir, yeniden
+başlatmada tekrar API'ye gidilmez.
+
+eslikciler: flush() metodu olan yan depolar (örn. GozlemDeposu). Her batch'te
+günlükten önce yazılırlar; böylece günlüğe giren her nokta yan depoda da vardır.
+"""
+
+import os
+import json
+from pathlib import Path
+
+
+def satir_anahtari(lat, lon, date_iso, plant):
+    """(lat, lon, tarih, bitki) -> günlükte saklanan sabit anahtar."""
+    return f"{float(lat):.5f}|{float(lon):.5f}|{date_iso}|{plant}"
+
+
+class KontrolNoktasi:
+    def __init__(self, cikti_path, batch_boyutu=50, eslikciler=()):
+        self.cikti_path = Path(cikti_path)
+        self.gunluk_path = self.cikti_path.with_name(self.cikti_path.name + ".keys")
+        self.batch_boyutu = batch_boyutu
+        self.eslikciler = list(eslikciler)
+        self.tamamlananlar = set()
+        self.satir_sayisi = 0  # Çıktıda kayıtlı satır sayısı (önceki çalışmalar dahil)
+        self._anahtarlar = []
+        self._satirlar = []
+        self._kurtar()
+        self._cikti = open(self.cikti_path, "ab")
+        self._gunluk = open(self.gunluk_path, "ab")
+
+    def _kurtar(self):
+        if self.gunluk_path.exists():
+            gecerli_boyut = 0
+            son_ofset = 0
+            with open(self.gunluk_path, "rb") as f:
+                for ham in f:
+                    if not ham.endswith(b"\n"):
+                        break
+                    try:
+                        kayit = json.loads(ham)
+                    except ValueError:
+                        break
+                    self.tamamlananlar.update(kayit["k"])
+                    self.satir_sayisi += kayit["n"]
+                    son_ofset = kayit["o"]
+                    gecerli_boyut += len(ham)
+            # Yarım kalan günlük satırını ve günlüğe girmemiş çıktı batch'ini kes
+            with open(self.gunluk_path, "r+b") as f:
+                f.truncate(gecerli_boyut)
+            if self.cikti_path.exists() and self.cikti_path.stat().st_size > son_ofset:
+                with open(self.cikti_path, "r+b") as f:
+                    f.truncate(son_ofset)
+        elif self.cikti_path.exists():
+            # Günlüksüz eski çıktı: satırlar korunur, anahtarları bilinmez
+            with open(self.cikti_path, "rb") as f:
+                self.satir_sayisi = sum(1 for ham in f if ham.strip())
+            boyut = self.cikti_path.stat().st_size
+            with open(self.gunluk_path, "wb") as f:
+                f.write((json.dumps({"k": [], "n": self.satir_sayisi, "o": boyut}) + "\n").encode("utf-8"))
+
+    def tamamlandi(self, anahtar):
+        return anahtar in self.tamamlananlar
+
+    def ekle(self, anahtar, kayit=None):
+        """Anahtarı işlenmiş say; kayit (dict) verilirse çıktıya bir JSONL satırı ekle."""
+        self.tamamlananlar.add(anahtar)
+        self._anahtarlar.append(anahtar)
+        if kayit is not None:
+            self._satirlar.append(json.dumps(kayit, ensure_ascii=False) + "\n")
+        if len(self._anahtarlar) >= self.batch_boyutu:
+            self.flush()
+
+    def flush(self):
+        if not self._anahtarlar:
+            return
+        for eslikci in self.eslikciler:
+            eslikci.flush()
+        self._cikti.write("".join(self._satirlar).encode("utf-8"))
+        self._cikti.flush()
+        os.fsync(self._cikti.fileno())
+
+        kayit = {"k": self._anahtarlar, "n": len(self._satirlar), "o": self._cikti.tell()}
+        self._gunluk.write((json.dumps(kayit, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._gunluk.flush()
+        os.fsync(self._gunluk.fileno())
+
+        self.satir_sayisi += len(self._satirlar)
+        self._anahtarlar = []
+        self._satirlar = []
+
+    def kapat(self):
+        self.flush()
+        self._cikti.close()
+        self._gunluk.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # KeyboardInterrupt dahil: tamamlanan batch'ler diske yazılsın
+        self.kapat()
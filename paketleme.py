@@ -0,0 +1,316 @@
+"""
+paketleme.py — SFT eğitimi için dizi paketleme ve uzunluğa göre kovalama (dolgu israfı).
+
+Alpaca biçimli örnekler kısa ve boyları farklıdır. Rastgele batch'lerde her örnek batch'in
+en uzun örneğine dolgulanır; hesaplamanın büyük kısmı dolgu token'larına gider. İki yol:
+  - "paket": Örnekler en iyi uyum azalan (best-fit decreasing) ile max_seq_length'lik
+    dizilere yerleştirilir. PaketCollator her örneğin position_ids'ini 0'dan başlatır ve
+    blok-diyagonal nedensel 4D maske kurar: bir örnek komşusunu göremez. Örnek
+    başlarındaki etiket -100'dür (önceki örnekten sonraki örneğin ilk token'ı tahmin edilmez).
+    Flash-attention / unsloth varlen çekirdeklerinde dort_boyutlu_maske=False verilir; o zaman
+    sınırları yalnızca position_ids taşır (DataCollatorWithFlattening ile aynı sözleşme).
+  - "kova": Benzer uzunluktaki örnekler aynı batch'e düşer (TrainingArguments.group_by_length
+    ile aynı mega-batch sıralaması). KovaCollator batch'in en uzununa dolgular.
+
+dolgu_raporu() üç modun dolgu oranını ve adım sayısını eğitimden önce basar.
+TokenHiziCallback eğitim sırasında gerçek (dolgu olmayan) token/sn ve dolgu oranını loglar.
+
+CPU'da küçük rastgele bir Llama ile doğrulama (torch + transformers gerekir):
+    python paketleme.py [veri.jsonl] [max_len]
+Paketli logits'in örnek örnek çalıştırmayla aynı olduğunu kontrol eder, sonra üç modda
+ileri+geri geçiş token/sn'sini ölçer. Token'lar UTF-8 baytlarıdır (tokenizer indirmeye gerek yok).
+"""
+
+import sys
+import json
+import time
+import bisect
+import random
+
+import numpy as np
+
+try:
+    import torch
+except ImportError:
+    torch = None
+    print("UYARI: 'torch' bulunamadı; yalnızca uzunluk / dolgu hesapları kullanılabilir.")
+
+try:
+    from transformers import TrainerCallback
+except ImportError:
+    TrainerCallback = object
+
+ETIKET_YOK = -100
+DOLGU_KATI = 8  # Dizi boyu 8'in katına yuvarlanır (tensor core dostu)
+KOVA_CARPANI = 50  # group_by_length ile aynı: batch_boyutu * 50'lik mega-batch içinde sıralama
+
+
+def _yuvarla(n, kat=DOLGU_KATI):
+    return -(-n // kat) * kat
+
+
+# ---------------------------
+# Gruplama
+# ---------------------------
+def paketle(uzunluklar, max_len):
+    """Best-fit decreasing: [[örnek indeksleri], ...]; her paketin toplam boyu <= max_len."""
+    kalanlar = []  # (boş yer, paket no), boş yere göre sıralı
+    paketler = []
+    for i in np.argsort(-np.asarray(uzunluklar), kind="stable"):
+        boy = min(int(uzunluklar[i]), max_len)
+        j = bisect.bisect_left(kalanlar, (boy, -1))  # Sığan en dar paket
+        if j < len(kalanlar):
+            bos, no = kalanlar.pop(j)
+        else:
+            bos, no = max_len, len(paketler)
+            paketler.append([])
+        paketler[no].append(int(i))
+        if bos > boy:
+            bisect.insort(kalanlar, (bos - boy, no))
+    return paketler
+
+
+def kovala(uzunluklar, batch_boyutu, tohum=3407, carpan=KOVA_CARPANI):
+    """Rastgele mega-batch'ler içinde uzunluğa göre sıralanmış batch'ler (batch sırası karışık)."""
+    rng = random.Random(tohum)
+    sira = list(range(len(uzunluklar)))
+    rng.shuffle(sira)
+    mega = batch_boyutu * carpan
+    batchler = []
+    for bas in range(0, len(sira), mega):
+        parca = sorted(sira[bas:bas + mega], key=lambda i: -uzunluklar[i])
+        batchler.extend(parca[k:k + batch_boyutu] for k in range(0, len(parca), batch_boyutu))
+    rng.shuffle(batchler)
+    return batchler
+
+
+def rastgele_batchler(n, batch_boyutu, tohum=3407):
+    sira = list(range(n))
+    random.Random(tohum).shuffle(sira)
+    return [sira[k:k + batch_boyutu] for k in range(0, n, batch_boyutu)]
+
+
+def dolgu_orani(batch_boylari, kat=DOLGU_KATI):
+    """batch_boylari: her batch için satır boyları listesi. Dolgu / toplam token."""
+    gercek = sum(sum(b) for b in batch_boylari)
+    toplam = sum(len(b) * _yuvarla(max(b), kat) for b in batch_boylari)
+    return 1 - gercek / toplam if toplam else 0.0
+
+
+def dolgu_raporu(uzunluklar, batch_boyutu, max_len, tohum=3407):
+    """Modlara göre dolgu oranı ve adım sayısı; {mod: (dolgu, adim)} döner ve basar."""
+    u = np.minimum(np.asarray(uzunluklar), max_len)
+    paketler = paketle(u, max_len)
+    paket_boylari = [int(u[p].sum()) for p in paketler]
+    sonuc = {
+        "sabit": (1 - u.sum() / (len(u) * max_len), -(-len(u) // batch_boyutu)),
+        "yok": (dolgu_orani([[u[i] for i in b] for b in rastgele_batchler(len(u), batch_boyutu, tohum)]),
+                -(-len(u) // batch_boyutu)),
+        "kova": (dolgu_orani([[u[i] for i in b] for b in kovala(u, batch_boyutu, tohum)]),
+                 -(-len(u) // batch_boyutu)),
+        "paket": (dolgu_orani([[paket_boylari[i] for i in b]
+                               for b in rastgele_batchler(len(paketler), batch_boyutu, tohum)]),
+                  -(-len(paketler) // batch_boyutu)),
+    }
+    print(f"📏 {len(u)} örnek, token: ort {u.mean():.0f}, medyan {np.median(u):.0f}, en uzun {u.max()} "
+          f"(max_len {max_len}, batch {batch_boyutu})")
+    aciklama = {"sabit": f"{max_len}'e dolgu", "yok": "batch içi en uzuna", "kova": "uzunluk kovaları",
+                "paket": f"{len(paketler)} paket"}
+    for mod, (oran, adim) in sonuc.items():
+        print(f"   {mod:<6} dolgu %{oran * 100:5.1f}  {adim:6d} adım  ({aciklama[mod]})")
+    return sonuc
+
+
+def paketli_ornekler(input_ids_listesi, max_len, tohum=3407):
+    """Token dizileri -> [{"input_ids", "uzunluklar"}]; PaketCollator ile kullanılır."""
+    diziler = [list(ids[:max_len]) for ids in input_ids_listesi]
+    paketler = paketle([len(d) for d in diziler], max_len)
+    random.Random(tohum).shuffle(paketler)
+    return [{"input_ids": [t for i in p for t in diziler[i]], "uzunluklar": [len(diziler[i]) for i in p]}
+            for p in paketler]
+
+
+# ---------------------------
+# Collator'lar
+# ---------------------------
+class _DolguSayaci:
+    def __init__(self):
+        self.sifirla()
+
+    def sifirla(self):
+        self.gercek = 0
+        self.toplam = 0
+
+    def dolgu_orani(self):
+        return 1 - self.gercek / self.toplam if self.toplam else 0.0
+
+
+class PaketCollator(_DolguSayaci):
+    """
+    paketli_ornekler() satırlarını batch'ler: input_ids, labels, position_ids ve
+    (dort_boyutlu_maske ise) [B, 1, L, L] toplamsal maske (0: görür, dtype min: görmez).
+    """
+
+    def __init__(self, pad_id, dort_boyutlu_maske=True, maske_dtype=None, kat=DOLGU_KATI):
+        super().__init__()
+        self.pad_id = pad_id
+        self.dort_boyutlu_maske = dort_boyutlu_maske
+        self.maske_dtype = maske_dtype
+        self.kat = kat
+
+    def __call__(self, ornekler):
+        B = len(ornekler)
+        L = _yuvarla(max(len(o["input_ids"]) for o in ornekler), self.kat)
+        ids = np.full((B, L), self.pad_id, dtype=np.int64)
+        etiket = np.full((B, L), ETIKET_YOK, dtype=np.int64)
+        konum = np.zeros((B, L), dtype=np.int64)
+        parca = np.full((B, L), -1, dtype=np.int64)  # Hangi örneğe ait (-1: dolgu)
+        for b, o in enumerate(ornekler):
+            n = len(o["input_ids"])
+            ids[b, :n] = o["input_ids"]
+            etiket[b, :n] = o["input_ids"]
+            bas = 0
+            for s, boy in enumerate(o["uzunluklar"]):
+                konum[b, bas:bas + boy] = np.arange(boy)
+                parca[b, bas:bas + boy] = s
+                etiket[b, bas] = ETIKET_YOK  # Önceki örneğin sonundan bu örneğin başı tahmin edilmez
+                bas += boy
+            self.gercek += n
+        self.toplam += B * L
+
+        batch = {"input_ids": torch.from_numpy(ids), "labels": torch.from_numpy(etiket),
+                 "position_ids": torch.from_numpy(konum)}
+        if self.dort_boyutlu_maske:
+            nedensel = np.tril(np.ones((L, L), dtype=bool))
+            gorur = (parca[:, :, None] == parca[:, None, :]) & (parca[:, :, None] >= 0) & nedensel
+            gorur |= np.eye(L, dtype=bool)  # Dolgu satırları tamamen maskeli kalmasın
+            dtype = self.maske_dtype or torch.float32
+            maske = torch.zeros((B, 1, L, L), dtype=dtype)
+            maske.masked_fill_(~torch.from_numpy(gorur)[:, None], torch.finfo(dtype).min)
+            batch["attention_mask"] = maske
+        return batch
+
+
+class KovaCollator(_DolguSayaci):
+    """Tokenize edilmiş satırları batch'in en uzununa (kat'a yuvarlanmış) dolgular."""
+
+    def __init__(self, pad_id, kat=DOLGU_KATI):
+        super().__init__()
+        self.pad_id = pad_id
+        self.kat = kat
+
+    def __call__(self, ornekler):
+        B = len(ornekler)
+        L = _yuvarla(max(len(o["input_ids"]) for o in ornekler), self.kat)
+        ids = np.full((B, L), self.pad_id, dtype=np.int64)
+        maske = np.zeros((B, L), dtype=np.int64)
+        for b, o in enumerate(ornekler):
+            n = len(o["input_ids"])
+            ids[b, :n] = o["input_ids"]
+            maske[b, :n] = 1
+            self.gercek += n
+        self.toplam += B * L
+        etiket = np.where(maske == 1, ids, ETIKET_YOK)
+        return {"input_ids": torch.from_numpy(ids), "attention_mask": torch.from_numpy(maske),
+                "labels": torch.from_numpy(etiket)}
+
+
+class TokenHiziCallback(TrainerCallback):
+    """Her log adımında collator'ın saydığı gerçek token/sn ve dolgu oranını basar."""
+
+    def __init__(self, collator):
+        self.collator = collator
+        self.t0 = None
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        self.collator.sifirla()
+        self.t0 = time.perf_counter()
+
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        if self.t0 is None or logs is None:
+            return
+        hiz = self.collator.gercek / max(time.perf_counter() - self.t0, 1e-9)
+        logs["token_sn"] = round(hiz, 1)
+        logs["dolgu_orani"] = round(self.collator.dolgu_orani(), 4)
+        print(f"📊 Adım {state.global_step}: {hiz:.0f} token/sn, dolgu %{self.collator.dolgu_orani() * 100:.1f}")
+
+
+# ---------------------------
+# CPU doğrulaması (küçük model)
+# ---------------------------
+def _kucuk_model(max_len):
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    torch.manual_seed(0)
+    cfg = LlamaConfig(vocab_size=256, hidden_size=64, intermediate_size=128, num_hidden_layers=2,
+                      num_attention_heads=4, num_key_value_heads=2, max_position_embeddings=max_len,
+                      attn_implementation="eager")
+    return LlamaForCausalLM(cfg)
+
+
+def sinirlari_dogrula(model, paketli, adet=4):
+    """Paketli ileri geçiş logits'i ile örneklerin tek tek logits'i arasındaki en büyük fark."""
+    collator = PaketCollator(pad_id=0)
+    batch = collator(paketli[:adet])
+    model.eval()
+    with torch.no_grad():
+        paket = model(**{k: v for k, v in batch.items() if k != "labels"}).logits
+        maskesiz = model(input_ids=batch["input_ids"]).logits  # Sınırsız: örnekler birbirini görür
+        fark = fark_maskesiz = 0.0
+        for b, o in enumerate(paketli[:adet]):
+            bas = 0
+            for boy in o["uzunluklar"]:
+                tek = model(input_ids=torch.tensor([o["input_ids"][bas:bas + boy]])).logits[0]
+                fark = max(fark, (paket[b, bas:bas + boy] - tek).abs().max().item())
+                fark_maskesiz = max(fark_maskesiz, (maskesiz[b, bas:bas + boy] - tek).abs().max().item())
+                bas += boy
+    return fark, fark_maskesiz
+
+
+def hiz_olc(model, batchler, collator):
+    """Tüm batch'ler üzerinde ileri + geri geçiş; (gerçek token/sn, dolgu oranı, süre)."""
+    model.train()
+    opt = torch.optim.AdamW(model.parameters(), lr=1e-4)
+    collator.sifirla()
+    t0 = time.perf_counter()
+    for satirlar in batchler:
+        kayip = model(**collator(satirlar)).loss
+        kayip.backward()
+        opt.step()
+        opt.zero_grad()
+    sure = time.perf_counter() - t0
+    return collator.gercek / sure, collator.dolgu_orani(), sure
+
+
+if __name__ == "__main__":
+    veri_yolu = sys.argv[1] if len(sys.argv) > 1 else "dataset_urfa.jsonl"
+    max_len = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    batch_boyutu = 2
+
+    with open(veri_yolu, "r", encoding="utf-8") as f:
+        kayitlar = [json.loads(s) for s in f if s.strip()]
+    # Bayt düzeyi token: tokenizer indirmeden uzunluk dağılımı korunur
+    diziler = [list("\n".join(str(v) for v in k.values()).encode("utf-8"))[:max_len] for k in kayitlar]
+    uzunluklar = np.array([len(d) for d in diziler])
+    dolgu_raporu(uzunluklar, batch_boyutu, max_len)
+
+    if torch is None:
+        sys.exit(0)
+    model = _kucuk_model(max_len)
+    paketli = paketli_ornekler(diziler, max_len)
+    fark, fark_maskesiz = sinirlari_dogrula(model, paketli)
+    print(f"🔬 Paketli vs tek tek logits farkı: {fark:.2e} (maskesiz: {fark_maskesiz:.2e}) "
+          f"-> {'sınırlar doğru' if fark < 1e-4 else 'HATA: örnekler birbirini görüyor'}")
+
+    n = min(len(diziler), 128)  # CPU'da kısa tutulur
+    satirlar = [{"input_ids": d} for d in diziler[:n]]
+    alt_paket = paketli_ornekler(diziler[:n], max_len)
+    modlar = {
+        "yok": ([[satirlar[i] for i in b] for b in rastgele_batchler(n, batch_boyutu)], KovaCollator(0)),
+        "kova": ([[satirlar[i] for i in b] for b in kovala(uzunluklar[:n], batch_boyutu)], KovaCollator(0)),
+        "paket": ([alt_paket[k:k + batch_boyutu] for k in range(0, len(alt_paket), batch_boyutu)],
+                  PaketCollator(0)),
+    }
+    for mod, (batchler, collator) in modlar.items():
+        hiz, oran, sure = hiz_olc(_kucuk_model(max_len), batchler, collator)
+        print(f"   {mod:<6} {len(batchler):4d} adım, {sure:6.2f} sn, {hiz:9.0f} token/sn, dolgu %{oran * 100:.1f}")
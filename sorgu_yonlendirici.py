@@ -0,0 +1,219 @@
+"""
+sorgu_yonlendirici.py — verim / eşik sorularını LLM'siz yanıtlayan hızlı yol.
+
+"/ask" sorularının çoğu TarimBilgiBankasi üzerinde birer aramadır:
+  - "Şanlıurfa pamuk verimi 2020 yılında nasıldı?"     -> gecmis_verimler[urun][yil]
+  - "Biber ekimi için sıcaklık kaç derece olmalı?"     -> bitki_bilgileri[..]["ideal_sicaklik"]
+  - "Mercimek ne zaman ekilir?" / "Arpa yağış ihtiyacı" -> ekim_zamani / yagis_ihtiyaci
+Yönlendirici soruyu turkce.terimler() ile terimlere ayırır, bellekteki indekslerden
+ürün / bitki / yıl / parametre niyetini bulur ve cevabı doğrudan üretir (mikrosaniyeler).
+Niyet belirsizse (birden fazla bitki, "uygun mu", hava koşulu yorumu ...) None döner;
+yanitla(soru, yedek) bu durumda RAG+LLM yedeğini çağırır.
+
+    yonlendirici = SorguYonlendirici(db)
+    sonuc = yonlendirici.yanitla(soru, yedek=rag_ile_cevapla)
+    sonuc["cevap"], sonuc["yol"]                      # yol: "dogrudan" | "rag"
+"""
+
+import re
+import sys
+import time
+
+from turkce import katla, kok, terimler, tr_kucuk
+
+# Bu kelimeler yorum / karar ister: doğrudan cevap verilmez
+MUHAKEME_TERIMLERI = {"sart", "uygun", "tavsiye", "oner", "oneri", "neden", "niye", "karsilastir",
+                      "hangis", "hangisi", "riskl", "risk", "zarar", "hastalik", "ilac"}
+# Ürün adlarında atlanabilen nitelikler ("Susam Tohumu" -> "susam verimi" de eşleşir)
+_NITELIK = {"kuru", "kabuklu", "tohum", "yaglik", "haric", "circirlanmamis", "circirlanmis"}
+_YIL = re.compile(r"\b(19\d\d|20\d\d)\b")
+
+# niyet -> (tetikleyici terimler, bitki_bilgileri anahtarı, başlık, birim)
+PARAMETRELER = {
+    "ideal_sicaklik": ({"sicaklik", "derec", "isi"}, "ideal_sicaklik", "ideal sıcaklık", "°C"),
+    "yagis_ihtiyaci": ({"yagis", "yagmur"}, "yagis_ihtiyaci", "yağış ihtiyacı", "mm"),
+    "tohum_miktari": ({"tohum"}, "tohum_miktari", "tohum miktarı", "kg/dekar"),
+}
+BESINLER = {"azot", "fosfor", "potasyum"}
+
+
+def _terim(kelime):
+    return katla(kok(tr_kucuk(kelime)))
+
+
+def _aralik(deger, birim=""):
+    if isinstance(deger, dict) and "min" in deger:
+        lo, hi = deger["min"], deger["max"]
+        metin = f"{lo:g}" if lo == hi else f"{lo:g}-{hi:g}"
+    else:
+        metin = str(deger)
+    return f"{metin} {birim}".strip()
+
+
+def _tarih_metni(bitki, niyet):
+    """
+    Veri.xlsx'teki ham ekim / hasat metni ("16 kasım-15 aralık"). Ham metin yoksa yalnızca
+    temizleyicinin dokunmadığı metin değerleri kullanılır; sayıya indirgenmiş değer
+    ({"min": 16, ...}) tarih değildir, None döner ve soru RAG'e gider.
+    """
+    ham = bitki.get(f"{niyet}_metin")
+    if ham:
+        return ham
+    deger = bitki.get("ekim_zamani" if niyet == "ekim_zamani" else "hasat yapılan gün")
+    return deger if isinstance(deger, str) else None
+
+
+class SorguYonlendirici:
+    def __init__(self, db):
+        self.db = db
+        # Bitki türü terimi -> bitki bilgisi (ilk çeşit; "Biber - Urfa Biberi" -> "biber")
+        self.bitkiler = {}
+        for bilgi in db.bitki_bilgileri.values():
+            self.bitkiler.setdefault(_terim(bilgi["tur"]), bilgi)
+
+        # Verim ürünleri: zorunlu terimler (virgülden önceki ad, nitelikler hariç) + tüm terimler
+        self.urunler = []
+        for sira, urun in enumerate(db.gecmis_verimler):
+            bas = urun.split(",")[0]
+            zorunlu = {t for t in terimler(bas) if t not in _NITELIK} or set(terimler(bas))
+            self.urunler.append((urun, frozenset(zorunlu), frozenset(terimler(urun)), sira))
+
+        # Besin anahtarları ("i̇deal azot miktarı" -> ("azot", "ideal"))
+        self.besin_anahtarlari = {}
+        for bilgi in db.bitki_bilgileri.values():
+            for anahtar in bilgi:
+                sade = anahtar.replace("\u0307", "")
+                for besin in BESINLER:
+                    if besin in sade:
+                        duzey = "ideal" if "ideal" in sade else "en az" if "minimum" in sade else \
+                            "en fazla" if "maksimum" in sade else None
+                        if duzey:
+                            self.besin_anahtarlari[anahtar] = (besin, duzey)
+
+    # ---------------------------
+    # Niyet çıkarımı
+    # ---------------------------
+    def _urun_bul(self, terim_kumesi):
+        """
+        Tüm zorunlu terimleri soruda geçen ürünlerden en çok eşleşen, en az fazlası olan.
+        Birbirini kapsamayan iki ürün adı geçiyorsa ("pamuk ve mısır") karşılaştırmadır: None.
+        """
+        adaylar = [(len(tum & terim_kumesi), -len(tum - terim_kumesi), -sira, urun, zorunlu)
+                   for urun, zorunlu, tum, sira in self.urunler if zorunlu <= terim_kumesi]
+        kumeler = {a[4] for a in adaylar}
+        if sum(1 for k in kumeler if not any(k < diger for diger in kumeler)) > 1:
+            return None
+        return max(adaylar)[3] if adaylar else None
+
+    def niyet(self, soru):
+        """Soru -> {"niyet", "bitki" / "urun", "yil"} veya None (doğrudan cevaplanamaz)."""
+        t = terimler(soru)
+        kume = set(t)
+        if kume & MUHAKEME_TERIMLERI:
+            return None
+        bitkiler = [b for terim, b in self.bitkiler.items() if terim in kume]
+        yillar = sorted({int(y) for y in _YIL.findall(soru)})
+
+        if "verim" in kume or "rekolt" in kume:
+            urun = self._urun_bul(kume)
+            if urun is None or len(yillar) > 1:
+                return None
+            return {"niyet": "verim", "urun": urun, "yil": yillar[0] if yillar else None}
+
+        if len(bitkiler) != 1 or yillar:
+            return None
+        bitki = bitkiler[0]
+        if "zaman" in kume or ("hangi" in kume and "ay" in kume):
+            if "hasat" in kume:
+                return {"niyet": "hasat_zamani", "bitki": bitki}
+            if any(k.startswith("ek") for k in t):
+                return {"niyet": "ekim_zamani", "bitki": bitki}
+            return None
+        besinler = kume & BESINLER
+        if len(besinler) == 1:
+            return {"niyet": "besin", "bitki": bitki, "besin": besinler.pop()}
+        eslesen = [ad for ad, (tetik, _, _, _) in PARAMETRELER.items() if kume & tetik]
+        if len(eslesen) == 1:
+            return {"niyet": eslesen[0], "bitki": bitki}
+        return None
+
+    # ---------------------------
+    # Cevaplar
+    # ---------------------------
+    def _verim_cevabi(self, urun, yil):
+        seri = self.db.gecmis_verimler[urun]
+        yillar = sorted(seri)
+        if yil is None:
+            liste = ", ".join(f"{y}: {seri[y]:g}" for y in yillar)
+            return f"Şanlıurfa'da {urun} verimleri (kg/dekar): {liste}."
+        if yil not in seri:
+            return f"Şanlıurfa'da {urun} için {yil} verisi yok; mevcut yıllar: {yillar[0]}-{yillar[-1]}."
+        cevap = f"Şanlıurfa'da {urun} verimi {yil} yılında {seri[yil]:g} kg/dekar."
+        onceki = seri.get(yil - 1)
+        if onceki:
+            degisim = (seri[yil] - onceki) / onceki * 100
+            cevap += f" Bir önceki yıla göre %{degisim:+.1f} ({yil - 1}: {onceki:g} kg/dekar)."
+        return cevap
+
+    def _bitki_cevabi(self, n):
+        bitki = n["bitki"]
+        ad = bitki["tam_isim"]
+        if n["niyet"] in ("ekim_zamani", "hasat_zamani"):
+            metin = _tarih_metni(bitki, n["niyet"])
+            if metin is None:
+                return None
+            baslik = "ekim zamanı" if n["niyet"] == "ekim_zamani" else "hasat zamanı"
+            return f"{ad} için {baslik}: {metin}."
+        if n["niyet"] == "besin":
+            parcalar = [f"{duzey} {_aralik(bitki[anahtar], 'kg/dekar')}"
+                        for anahtar, (besin, duzey) in self.besin_anahtarlari.items()
+                        if besin == n["besin"] and anahtar in bitki]
+            return f"{ad} için {n['besin']} ihtiyacı: {', '.join(parcalar)}." if parcalar else None
+        if n["niyet"] in PARAMETRELER:
+            _, anahtar, baslik, birim = PARAMETRELER[n["niyet"]]
+            if anahtar not in bitki:
+                return None
+            cevap = f"{ad} için {baslik}: {_aralik(bitki[anahtar], birim)}."
+            if anahtar == "ideal_sicaklik":
+                alt, ust = bitki.get("ekim için en düşük sıcaklık"), bitki.get("ekim için en yüksek sıcaklık")
+                if alt and ust:
+                    cevap += f" Ekim için sıcaklık {_aralik(alt)} ile {_aralik(ust, '°C')} arasında olmalı."
+            return cevap
+        return None
+
+    def dogrudan_cevap(self, soru):
+        """Soru -> {"cevap", "niyet", "kaynak"} veya None."""
+        n = self.niyet(soru)
+        if n is None:
+            return None
+        if n["niyet"] == "verim":
+            return {"cevap": self._verim_cevabi(n["urun"], n["yil"]), "niyet": "verim", "kaynak": "verimler.xls"}
+        cevap = self._bitki_cevabi(n)
+        if cevap is None:
+            return None
+        return {"cevap": cevap, "niyet": n["niyet"], "kaynak": "Veri.xlsx"}
+
+    def yanitla(self, soru, yedek=None):
+        """Önce doğrudan cevap; yoksa yedek(soru) (RAG+LLM). Dönüş: {"cevap", "yol", ...}."""
+        sonuc = self.dogrudan_cevap(soru)
+        if sonuc is not None:
+            sonuc["yol"] = "dogrudan"
+            return sonuc
+        return {"cevap": yedek(soru) if yedek else None, "yol": "rag"}
+
+
+if __name__ == "__main__":
+    from bilgi_bankasi import TarimBilgiBankasi, VERI_DOSYASI_PATH, VERIM_DOSYASI_PATH
+
+    yonlendirici = SorguYonlendirici(TarimBilgiBankasi(VERI_DOSYASI_PATH, VERIM_DOSYASI_PATH))
+    sorular = sys.argv[1:] or [
+        "Biber ekimi için sıcaklık kaç derece olmalı?",
+        "Şanlıurfa pamuk verimi 2020 yılında nasıldı?",
+        "Mercimek ne zaman ekilir?",
+        "Bu hafta buğday ekmek uygun mu?",
+    ]
+    for soru in sorular:
+        t0 = time.perf_counter()
+        sonuc = yonlendirici.dogrudan_cevap(soru)
+        sure = (time.perf_counter() - t0) * 1e6
+        print(f"🔎 {soru}\n   -> {sonuc['cevap'] if sonuc else 'RAG+LLM yedeğine gider'} ({sure:.0f} µs)")
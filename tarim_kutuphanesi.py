@@ -1,10 +1,26 @@
+import os
 import pandas as pd
 import numpy as np
 import re
 
+import bilgi_snapshot
+from verim_ayristirici import baslik_ortalamalari
+
 
 class TarimBilgiBankasi:
-    def __init__(self, veri_csv_path, verim_csv_path):
+    SNAPSHOT_SURUM = 2  # Ayrıştırma mantığı değişince artırın
+
+    def __init__(self, veri_csv_path, verim_csv_path, snapshot_path=None):
+        # CSV'ler yalnızca değiştiklerinde yeniden ayrıştırılır (bilgi_snapshot.py)
+        snapshot_path = snapshot_path or os.path.join(os.path.dirname(os.path.abspath(veri_csv_path)),
+                                                      "tarim_kutuphanesi.snapshot.pkl")
+        durum = bilgi_snapshot.yukle_veya_derle(
+            [veri_csv_path, verim_csv_path], lambda: self._derle(veri_csv_path, verim_csv_path),
+            snapshot_path, surum=self.SNAPSHOT_SURUM)
+        self.bitki_bilgileri = durum["bitki_bilgileri"]
+        self.verim_istatistikleri = durum["verim_istatistikleri"]
+
+    def _derle(self, veri_csv_path, verim_csv_path):
         self.veri_df = pd.read_csv(veri_csv_path)
         self.verim_df = pd.read_csv(verim_csv_path)
         self.bitki_bilgileri = {}
@@ -12,6 +28,7 @@ class TarimBilgiBankasi:
 
         self._verileri_islee()
         self._verimleri_isle()
+        return {"bitki_bilgileri": self.bitki_bilgileri, "verim_istatistikleri": self.verim_istatistikleri}
 
     def _temizle_sayisal_aralik(self, deger):
         """
@@ -92,28 +109,8 @@ class TarimBilgiBankasi:
         """
         verimler.xls dosyasından Şanlıurfa ortalamalarını çeker.
         """
-        # CSV yapısı biraz karmaşık, basitçe satırları tarayıp "Kg/Dekar" olanları alacağız
-        for index, row in self.verim_df.iterrows():
-            urun_tanimi = str(row[1])  # Genelde 2. sütunda ürün adı var
-            if "Kg/Dekar" in urun_tanimi:
-                # Ürün ismini ayıkla (Örn: "Verim ve ... (Mısır) - Kg/Dekar")
-                match = re.search(r"\((.*?)\)", urun_tanimi)
-                if match:
-                    urun_adi = match.group(1).split("(")[0].strip()  # "Mısır"
-
-                    # Yıllara göre verimler (sonraki sütunlarda)
-                    # Sadece sayısal değerleri alıp ortalama hesaplayalım
-                    degerler = []
-                    for val in row[2:]:
-                        try:
-                            v = float(str(val).replace(",", "."))
-                            if v > 0: degerler.append(v)
-                        except:
-                            pass
-
-                    if degerler:
-                        ortalama = sum(degerler) / len(degerler)
-                        self.verim_istatistikleri[urun_adi] = int(ortalama)
+        # 2. sütunda "Kg/Dekar" geçen satırların pozitif değer ortalaması (verim_ayristirici.py, vektörel)
+        self.verim_istatistikleri = baslik_ortalamalari(self.verim_df, ad_sutunu=1, ilk_deger_sutunu=2)
 
     def bitki_getir(self, bitki_adi=None):
         """Rastgele veya spesifik bir bitki bilgisi döner."""
@@ -1,27 +1,54 @@
-from qdrant_client import QdrantClient
-import ollama
+import os
+
+from gomme import GommeKatmani
+from hibrit_arama import HibritArama
+from sorgu_yonlendirici import SorguYonlendirici
+from bilgi_bankasi import TarimBilgiBankasi, VERI_DOSYASI_PATH, VERIM_DOSYASI_PATH
 
 # Ayarlar
-# Docker'daki Qdrant'a bağlan
-client = QdrantClient(url="http://localhost:6333")
+# Arama arka ucu: "qdrant" (Docker'daki sunucu) veya "yerel" (vektor_indeksi/<koleksiyon>.vidx, sunucusuz)
+RAG_BACKEND = os.getenv("RAG_BACKEND", "qdrant")
+VEKTOR_DIZINI = os.getenv("VEKTOR_DIZINI", "vektor_indeksi")
+
+if RAG_BACKEND == "yerel":
+    from vektor_indeksi import YerelIstemci
+    client = YerelIstemci(VEKTOR_DIZINI)
+else:
+    from qdrant_client import QdrantClient
+    # Docker'daki Qdrant'a bağlan
+    client = QdrantClient(url="http://localhost:6333")
+# Vektör sonuçları BM25 (Türkçe kök + katlama) ile RRF'de birleştirilir: yıl / ürün / il kesin eşleşir
+arama = HibritArama(client)
 MODEL = "embeddinggemma" 
+# Soru gömmeleri disk önbelleğinde (aynı / benzer yazılmış sorular Ollama'ya gitmez)
+gomucu = GommeKatmani(model=MODEL)
+
+# Verim / eşik soruları (ürün + yıl + parametre) bilgi bankasından doğrudan cevaplanır
+yonlendirici = SorguYonlendirici(TarimBilgiBankasi(VERI_DOSYASI_PATH, VERIM_DOSYASI_PATH))
 
 def test_et(soru):
     print(f"\n🔎 SORU: {soru}")
     print("-" * 40)
+
+    # 0. Deterministik arama: gömme / vektör araması / LLM gerekmez
+    dogrudan = yonlendirici.dogrudan_cevap(soru)
+    if dogrudan:
+        print(f"⚡ [{dogrudan['kaynak']}] ({dogrudan['niyet']}): {dogrudan['cevap']}")
+        return
     
     # 1. Soruyu vektöre çevir
     try:
-        vec = ollama.embeddings(model=MODEL, prompt=soru)["embedding"]
+        vec = gomucu.embed(soru).tolist()
     except Exception as e:
         print(f"Ollama Hatası: {e}")
         return
 
-    # 2. Qdrant'ta Ara (YENİ METOT: query_points)
+    # 2. Qdrant'ta (veya yerel indekste) Ara (YENİ METOT: query_points) + BM25 ile hibrit sıralama
     try:
-        results = client.query_points(
+        results = arama.query_points(
             collection_name="tarim_bilgi_bankasi",
             query=vec,  # 'query_vector' yerine 'query' kullanılıyor
+            soru=soru,
             limit=3
         )
         
@@ -34,13 +61,14 @@ def test_et(soru):
             metin = hit.payload.get('tam_metin', '')
             score = hit.score
             
-            print(f"📄 [{kaynak}] (Skor: {score:.2f}): {metin}")
+            print(f"📄 [{kaynak}] (RRF: {score:.4f}): {metin}")
             print("-" * 20)
             
     except Exception as e:
-        print(f"Qdrant Arama Hatası: {e}")
+        print(f"Arama Hatası ({RAG_BACKEND}): {e}")
 
 # Test Soruları
 if __name__ == "__main__":
     test_et("Biber ekimi için sıcaklık kaç derece olmalı?")
     test_et("Şanlıurfa pamuk verimi 2020 yılında nasıldı?")
+    test_et("Bu hafta buğday ekmek uygun mu?")
@@ -0,0 +1,137 @@
+"""
+toprak_onbellek.py — SoilGrids pH (phh2o, 0-5cm) için yerel raster deposu.
+
+İl sınır kutusu (ge.py'deki LAT/LON sınırları) bir kez ~250 m'lik bir ızgaraya
+indirilir ve memory-mapped .npy dosyası olarak saklanır. Sorgular en yakın hücre
+okumasıdır; boş (NaN) hücreler için fetch_soil HTTP'ye düşer ve sonucu hücreye yazar.
+
+Toplu indirme (bir kez):
+    python toprak_onbellek.py
+WCS GeoTIFF'ini okumak için 'tifffile' veya 'rasterio' gerekir; yoksa ızgara
+HTTP sorgularıyla kademeli olarak dolar.
+"""
+
+import io
+import json
+import math
+import threading
+from pathlib import Path
+
+import numpy as np
+
+import hiz_limiti
+import http_istemci
+from ge import LAT_MIN, LAT_MAX, LON_MIN, LON_MAX
+
+WCS_URL = "https://maps.isric.org/mapserv?map=/map/phh2o.map"
+WCS_COVERAGE = "phh2o_0-5cm_mean"
+NODATA = -32768
+
+
+def _tiff_oku(icerik):
+    """GeoTIFF baytlarını 2B numpy dizisine çevirir (ilk bant)."""
+    try:
+        import tifffile
+        return tifffile.imread(io.BytesIO(icerik))
+    except ImportError:
+        pass
+    try:
+        from rasterio.io import MemoryFile
+        with MemoryFile(icerik) as mf, mf.open() as ds:
+            return ds.read(1)
+    except ImportError:
+        raise RuntimeError("GeoTIFF okumak için 'pip install tifffile' (veya rasterio) gerekli.")
+
+
+class ToprakRaster:
+    """
+    Kuzey-yukarı düzenli ızgara: satır 0 = lat_max, sütun 0 = lon_min.
+    Değerler pH (float32), eksik hücreler NaN.
+    """
+
+    def __init__(self, path="soil_phh2o_0-5cm", bbox=(LAT_MIN, LAT_MAX, LON_MIN, LON_MAX), hucre_derece=0.0025):
+        self.npy_path = Path(f"{path}.npy")
+        self.meta_path = Path(f"{path}.json")
+        self._kilit = threading.Lock()
+
+        if self.npy_path.exists() and self.meta_path.exists():
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+            self.lat_min, self.lat_max, self.lon_min, self.lon_max = meta["bbox"]
+            self.hucre = meta["hucre_derece"]
+            self.grid = np.load(self.npy_path, mmap_mode="r+")
+        else:
+            self.lat_min, self.lat_max, self.lon_min, self.lon_max = bbox
+            self.hucre = float(hucre_derece)
+            satir = int(round((self.lat_max - self.lat_min) / self.hucre))
+            sutun = int(round((self.lon_max - self.lon_min) / self.hucre))
+            self.grid = np.lib.format.open_memmap(self.npy_path, mode="w+", dtype=np.float32, shape=(satir, sutun))
+            self.grid[:] = np.nan
+            self.grid.flush()
+            self.meta_path.write_text(
+                json.dumps({"bbox": list(bbox), "hucre_derece": self.hucre, "kapsam": WCS_COVERAGE}),
+                encoding="utf-8",
+            )
+
+    def hucre_indeksi(self, lat, lon):
+        """(satır, sütun) veya kutu dışındaysa None."""
+        i = math.floor(round((self.lat_max - lat) / self.hucre, 9))
+        j = math.floor(round((lon - self.lon_min) / self.hucre, 9))
+        if 0 <= i < self.grid.shape[0] and 0 <= j < self.grid.shape[1]:
+            return i, j
+        return None
+
+    def al(self, lat, lon):
+        ij = self.hucre_indeksi(lat, lon)
+        if ij is None:
+            return None
+        v = self.grid[ij]
+        return None if np.isnan(v) else round(float(v), 1)
+
+    def koy(self, lat, lon, ph):
+        ij = self.hucre_indeksi(lat, lon)
+        if ij is None or ph is None:
+            return
+        with self._kilit:
+            self.grid[ij] = ph
+
+    def dolu_oran(self):
+        return float(np.count_nonzero(~np.isnan(self.grid))) / self.grid.size
+
+    def flush(self):
+        with self._kilit:
+            self.grid.flush()
+
+    def on_yukle(self, timeout=300):
+        """
+        Tüm kutuyu tek bir WCS GetCoverage isteğiyle indirir. SCALESIZE ile çıktı
+        ızgarası bizimkiyle birebir aynı boyutta istenir, böylece yeniden örnekleme gerekmez.
+        """
+        satir, sutun = self.grid.shape
+        params = [
+            ("SERVICE", "WCS"), ("VERSION", "2.0.1"), ("REQUEST", "GetCoverage"),
+            ("COVERAGEID", WCS_COVERAGE), ("FORMAT", "image/tiff"),
+            ("SUBSET", f"long({self.lon_min},{self.lon_max})"),
+            ("SUBSET", f"lat({self.lat_min},{self.lat_max})"),
+            ("SUBSETTINGCRS", "http://www.opengis.net/def/crs/EPSG/0/4326"),
+            ("OUTPUTCRS", "http://www.opengis.net/def/crs/EPSG/0/4326"),
+            ("SCALESIZE", f"long({sutun}),lat({satir})"),
+        ]
+        r = hiz_limiti.istek("soilgrids", http_istemci.get, WCS_URL, params=params, timeout=timeout)
+        r.raise_for_status()
+        ham = _tiff_oku(r.content)
+        if ham.shape != self.grid.shape:
+            raise RuntimeError(f"WCS ızgara boyutu uyuşmuyor: {ham.shape} != {self.grid.shape}")
+
+        # SoilGrids pH*10 int16 tutar
+        ph = np.where(ham == NODATA, np.nan, ham.astype(np.float32) / 10.0)
+        with self._kilit:
+            self.grid[:] = ph
+            self.grid.flush()
+        return self.dolu_oran()
+
+
+if __name__ == "__main__":
+    raster = ToprakRaster()
+    print(f"Izgara: {raster.grid.shape} hücre, {raster.hucre}° -> {raster.npy_path.resolve()}")
+    oran = raster.on_yukle()
+    print(f"Tamamlandı. Dolu hücre oranı: %{oran * 100:.1f}")
@@ -8,17 +8,28 @@
 #!pip install --no-deps "xformers<0.0.27" "trl<0.9.0" peft accelerate bitsandbytes
 
 import torch
+import numpy as np
 from unsloth import FastLanguageModel
-from datasets import load_dataset
+from datasets import Dataset, load_dataset
 from trl import SFTTrainer
 from transformers import TrainingArguments
 
+from paketleme import dolgu_raporu, paketli_ornekler, PaketCollator, KovaCollator, TokenHiziCallback
+
 # ==========================================
 # 2. MODELİN YÜKLENMESİ
 # ==========================================
 max_seq_length = 2048 # Tarım verileri ve geçmiş yıl analizleri uzun olabilir
 dtype = None # None yaparsak otomatik algılar (Float16)
 load_in_4bit = True # VRAM tasarrufu için 4-bit yükleme (Eğitim için şart)
+per_device_train_batch_size = 2 # T4 GPU için güvenli değer
+# "paket": birden çok örnek tek dizide (sınırlar maskeyle korunur) | "kova": benzer boylar aynı batch'te
+# "yok": eski davranış (SFTTrainer metni kendisi tokenize eder, rastgele batch)
+# "paket" varsayılan değil: unsloth'un yamalı dikkatinin özel maskeye uyduğu henüz doğrulanmadı.
+# Önce torch'lu ortamda `python paketleme.py` paketli / tek tek logit farkını ~0 göstermeli.
+paketleme_modu = "kova"
+# Paket sınırları: True -> 4D blok-diyagonal maske (eager / sdpa), False -> yalnızca position_ids (flash-attn varlen)
+paket_4d_maske = True
 
 print("🚀 Model yükleniyor: Qwen/Qwen2.5-1.5B-Instruct...")
 model, tokenizer = FastLanguageModel.from_pretrained(
@@ -87,6 +98,30 @@ print(f"📂 Veri seti işleniyor: {dataset_file}")
 dataset = load_dataset("json", data_files = dataset_file, split = "train")
 dataset = dataset.map(formatting_prompts_func, batched = True)
 
+# Token uzunluklarını ölç: dolgu israfı eğitimden önce görünsün
+tokenize = dataset.map(
+    lambda e: {"input_ids": tokenizer(e["text"], truncation = True, max_length = max_seq_length)["input_ids"]},
+    batched = True, remove_columns = dataset.column_names,
+)
+uzunluklar = np.array([len(ids) for ids in tokenize["input_ids"]])
+dolgu_raporu(uzunluklar, per_device_train_batch_size, max_seq_length)
+
+collator = None
+ek_ayarlar = {}
+if paketleme_modu == "paket":
+    dataset = Dataset.from_list(paketli_ornekler(tokenize["input_ids"], max_seq_length))
+    collator = PaketCollator(
+        tokenizer.pad_token_id, dort_boyutlu_maske = paket_4d_maske,
+        maske_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16,
+    )
+elif paketleme_modu == "kova":
+    dataset = tokenize.add_column("uzunluk", uzunluklar.tolist())
+    collator = KovaCollator(tokenizer.pad_token_id)
+    ek_ayarlar = dict(group_by_length = True, length_column_name = "uzunluk")
+if collator is not None:
+    # Veri zaten tokenize / paketli: SFTTrainer yeniden hazırlamasın, ek sütunlar collator'a ulaşsın
+    ek_ayarlar["remove_unused_columns"] = False
+
 # ==========================================
 # 4. EĞİTİM AYARLARI (TRAINING)
 # ==========================================
@@ -97,9 +132,12 @@ trainer = SFTTrainer(
     dataset_text_field = "text",
     max_seq_length = max_seq_length,
     dataset_num_proc = 2,
-    packing = False, 
+    packing = False, # Paketleme paketleme.py'de (örnek sınırları korunarak) yapılır
+    data_collator = collator,
+    dataset_kwargs = {"skip_prepare_dataset": True} if collator is not None else None,
+    callbacks = [TokenHiziCallback(collator)] if collator is not None else None,
     args = TrainingArguments(
-        per_device_train_batch_size = 2, # T4 GPU için güvenli değer
+        per_device_train_batch_size = per_device_train_batch_size,
         gradient_accumulation_steps = 4, # 2x4 = 8 batch size gibi davranır
         warmup_steps = 5,
         num_train_epochs = 1, # 5000 veri için 1 tur yeterlidir (Ezberlememesi için)
@@ -112,6 +150,7 @@ trainer = SFTTrainer(
         lr_scheduler_type = "linear",
         seed = 3407,
         output_dir ="models/outputs",
+        **ek_ayarlar,
     ),
 )
 
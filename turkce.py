@@ -0,0 +1,76 @@
+"""
+turkce.py — Türkçe metin normalizasyonu yardımcıları.
+
+str.lower() Türkçe'de yanlıştır: "I".lower() == "i" (doğrusu "ı") ve
+"İ".lower() == "i̇" (birleşik nokta ile). Burada önce I/İ dönüşümü yapılır.
+
+Arama için (hibrit_arama.py) ek olarak:
+  - kok(): çekim eklerini soyan hafif kök bulucu ("yılında" -> "yıl", "pamuğun" -> "pamuk")
+  - katla(): Türkçe karakterleri ASCII'ye indirger ("Şanlıurfa" ve "Sanliurfa" aynı terim)
+  - terimler(): metin -> arama terimleri (sayılar olduğu gibi kalır: yıllar kesin eşleşir)
+"""
+
+import re
+
+_BUYUK_I = str.maketrans({"I": "ı", "İ": "i"})
+_ASCII = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_KELIME = re.compile(r"\w+", re.UNICODE)
+
+# Uzundan kısaya; her adımda en uzun eşleşen ek soyulur (en fazla EK_TUR kez)
+_EKLER = sorted({
+    # çoğul + iyelik/hal
+    "larından", "lerinden", "larında", "lerinde", "larının", "lerinin", "ların", "lerin",
+    "ları", "leri", "lar", "ler",
+    # tamlayan / bulunma / ayrılma / yönelme / belirtme
+    "ının", "inin", "unun", "ünün", "nın", "nin", "nun", "nün",
+    "ında", "inde", "unda", "ünde", "nda", "nde",
+    "ından", "inden", "undan", "ünden", "ndan", "nden",
+    "dan", "den", "tan", "ten", "da", "de", "ta", "te",
+    "ına", "ine", "una", "üne", "ya", "ye", "yı", "yi", "yu", "yü",
+    "ın", "in", "un", "ün",
+    # ek-fiil / soru
+    "dır", "dir", "dur", "dür", "tır", "tir", "tur", "tür",
+    "ydı", "ydi", "ydu", "ydü", "dı", "di", "du", "dü", "tı", "ti", "tu", "tü",
+    # iyelik (3. tekil) ve tek ünlü hal ekleri
+    "sı", "si", "su", "sü", "ı", "i", "u", "ü", "a", "e",
+}, key=len, reverse=True)
+EN_KISA_KOK = 3
+EK_TUR = 2
+# Ek soyulunca yumuşamış ünsüz geri sertleşir: pamuğ -> pamuk, ağacı -> ağac -> ağaç
+_SERTLESME = {"ğ": "k", "b": "p", "c": "ç"}
+
+
+def tr_kucuk(metin):
+    """Türkçe kurallarıyla küçük harf + boşluk sadeleştirme."""
+    if metin is None:
+        return ""
+    return " ".join(str(metin).translate(_BUYUK_I).lower().split())
+
+
+def katla(metin):
+    """Küçük harfli metnin ASCII katlaması (ş->s, ı->i, ğ->g ...)."""
+    return metin.translate(_ASCII)
+
+
+def kok(kelime):
+    """Küçük harfli tek kelimenin kaba kökü. Sayılar ve kısa kelimeler olduğu gibi döner."""
+    if kelime.isdigit() or len(kelime) <= EN_KISA_KOK:
+        return kelime
+    soyuldu = False
+    for _ in range(EK_TUR):
+        for ek in _EKLER:
+            if kelime.endswith(ek) and len(kelime) - len(ek) >= EN_KISA_KOK:
+                kelime = kelime[:-len(ek)]
+                soyuldu = True
+                break
+        else:
+            break
+    if soyuldu and kelime[-1] in _SERTLESME:
+        kelime = kelime[:-1] + _SERTLESME[kelime[-1]]
+    return kelime
+
+
+def terimler(metin):
+    """Metin -> arama terimleri (küçük harf, kök, ASCII katlama)."""
+    # str.lower() ile üretilmiş "i̇" (i + birleşik nokta) kelimeyi bölmesin
+    return [katla(kok(k)) for k in _KELIME.findall(tr_kucuk(metin).replace("\u0307", ""))]
@@ -0,0 +1,147 @@
+"""
+uretim_denemesi.py — dataset_olusturucu.uret_paralel için yerel stub ZaiClient ile deneme.
+
+Ağa çıkılmaz: LLM yerine rastgele gecikmeli bir stub istemci, hava durumu yerine
+sabit bir fonksiyon, Veri.xlsx yerine küçük bir stub bilgi bankası kullanılır.
+Bazı sorular boş cevap, bazıları istisna döndürür (tekrar denemede de aynı).
+Kontrol edilenler:
+  - sıra:   yazılan satırlar hazırlık sırasını (sira) izler, cevaplar karışık sırada gelse de
+  - hedef:  başarısız çağrıların kotası iade edilir, tam olarak 'hedef' satır yazılır
+  - uçuşta: aynı anda en fazla llm_paralel LLM çağrısı yapılır
+
+    python uretim_denemesi.py [hedef] [llm_paralel]
+"""
+
+import os
+import sys
+import time
+import zlib
+import random
+import tempfile
+import threading
+from types import SimpleNamespace
+
+# Stub'ın hızı ölçülür, sağlayıcı kotası değil (limit_al ilk çağrıda okur)
+os.environ.setdefault("RATE_LIMIT_ZAI", "1000")
+
+import pandas as pd
+
+import dataset_olusturucu as do
+from kontrol_noktasi import KontrolNoktasi
+
+
+class StubIstemci:
+    """ZaiClient yerine geçer: chat.completions.create(model, messages) -> choices[0].message.content"""
+
+    def __init__(self, bos_orani=5, hata_orani=11, gecikme=(0.01, 0.15)):
+        self.bos_orani = bos_orani
+        self.hata_orani = hata_orani
+        self.gecikme = gecikme
+        self._kilit = threading.Lock()
+        self.ucusta = 0
+        self.en_fazla_ucusta = 0
+        self.cagri = 0
+        self.basarili = set()  # Cevap verilen sorular
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages):
+        soru = messages[-1]["content"]
+        with self._kilit:
+            self.ucusta += 1
+            self.cagri += 1
+            self.en_fazla_ucusta = max(self.en_fazla_ucusta, self.ucusta)
+        try:
+            time.sleep(random.uniform(*self.gecikme))  # Cevaplar karışık sırada döner
+            h = zlib.crc32(soru.encode("utf-8"))
+            if h % self.hata_orani == 0:
+                raise RuntimeError("stub: sunucu hatası")
+            icerik = "" if h % self.bos_orani == 0 else f"Stub cevap ({model})"
+            if icerik:
+                with self._kilit:
+                    self.basarili.add(soru)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=icerik))])
+        finally:
+            with self._kilit:
+                self.ucusta -= 1
+
+
+class StubBilgiBankasi:
+    BITKILER = ["Buğday", "Arpa", "Mercimek", "Pamuk", "Mısır", "Antep Fıstığı"]
+
+    def bitki_getir_random(self):
+        ad = random.choice(self.BITKILER)
+        return {"tam_isim": ad, "tur": ad, "ideal_sicaklik": "15-25"}
+
+    def verim_getir(self, tur):
+        return {2022: 400, 2023: 420}
+
+
+class KayitliKontrolNoktasi(KontrolNoktasi):
+    """Yazılan anahtarların sırasını da tutar."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.yazilanlar = []
+
+    def ekle(self, anahtar, kayit=None):
+        if kayit is not None:
+            self.yazilanlar.append(anahtar)
+        super().ekle(anahtar, kayit)
+
+
+def stub_hava(lat, lon, target_date):
+    return {"temp": round(10 + (target_date.toordinal() % 20), 1), "rain": target_date.day % 7,
+            "max": 30.0, "min": 5.0}
+
+
+def calistir(hedef=40, llm_paralel=4):
+    dizin = tempfile.mkdtemp(prefix="uretim_denemesi_")
+    do.YANIT_ONBELLEGI_PATH = os.path.join(dizin, "llm_cache.sqlite")  # Gerçek önbellek kullanılmasın
+    do.get_historical_weather = stub_hava
+
+    # Hazırlık sırası = sira sırası (tek hazırlık thread'i, tamamlanan örneğe hemen sira verilir)
+    hazirlanan = []
+    asil_tamamla = do._ornek_tamamla
+
+    def tamamla(db, ornek):
+        sonuc = asil_tamamla(db, ornek)
+        if sonuc is not None:
+            hazirlanan.append((sonuc["anahtar"], sonuc["soru"]))
+        return sonuc
+
+    do._ornek_tamamla = tamamla
+
+    istemci = StubIstemci()
+    grid_df = pd.DataFrame({"lat": [37.15, 37.20, 36.95], "lon": [38.80, 38.95, 39.10]})
+    cikti = os.path.join(dizin, "cikti.jsonl")
+    t0 = time.perf_counter()
+    with KayitliKontrolNoktasi(cikti, batch_boyutu=7) as cp:
+        count = do.uret_paralel(StubBilgiBankasi(), grid_df, cp, hedef, istemci=istemci, llm_paralel=llm_paralel)
+        yazilanlar = cp.yazilanlar
+    sure = time.perf_counter() - t0
+    do._ornek_tamamla = asil_tamamla
+
+    with open(cikti, "r", encoding="utf-8") as f:
+        satir = sum(1 for s in f if s.strip())
+
+    # Beklenen: hazırlık sırasıyla, cevabı gelen örnekler (sonuna kadar yazılanlar kadar)
+    beklenen = [a for a, soru in hazirlanan if soru in istemci.basarili][:len(yazilanlar)]
+    basarisiz = len({s for _, s in hazirlanan} - istemci.basarili)
+
+    kontroller = {
+        "sıra": yazilanlar == beklenen,
+        "hedef": count == hedef and satir == hedef,
+        "uçuşta": istemci.en_fazla_ucusta <= llm_paralel,
+    }
+    print(f"hedef={hedef} llm_paralel={llm_paralel} ({sure:.2f} sn, çıktı: {cikti})")
+    print(f"  hazırlanan={len(hazirlanan)} başarısız={basarisiz} yazılan={satir} "
+          f"stub çağrı={istemci.cagri} en fazla uçuşta={istemci.en_fazla_ucusta}")
+    for ad, tamam in kontroller.items():
+        print(f"  {ad:<7} {'OK' if tamam else 'HATA'}")
+    return all(kontroller.values())
+
+
+if __name__ == "__main__":
+    hedef = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    llm_paralel = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    sys.exit(0 if calistir(hedef, llm_paralel) else 1)
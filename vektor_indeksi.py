@@ -0,0 +1,257 @@
+"""
+vektor_indeksi.py — Qdrant gerektirmeyen, süreç içi vektör arama arka ucu.
+
+Gömmeler L2-normalize edilmiş float32 matris olarak tek bir dosyada tutulur ve
+np.memmap ile açılır (yükleme milisaniyeler, bellek kopyası yok). Kosinüs skoru
+tek bir BLAS matris-vektör çarpımı ve argpartition ile kesin top-k olarak hesaplanır.
+İsteğe bağlı IVF modu: vektörler k-means kümelerine göre sıralanıp yazılır,
+sorguda yalnızca en yakın nprobe kümesinin satırları taranır.
+
+Arayüz QdrantClient.query_points ile uyumludur:
+
+    client = YerelIstemci("vektor_indeksi")            # <dizin>/<koleksiyon>.vidx
+    sonuc = client.query_points(collection_name="tarim_bilgi_bankasi", query=vec, limit=3)
+    for hit in sonuc.points:
+        hit.id, hit.score, hit.payload
+
+Qdrant'taki koleksiyonu dosyaya aktarmak için:
+    python vektor_indeksi.py tarim_bilgi_bankasi [qdrant_url]
+
+Dosya biçimi: b"VIDX1\\n" + 8 bayt başlık uzunluğu + JSON başlık, 64 bayta hizalı
+float32 matris (n x d), ardından IVF dizileri ve payload JSON'u.
+"""
+
+import os
+import sys
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+SIHIR = b"VIDX1\n"
+HIZA = 64
+
+
+def normalize_et(vektorler):
+    v = np.asarray(vektorler, dtype=np.float32)
+    if v.ndim == 1:
+        v = v[None, :]
+    norm = np.linalg.norm(v, axis=1, keepdims=True)
+    return v / np.maximum(norm, 1e-12)
+
+
+class Nokta:
+    """qdrant_client ScoredPoint'in kullanılan alanları."""
+    __slots__ = ("id", "score", "payload")
+
+    def __init__(self, id, score, payload):
+        self.id = id
+        self.score = score
+        self.payload = payload
+
+    def __repr__(self):
+        return f"Nokta(id={self.id!r}, score={self.score:.4f})"
+
+
+class SorguSonucu:
+    __slots__ = ("points",)
+
+    def __init__(self, points):
+        self.points = points
+
+
+# ---------------------------
+# IVF (k-means) yardımcıları
+# ---------------------------
+def _kmeans(x, k, iterasyon=15, tohum=0):
+    """Küresel k-means (kosinüs): merkezler her adımda yeniden normalize edilir."""
+    rng = np.random.default_rng(tohum)
+    merkezler = x[rng.choice(len(x), size=k, replace=False)].copy()
+    for _ in range(iterasyon):
+        atama = np.argmax(x @ merkezler.T, axis=1)
+        # Küme toplamları: atamaya göre sıralayıp reduceat (np.add.at'ten çok daha hızlı)
+        sira = np.argsort(atama, kind="stable")
+        adet = np.bincount(atama, minlength=k)
+        bos = adet == 0
+        toplam = np.zeros_like(merkezler)
+        baslangic = np.concatenate([[0], np.cumsum(adet)[:-1]])
+        toplam[~bos] = np.add.reduceat(x[sira], baslangic[~bos], axis=0)
+        # Boş kalan kümeye rastgele bir nokta atanır
+        toplam[bos] = x[rng.choice(len(x), size=int(bos.sum()))]
+        merkezler = normalize_et(toplam)
+    return merkezler, np.argmax(x @ merkezler.T, axis=1)
+
+
+class VektorIndeksi:
+    def __init__(self, vektorler, payloadlar=None, idler=None, merkezler=None, liste_sinirlari=None):
+        self.vektorler = vektorler  # (n, d) float32, normalize; memmap olabilir
+        n = len(vektorler)
+        self.payloadlar = payloadlar if payloadlar is not None else [{} for _ in range(n)]
+        self.idler = idler if idler is not None else list(range(n))
+        self.merkezler = merkezler  # (k, d) veya None
+        self.liste_sinirlari = liste_sinirlari  # (k + 1,) küme satır aralıkları
+
+    @classmethod
+    def olustur(cls, vektorler, payloadlar=None, idler=None, ivf_kume=0):
+        """
+        Bellekte indeks kurar. ivf_kume > 0 ise vektörler o kadar kümeye ayrılıp
+        kümeye göre sıralanır (sıra değişir; id/payload'lar birlikte taşınır).
+        """
+        x = normalize_et(vektorler)
+        n = len(x)
+        payloadlar = list(payloadlar) if payloadlar is not None else [{} for _ in range(n)]
+        idler = list(idler) if idler is not None else list(range(n))
+        if not ivf_kume or n < 2 * ivf_kume:
+            return cls(x, payloadlar, idler)
+        merkezler, atama = _kmeans(x, ivf_kume)
+        sira = np.argsort(atama, kind="stable")
+        sinirlar = np.concatenate([[0], np.cumsum(np.bincount(atama, minlength=ivf_kume))]).astype(np.int64)
+        return cls(x[sira], [payloadlar[i] for i in sira], [idler[i] for i in sira], merkezler, sinirlar)
+
+    def __len__(self):
+        return len(self.vektorler)
+
+    @property
+    def boyut(self):
+        return self.vektorler.shape[1]
+
+    # ---------------------------
+    # Dosya
+    # ---------------------------
+    def kaydet(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        n, d = self.vektorler.shape
+        payload_bayt = json.dumps({"id": self.idler, "payload": self.payloadlar}, ensure_ascii=False).encode("utf-8")
+        baslik = {"n": n, "d": d, "k": 0 if self.merkezler is None else len(self.merkezler),
+                  "payload_bayt": len(payload_bayt)}
+        baslik_bayt = json.dumps(baslik).encode("utf-8")
+        on_ek = len(SIHIR) + 8 + len(baslik_bayt)
+        dolgu = (-on_ek) % HIZA
+
+        gecici = path.with_suffix(path.suffix + ".tmp")
+        with open(gecici, "wb") as f:
+            f.write(SIHIR + struct.pack("<Q", len(baslik_bayt)) + baslik_bayt + b"\0" * dolgu)
+            f.write(np.ascontiguousarray(self.vektorler, dtype=np.float32).tobytes())
+            if self.merkezler is not None:
+                f.write(np.ascontiguousarray(self.merkezler, dtype=np.float32).tobytes())
+                f.write(np.asarray(self.liste_sinirlari, dtype=np.int64).tobytes())
+            f.write(payload_bayt)
+        os.replace(gecici, path)  # Yarım yazılmış indeks okunmaz
+
+    @classmethod
+    def yukle(cls, path):
+        """Matris memmap ile açılır; yalnızca başlık ve payload'lar okunur."""
+        with open(path, "rb") as f:
+            if f.read(len(SIHIR)) != SIHIR:
+                raise ValueError(f"Vektör indeksi değil: {path}")
+            (uzunluk,) = struct.unpack("<Q", f.read(8))
+            baslik = json.loads(f.read(uzunluk))
+            ofset = len(SIHIR) + 8 + uzunluk
+            ofset += (-ofset) % HIZA
+            n, d, k = baslik["n"], baslik["d"], baslik["k"]
+
+            vektorler = np.memmap(path, dtype=np.float32, mode="r", offset=ofset, shape=(n, d)) if n else \
+                np.empty((0, d), dtype=np.float32)
+            ofset += n * d * 4
+            merkezler = sinirlar = None
+            if k:
+                merkezler = np.fromfile(f, dtype=np.float32, count=k * d, offset=ofset - f.tell()).reshape(k, d)
+                sinirlar = np.fromfile(f, dtype=np.int64, count=k + 1)
+                ofset += k * d * 4 + (k + 1) * 8
+            f.seek(ofset)
+            meta = json.loads(f.read(baslik["payload_bayt"]))
+        return cls(vektorler, meta["payload"], meta["id"], merkezler, sinirlar)
+
+    # ---------------------------
+    # Arama
+    # ---------------------------
+    def _aday_satirlar(self, q, nprobe):
+        """IVF: en yakın nprobe kümesinin satır aralıkları; IVF yoksa None (tam tarama)."""
+        if self.merkezler is None or nprobe is None or nprobe >= len(self.merkezler):
+            return None
+        kumeler = np.argpartition(-(self.merkezler @ q), nprobe - 1)[:nprobe]
+        return [(int(self.liste_sinirlari[c]), int(self.liste_sinirlari[c + 1])) for c in sorted(kumeler)]
+
+    def ara_toplu(self, sorgular, limit=10, nprobe=None):
+        """(m, d) sorgu -> her sorgu için [(satır, skor), ...] (skor azalan)."""
+        q = normalize_et(sorgular)
+        if q.shape[1] != self.boyut:
+            raise ValueError(f"Sorgu boyutu {q.shape[1]}, indeks boyutu {self.boyut}")
+        # Tam taramada tüm sorgular tek matris çarpımıyla skorlanır
+        tam = self.merkezler is None or nprobe is None or nprobe >= len(self.merkezler)
+        tum_skorlar = (self.vektorler @ q.T).T if tam else None
+        sonuclar = []
+        for j, qi in enumerate(q):
+            araliklar = None if tam else self._aday_satirlar(qi, nprobe)
+            if araliklar is None:
+                satirlar = None
+                skor = tum_skorlar[j]
+            else:
+                satirlar = np.concatenate([np.arange(a, b) for a, b in araliklar]) if araliklar else \
+                    np.empty(0, dtype=np.int64)
+                skor = np.concatenate([self.vektorler[a:b] @ qi for a, b in araliklar]) if araliklar else \
+                    np.empty(0, dtype=np.float32)
+            k = min(limit, len(skor))
+            if k == 0:
+                sonuclar.append([])
+                continue
+            en_iyi = np.argpartition(-skor, k - 1)[:k]
+            en_iyi = en_iyi[np.argsort(-skor[en_iyi], kind="stable")]
+            secili = en_iyi if satirlar is None else satirlar[en_iyi]
+            sonuclar.append(list(zip(secili.tolist(), skor[en_iyi].tolist())))
+        return sonuclar
+
+    def ara(self, sorgu, limit=10, nprobe=None):
+        return [Nokta(self.idler[i], s, self.payloadlar[i])
+                for i, s in self.ara_toplu(sorgu, limit, nprobe)[0]]
+
+
+class YerelIstemci:
+    """QdrantClient.query_points yerine geçen, dizindeki .vidx dosyalarını kullanan istemci."""
+
+    def __init__(self, dizin="vektor_indeksi", nprobe=None):
+        self.dizin = Path(dizin)
+        self.nprobe = nprobe
+        self._indeksler = {}
+
+    def indeks(self, collection_name):
+        if collection_name not in self._indeksler:
+            self._indeksler[collection_name] = VektorIndeksi.yukle(self.dizin / f"{collection_name}.vidx")
+        return self._indeksler[collection_name]
+
+    def query_points(self, collection_name, query, limit=10, **kwargs):
+        nprobe = kwargs.get("nprobe", self.nprobe)
+        return SorguSonucu(self.indeks(collection_name).ara(query, limit, nprobe))
+
+    def koleksiyon_yaz(self, collection_name, vektorler, payloadlar, idler=None, ivf_kume=0):
+        indeks = VektorIndeksi.olustur(vektorler, payloadlar, idler, ivf_kume)
+        indeks.kaydet(self.dizin / f"{collection_name}.vidx")
+        self._indeksler.pop(collection_name, None)
+        return indeks
+
+
+def qdrant_aktar(qdrant_client, collection_name, hedef_dizin="vektor_indeksi", ivf_kume=0, sayfa=1024):
+    """Qdrant koleksiyonunu (vektör + payload) yerel .vidx dosyasına aktarır."""
+    vektorler, payloadlar, idler = [], [], []
+    ofset = None
+    while True:
+        noktalar, ofset = qdrant_client.scroll(collection_name=collection_name, limit=sayfa, offset=ofset,
+                                               with_payload=True, with_vectors=True)
+        for p in noktalar:
+            vektorler.append(p.vector)
+            payloadlar.append(p.payload or {})
+            idler.append(p.id if isinstance(p.id, int) else str(p.id))
+        if ofset is None:
+            break
+    return YerelIstemci(hedef_dizin).koleksiyon_yaz(collection_name, vektorler, payloadlar, idler, ivf_kume)
+
+
+if __name__ == "__main__":
+    from qdrant_client import QdrantClient
+
+    koleksiyon = sys.argv[1] if len(sys.argv) > 1 else "tarim_bilgi_bankasi"
+    url = sys.argv[2] if len(sys.argv) > 2 else "http://localhost:6333"
+    indeks = qdrant_aktar(QdrantClient(url=url), koleksiyon)
+    print(f"{koleksiyon}: {len(indeks)} vektör ({indeks.boyut} boyut) -> vektor_indeksi/{koleksiyon}.vidx")
@@ -9,7 +9,7 @@ Veri.py — Türkiye için yorum bazlı LLM veri seti üretici (3rd-party API'la
 
 - NASA POWER (temporal daily; future için dünü proxy alır)
 - SoilGrids (ph üst katman)
-- Rate limit, retry, hataya dayanıklı
+- Sağlayıcı bazlı rate limit (hiz_limiti.py), retry, hataya dayanıklı
 - Çıktı: JSONL (her satır {"input": "...", "output":..."})
 
 !!! NOT: Bu sürüm, IDE'den doğrudan çalıştırma için ayarlanmıştır.
@@ -19,14 +19,24 @@ Veri.py — Türkiye için yorum bazlı LLM veri seti üretici (3rd-party API'la
 
 import os
 import csv
-import json
-import time
+import asyncio
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 # import argparse # IDE'den çalıştırmak için argparse kaldırıldı
 from pathlib import Path
 
 import requests
 
+import hiz_limiti
+import http_istemci
+from geocode_onbellek import GeocodeOnbellek
+from toprak_onbellek import ToprakRaster
+from hava_onbellek import HavaSerisiDeposu
+from kontrol_noktasi import KontrolNoktasi, satir_anahtari
+from gozlem_deposu import GozlemDeposu
+from il_siniri import IlSiniri
+
 # --- YENİ EKLENEN BÖLÜM ---
 # .env dosyasını yüklemek için dotenv kütüphanesini import et
 try:
@@ -57,6 +67,28 @@ GEO_URL = os.getenv("GEOCODING_API_URL", "https://api.opencagedata.com/geocode/v
 NASA_URL = os.getenv("NASA_POWER_API_URL", "https://power.larc.nasa.gov/api")
 SOIL_URL = os.getenv("SOILGRIDS_API_URL", "https://rest.isric.org")
 
+# Reverse geocode karo önbelleği (boş path -> kapalı)
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "geocode_cache.sqlite")
+GEOCODE_TILE_DEG = float(os.getenv("GEOCODE_TILE_DEG", "0.05"))
+GEOCODE_TTL_DAYS = int(os.getenv("GEOCODE_TTL_DAYS", "180"))
+
+# SoilGrids pH raster deposu (boş path -> kapalı). Toplu indirme: python toprak_onbellek.py
+SOIL_CACHE_PATH = os.getenv("SOIL_CACHE_PATH", "soil_phh2o_0-5cm")
+
+# NASA POWER günlük seri önbelleği (karo başına 2020–2025 tek istek). Ön yükleme: python hava_onbellek.py
+WEATHER_CACHE_DIR = os.getenv("WEATHER_CACHE_DIR", "weather_cache")
+
+# Ham gözlem deposu (boş -> kapalı). Yorumları ağsız yeniden üretmek için: python etiket_motoru.py
+OBSERVATION_STORE_DIR = os.getenv("OBSERVATION_STORE_DIR", "gozlemler")
+
+# İl sınırı ön filtresi (boş -> kapalı): sınır dışı noktalar hiç API çağrısı yapılmadan atlanır.
+# SINIR DOSYASI GEREKİR: depoda yoktur. geoBoundaries (gbOpen TUR ADM1) veya GADM (gadm41_TUR_1)
+# GeoJSON dosyasını indirip yolunu verin; il, PROVINCE_TO_FILTER adıyla shapeName / NAME_1'den seçilir.
+# Sınıra PROVINCE_BOUNDARY_BUFFER_DEG kadar yakın noktalar geocode'a bırakılır. Uzaklık enlem
+# derecesiyle ölçülür (boylam cos(enlem) ile ölçekli): 0.06° ≈ 6.7 km (sadeleştirilmiş sınır dosyaları için pay).
+PROVINCE_BOUNDARY_PATH = os.getenv("PROVINCE_BOUNDARY_PATH", "")
+PROVINCE_BOUNDARY_BUFFER_DEG = float(os.getenv("PROVINCE_BOUNDARY_BUFFER_DEG", "0.06"))
+
 # Bitki rehberi (yorum üretimi için)
 CROPS = {
     "Buğday": {"ph": (6.0, 7.5), "soil_moist": (20, 35), "temp": (12, 25)},
@@ -68,6 +100,17 @@ CROPS = {
 }
 
 
+# Async toplama modu: sağlayıcı başına aynı anda açık olabilecek istek sayısı
+PROVIDER_CONCURRENCY = {
+    "opencage": 4,
+    "weatherapi": 8,
+    "nasa_power": 6,
+    "soilgrids": 4,
+}
+MAX_IN_FLIGHT = 32  # Aynı anda işlenen grid noktası sayısı
+CHECKPOINT_BATCH = 50  # Çökme durumunda kaybedilecek en fazla nokta sayısı
+
+
 # ---------------------------
 # Yardımcılar
 # ---------------------------
@@ -86,12 +129,37 @@ def _num(x, cast=float):
 # ---------------------------
 # Geocoding (OpenCage)
 # ---------------------------
+_geo_cache = None
+_geo_cache_lock = threading.Lock()
+
+
+class GeocodeHatasi(RuntimeError):
+    """Geocode sorgusu yapılamadı (anahtar yok, kota, ağ / HTTP hatası); nokta sonra tekrar denenmeli."""
+
+
+def _geocode_cache():
+    global _geo_cache
+    with _geo_cache_lock:  # ASYNC_MODE'da to_thread işçileri aynı anda çağırır: tek bağlantı açılsın
+        if _geo_cache is None and GEOCODE_CACHE_PATH:
+            _geo_cache = GeocodeOnbellek(GEOCODE_CACHE_PATH, GEOCODE_TILE_DEG, GEOCODE_TTL_DAYS)
+    return _geo_cache
+
+
 def reverse_geocode_country(lat, lon):
-    """OpenCage reverse geocoding -> (country_code, admin_name) veya (None, None)"""
+    """
+    OpenCage reverse geocoding -> (country_code, admin_name); sonuç yoksa (None, None).
+    Sorgu yapılamazsa GeocodeHatasi fırlatır: filtre reddi sayılmaz, kontrol noktasına yazılmaz.
+    """
+    cache = _geocode_cache()
+    if cache is not None:
+        hit = cache.al(lat, lon)
+        if hit is not None:
+            return hit
     if not GEO_KEY:
-        return None, None
+        raise GeocodeHatasi("GEOCODING_API_KEY tanımlı değil (.env dosyasını kontrol edin).")
     try:
-        r = requests.get(
+        r = hiz_limiti.istek(
+            "opencage", http_istemci.get,
             f"{GEO_URL}/json",
             params={"q": f"{lat}+{lon}", "key": GEO_KEY, "language": "tr", "no_annotations": 1, "pretty": 0},
             timeout=20,
@@ -103,13 +171,26 @@ def reverse_geocode_country(lat, lon):
             code = (comp.get("country_code") or "").upper()
             # İl (state), ilçe (province/county) veya şehir (city) bilgilerini al
             admin = comp.get("state") or comp.get("province") or comp.get("county") or comp.get("city")
+            if cache is not None and code:
+                # Hata/kota durumları (None) önbelleğe yazılmaz
+                cache.koy(lat, lon, code, admin)
             return code, admin
-    except Exception:
-        # gagal (quota, ağ, vs.) -> geri None
-        pass
+    except Exception as e:
+        # Kota, ağ, HTTP hatası: gerçek bir "ülke/il dışı" cevabı değil
+        raise GeocodeHatasi(f"reverse geocode başarısız ({lat:.3f},{lon:.3f}): {e}") from e
     return None, None
 
 
+def _geocode_for_filter(lat, lon, country_filter, province_filter):
+    """Filtre varken geocode hatası yukarı iletilir; filtre yoksa admin bilgisi olmadan devam edilir."""
+    try:
+        return reverse_geocode_country(lat, lon)
+    except GeocodeHatasi:
+        if country_filter or province_filter:
+            raise
+        return None, None
+
+
 # ---------------------------
 # WeatherAPI (current.json OLARAK GÜNCELLENDİ)
 # ---------------------------
@@ -136,7 +217,7 @@ def fetch_weather(lat, lon, date_iso):
     params = {"key": WAPI_KEY, "q": f"{lat},{lon}"}
 
     url = f"{WAPI_URL}/{ep}"
-    r = requests.get(url, params=params, timeout=25)
+    r = hiz_limiti.istek("weatherapi", http_istemci.get, url, params=params, timeout=25)
     r.raise_for_status()
     js = r.json()
 
@@ -171,10 +252,23 @@ def fetch_weather(lat, lon, date_iso):
 # ---------------------------
 # NASA POWER (safe proxy for future)
 # ---------------------------
+_weather_store = None
+_weather_store_lock = threading.Lock()
+
+
+def _weather_cache():
+    global _weather_store
+    with _weather_store_lock:  # Tek depo: karo kilitleri tüm thread'lerde ortak olsun
+        if _weather_store is None and WEATHER_CACHE_DIR:
+            _weather_store = HavaSerisiDeposu(WEATHER_CACHE_DIR)
+    return _weather_store
+
+
 def fetch_nasa(lat, lon, date_iso):
     """
     NASA POWER: temporal/daily/point
     - Eğer target > today, proxy = yesterday
+    - Önce karonun toplu serisine bakar (hava_onbellek); aralık dışıysa tek gün ister
     - Retry/backoff, 500 hatalarında tekrar dener
     Döndürür: {"solar_irr": float or None}
     """
@@ -184,6 +278,15 @@ def fetch_nasa(lat, lon, date_iso):
     if target > today:
         target = today - datetime.timedelta(days=1)
 
+    store = _weather_cache()
+    if store is not None:
+        try:
+            day = store.gun_degeri("nasa_power", lat, lon, target)
+        except Exception:
+            day = None
+        if day is not None and day["ALLSKY_SFC_SW_DWN"] is not None:
+            return {"solar_irr": round(day["ALLSKY_SFC_SW_DWN"], 2)}
+
     ymd = target.strftime("%Y%m%d")
     params = {
         "latitude": lat,
@@ -195,38 +298,51 @@ def fetch_nasa(lat, lon, date_iso):
         "format": "JSON",
     }
     url = f"{NASA_URL}/temporal/daily/point"
-    backoff = 0.8
-    for _ in range(3):
-        try:
-            r = requests.get(url, params=params, timeout=25)
-            r.raise_for_status()
-            js = r.json()
-            series = js.get("properties", {}).get("parameter", {}).get("ALLSKY_SFC_SW_DWN", {})
-            val = None
-            if isinstance(series, dict) and series:
-                val = next(iter(series.values()))
-            try:
-                return {"solar_irr": round(float(val), 2) if val is not None else None}
-            except Exception:
-                return {"solar_irr": None}
-        except Exception:
-            time.sleep(backoff)
-            backoff *= 1.8
-    return {"solar_irr": None}
+    try:
+        # Retry/backoff ve 429 takibi hiz_limiti'nde
+        r = hiz_limiti.istek("nasa_power", http_istemci.get, url, params=params, timeout=25)
+        r.raise_for_status()
+        js = r.json()
+        series = js.get("properties", {}).get("parameter", {}).get("ALLSKY_SFC_SW_DWN", {})
+        val = None
+        if isinstance(series, dict) and series:
+            val = next(iter(series.values()))
+        return {"solar_irr": round(float(val), 2) if val is not None else None}
+    except Exception:
+        return {"solar_irr": None}
 
 
 # ---------------------------
 # SoilGrids (pH)
 # ---------------------------
+_soil_raster = None
+_soil_raster_lock = threading.Lock()
+
+
+def _soil_cache():
+    global _soil_raster
+    with _soil_raster_lock:  # fetch_soil thread'lerde çalışır: raster bir kez açılsın
+        if _soil_raster is None and SOIL_CACHE_PATH:
+            _soil_raster = ToprakRaster(SOIL_CACHE_PATH)
+    return _soil_raster
+
+
 def fetch_soil(lat, lon):
     """
     SoilGrids v2.0 properties/query -> üst katman ph (phh2o)
+    Önce yerel raster hücresine bakar; boşsa HTTP'ye gider ve sonucu hücreye yazar.
     Döndürür: {"ph": float or None, "moisture": None}
     """
+    raster = _soil_cache()
+    if raster is not None:
+        ph = raster.al(lat, lon)
+        if ph is not None:
+            return {"ph": ph, "moisture": None}
+
     params = [("lat", lat), ("lon", lon), ("depth", "0-5cm"), ("property", "phh2o")]
     url = f"{SOIL_URL}/soilgrids/v2.0/properties/query"
     try:
-        r = requests.get(url, params=params, timeout=25)
+        r = hiz_limiti.istek("soilgrids", http_istemci.get, url, params=params, timeout=25)
         r.raise_for_status()
         js = r.json()
         ph = None
@@ -243,6 +359,8 @@ def fetch_soil(lat, lon):
             ph = round(float(ph) / 10.0, 1) if ph is not None else None
         except Exception:
             ph = None
+        if raster is not None:
+            raster.koy(lat, lon, ph)
         return {"ph": ph, "moisture": None}
     except Exception:
         return {"ph": None, "moisture": None}
@@ -337,46 +455,53 @@ def build_input(sample):
 # ---------------------------
 # Ana toplayıcı
 # ---------------------------
-def harvest_point(lat, lon, date_iso, plant, country_filter="TR", province_filter=None):
-    """
-    Veri toplama iş akışı.
-    YENİ: province_filter parametresi eklendi.
-    """
-
-    # 1) reverse geocode (optional filter)
-    code, admin = reverse_geocode_country(lat, lon)
-
+def _passes_filter(code, admin, country_filter, province_filter):
+    """Ülke / il filtresini uygular. Nokta geçerliyse True döner."""
     # Ülke filtresi
     if country_filter and (code is None or code != country_filter.upper()):
-        # Eğer OpenCage başarısız olursa code None döner; bu durumda atılmasını istiyorsan continue edilir.
-        # Burada code None ise atlıyoruz (daha hassas kontrol). İstersen bunu değiştir.
-        return None
+        # code None: OpenCage sonuç döndürmedi (ör. deniz / sınır dışı). Başarısız sorgular buraya
+        # gelmez (GeocodeHatasi), böylece yalnızca gerçek ret kontrol noktasına işlenir.
+        return False
 
-    # --- YENİ EKLENEN BÖLÜM ---
     # İl filtresi (örn: "Şanlıurfa")
     if province_filter:
         if not admin:
             # Eğer OpenCage il/ilçe/şehir adı döndürmediyse atla
-            return None
+            return False
 
         # 'admin' içinde 'province_filter' (örn: "Şanlıurfa") geçiyor mu?
         # OpenCage "Şanlıurfa" veya "Şanlıurfa İli" döndürebilir, 'in' ile kontrol güvenlidir.
         if province_filter.lower() not in admin.lower():
             # Eşleşmezse bu noktayı atla
-            return None
-    # --- YENİ BÖLÜM SONU ---
+            return False
+    return True
 
-    # 2) weather (current.json kullanacak şekilde güncellendi)
-    # 'date_iso' parametresi artık fetch_weather tarafından yok sayılacak.
-    wx = fetch_weather(lat, lon, date_iso)
 
-    # 3) nasa
-    ns = fetch_nasa(lat, lon, date_iso)
+_province_bounds = {}
+
+
+def _il_siniri(province_filter):
+    """province_filter için sınır poligonu; dosya yoksa veya il eşleşmezse None."""
+    if not province_filter or not PROVINCE_BOUNDARY_PATH:
+        return None
+    if province_filter not in _province_bounds:
+        try:
+            _province_bounds[province_filter] = IlSiniri.geojson_oku(
+                PROVINCE_BOUNDARY_PATH, ad=province_filter, tampon_derece=PROVINCE_BOUNDARY_BUFFER_DEG)
+        except (OSError, ValueError) as e:
+            print(f"UYARI: İl sınırı ön filtresi kapalı ({PROVINCE_BOUNDARY_PATH}): {e}")
+            _province_bounds[province_filter] = None
+    return _province_bounds[province_filter]
+
+
+def _outside_province(lat, lon, province_filter):
+    """Nokta il poligonunun kesin dışındaysa True (API çağrısı yapılmaz)."""
+    sinir = _il_siniri(province_filter)
+    return sinir is not None and not sinir.icinde(lat, lon)
 
-    # 4) soil
-    soil = fetch_soil(lat, lon)
 
-    sample = {
+def _make_sample(lat, lon, date_iso, plant, admin, wx, ns, soil):
+    return {
         "lat": lat,
         "lon": lon,
         "date_iso": date_iso,
@@ -390,7 +515,172 @@ def harvest_point(lat, lon, date_iso, plant, country_filter="TR", province_filte
         "admin_area": admin,
         "disease": None,  # eğer disease detection servisin varsa ekleyebilirsin
     }
-    return sample
+
+
+def harvest_point(lat, lon, date_iso, plant, country_filter="TR", province_filter=None):
+    """
+    Veri toplama iş akışı.
+    YENİ: province_filter parametresi eklendi.
+    """
+
+    # 1) reverse geocode (optional filter)
+    code, admin = _geocode_for_filter(lat, lon, country_filter, province_filter)
+    if not _passes_filter(code, admin, country_filter, province_filter):
+        return None
+
+    # 2) weather (current.json kullanacak şekilde güncellendi)
+    # 'date_iso' parametresi artık fetch_weather tarafından yok sayılacak.
+    wx = fetch_weather(lat, lon, date_iso)
+
+    # 3) nasa
+    ns = fetch_nasa(lat, lon, date_iso)
+
+    # 4) soil
+    soil = fetch_soil(lat, lon)
+
+    return _make_sample(lat, lon, date_iso, plant, admin, wx, ns, soil)
+
+
+# ---------------------------
+# Async toplayıcı
+# ---------------------------
+async def _limited(sems, provider, fn, *args):
+    """Senkron fetcher'ı, sağlayıcının semaforu altında bir thread'de çalıştırır."""
+    async with sems[provider]:
+        return await asyncio.to_thread(fn, *args)
+
+
+async def harvest_point_async(lat, lon, date_iso, plant, sems, country_filter="TR", province_filter=None):
+    """
+    harvest_point'in async karşılığı.
+    Geocode filtresi geçilirse WeatherAPI, NASA POWER ve SoilGrids aynı anda çağrılır.
+    """
+    code, admin = await _limited(sems, "opencage", _geocode_for_filter, lat, lon, country_filter, province_filter)
+    if not _passes_filter(code, admin, country_filter, province_filter):
+        return None
+
+    wx, ns, soil = await asyncio.gather(
+        _limited(sems, "weatherapi", fetch_weather, lat, lon, date_iso),
+        _limited(sems, "nasa_power", fetch_nasa, lat, lon, date_iso),
+        _limited(sems, "soilgrids", fetch_soil, lat, lon),
+    )
+    return _make_sample(lat, lon, date_iso, plant, admin, wx, ns, soil)
+
+
+def _parse_row(row):
+    """CSV satırını (lat, lon, date_iso, plant) olarak döndürür; geçersizse None."""
+    try:
+        lat = float(row["lat"])
+        lon = float(row["lon"])
+        date_iso = row["date_iso"]
+        plant = row.get("plant", "Buğday")
+    except (ValueError, TypeError):
+        print(f"Geçersiz satır atlandı (lat/lon/date): {row}")
+        return None
+
+    try:
+        # NASA ve SoilGrids için tarih formatı hala gerekli
+        datetime.date.fromisoformat(date_iso)
+    except Exception:
+        print(f"Geçersiz tarih formatı atlandı: {date_iso}")
+        return None
+    return lat, lon, date_iso, plant
+
+
+async def main_async(grid_path, out_path, country_filter="TR", province_filter=None,
+                     max_in_flight=MAX_IN_FLIGHT, concurrency=None):
+    """
+    Async toplama modu: MAX_IN_FLIGHT kadar grid noktası aynı anda işlenir,
+    her sağlayıcı kendi eşzamanlılık limitiyle sınırlanır. Çıktı formatı main() ile aynıdır
+    (satır sırası girdiyle aynı olmak zorunda değildir). Kontrol noktası main() ile ortaktır.
+    """
+    concurrency = concurrency or PROVIDER_CONCURRENCY
+    sems = {name: asyncio.Semaphore(n) for name, n in concurrency.items()}
+
+    # asyncio.to_thread varsayılan executor'ı kullanır; tüm sağlayıcılar dolu çalışabilsin diye büyütüyoruz
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=sum(concurrency.values())))
+
+    queue = asyncio.Queue(maxsize=max_in_flight * 2)
+    stats = {"written": 0, "skipped_filter": 0, "skipped_boundary": 0, "geocode_failed": 0,
+             "total": 0, "resumed": 0}
+
+    async def worker(cp):
+        while True:
+            item = await queue.get()
+            if item is None:
+                queue.task_done()
+                return
+            key, (lat, lon, date_iso, plant) = item
+            try:
+                sample = await harvest_point_async(
+                    lat, lon, date_iso, plant, sems,
+                    country_filter=country_filter,
+                    province_filter=province_filter,
+                )
+                if not sample:
+                    stats["skipped_filter"] += 1
+                    cp.ekle(key)
+                else:
+                    ex = {"input": build_input(sample), "output": build_comment(sample)}
+                    if depo:
+                        depo.ekle(key, sample)
+                    # Tek event loop thread'i yazdığı için satırlar birbirine karışmaz
+                    cp.ekle(key, ex)
+                    stats["written"] += 1
+                    print(f"[{stats['written']}] {lat:.3f},{lon:.3f}  ✔ ({sample.get('admin_area')})")
+            except GeocodeHatasi as ge:
+                # Günlüğe yazılmaz: bir sonraki çalıştırmada tekrar denenir
+                stats["geocode_failed"] += 1
+                print(f"Atlandı (tekrar denenecek): {ge}")
+            except ValueError as ve:
+                print(f"Atlandı (ValueError): {ve}")
+            except requests.HTTPError as he:
+                print(f"Hata: HTTP error: {he}")
+            except Exception as e:
+                print(f"Hata: {e}")
+            finally:
+                queue.task_done()
+
+    depo = _gozlem_deposu()
+    eslikciler = [depo] if depo else []
+    with grid_path.open("r", encoding="utf-8") as f, KontrolNoktasi(out_path, CHECKPOINT_BATCH, eslikciler) as cp:
+        workers = [asyncio.create_task(worker(cp)) for _ in range(max_in_flight)]
+        for row in csv.DictReader(f):
+            stats["total"] += 1
+            item = _parse_row(row)
+            if item is None:
+                continue
+            if _outside_province(item[0], item[1], province_filter):
+                stats["skipped_boundary"] += 1
+                continue
+            key = satir_anahtari(*item)
+            if cp.tamamlandi(key):
+                stats["resumed"] += 1
+                continue
+            await queue.put((key, item))
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    if depo:
+        depo.kapat()
+
+    return stats
+
+
+def _gozlem_deposu():
+    """Ham gözlem deposu (OBSERVATION_STORE_DIR boşsa None)."""
+    return GozlemDeposu(OBSERVATION_STORE_DIR) if OBSERVATION_STORE_DIR else None
+
+
+def _print_counters():
+    print("Sağlayıcı sayaçları:")
+    hiz_limiti.ozet_yazdir()
+    if _geo_cache is not None:
+        print(f"  geocode önbelleği: isabet={_geo_cache.isabet} ıskalama={_geo_cache.iskalama}")
+    if _soil_raster is not None:
+        _soil_raster.flush()
+        print(f"  toprak raster doluluk: %{_soil_raster.dolu_oran() * 100:.1f}")
 
 
 def main():
@@ -399,9 +689,10 @@ def main():
     GRID_FILE = "grid_urfa.csv"  # Girdi CSV dosyanızın adı
     OUT_FILE = "dataset_urfa.jsonl"  # Çıktı JSONL dosyanızın adı
     # MAX_RECORDS = 10000          # Maksimum kaç kayıt çekilecek (LİMİT KALDIRILDI)
-    RATE_LIMIT_PER_SEC = 8.0  # Saniyedeki istek limiti
+    # Hız limitleri sağlayıcı bazında hiz_limiti.VARSAYILAN_LIMITLER'de (RATE_LIMIT_<SAGLAYICI> ile ezilebilir)
     COUNTRY_FILTER = "TR"  # Ülke filtresi
     PROVINCE_TO_FILTER = "Şanlıurfa"  # İl filtresi
+    ASYNC_MODE = False  # True: çok sayıda nokta aynı anda (PROVIDER_CONCURRENCY / MAX_IN_FLIGHT)
     # --- Ayarlar sonu ---
 
     # ap = argparse.ArgumentParser()
@@ -423,11 +714,13 @@ def main():
     out_path = Path(OUT_FILE)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    delay = 1.0 / max(RATE_LIMIT_PER_SEC, 0.1)
     written = 0
     # skipped_future = 0 # 'current.json' kullanıldığı için bu kontrole gerek kalmadı
     skipped_filter = 0
+    skipped_boundary = 0  # İl poligonu dışında kalan (API'ye hiç gitmeyen) satırlar
+    geocode_failed = 0  # Geocode yapılamayan (günlüğe yazılmayan, sonra tekrar denenecek) satırlar
     total = 0
+    resumed = 0  # Önceki çalışmada işlenmiş (kontrol noktasından atlanan) satırlar
 
     print(f"Başlatılıyor. BASE APIs: WeatherAPI (current.json), OpenCage, NASA POWER, SoilGrids")
     print(f"!!! ÖNEMLİ: Sadece '{PROVINCE_TO_FILTER}' ili için veri çekilecek.")
@@ -435,7 +728,24 @@ def main():
     print(f"Girdi: {grid_path.resolve()}")
     print(f"Çıktı: {out_path.resolve()}")
 
-    with grid_path.open("r", encoding="utf-8") as f, out_path.open("w", encoding="utf-8") as w:
+    if ASYNC_MODE:
+        print(f"Async mod: {MAX_IN_FLIGHT} nokta aynı anda, limitler: {PROVIDER_CONCURRENCY}")
+        stats = asyncio.run(main_async(grid_path, out_path, COUNTRY_FILTER, PROVINCE_TO_FILTER))
+        print(f"\nTamamlandı. Toplam yazılan: {stats['written']}. Atlanan (filtre): {stats['skipped_filter']}. "
+              f"Atlanan (il sınırı, API'siz): {stats['skipped_boundary']}. "
+              f"Geocode hatası (tekrar denenecek): {stats['geocode_failed']}. "
+              f"Önceden işlenmiş: {stats['resumed']}. İşlenen satır: {stats['total']}")
+        _print_counters()
+        print(f"Çıktı: {out_path.resolve()}")
+        return
+
+    # Kontrol noktası: çıktı "w" ile ezilmez; <çıktı>.keys günlüğündeki noktalar atlanır.
+    # Ham gözlemler her batch'te günlükten önce gözlem deposuna yazılır.
+    depo = _gozlem_deposu()
+    eslikciler = [depo] if depo else []
+    with grid_path.open("r", encoding="utf-8") as f, KontrolNoktasi(out_path, CHECKPOINT_BATCH, eslikciler) as cp:
+        if cp.satir_sayisi:
+            print(f"Kaldığı yerden devam: çıktıda {cp.satir_sayisi} satır, {len(cp.tamamlananlar)} işlenmiş nokta var.")
         rdr = csv.DictReader(f)
         for row in rdr:
             # if written >= MAX_RECORDS: # LİMİT KALDIRILDI
@@ -443,30 +753,17 @@ def main():
             #     break
             total += 1
 
-            try:
-                lat = float(row["lat"])
-                lon = float(row["lon"])
-                date_iso = row["date_iso"]
-                plant = row.get("plant", "Buğday")
-            except (ValueError, TypeError):
-                print(f"Geçersiz satır atlandı (lat/lon/date): {row}")
+            item = _parse_row(row)
+            if item is None:
                 continue
-
-            # Tarih kontrol: Weather için future>14 atla (current.json'a geçildiği için kaldırıldı)
-            try:
-                # NASA ve SoilGrids için tarih formatı hala gerekli
-                tgt = datetime.date.fromisoformat(date_iso)
-            except Exception:
-                print(f"Geçersiz tarih formatı atlandı: {date_iso}")
+            lat, lon, date_iso, plant = item
+            if _outside_province(lat, lon, PROVINCE_TO_FILTER):
+                skipped_boundary += 1
+                continue
+            key = satir_anahtari(lat, lon, date_iso, plant)
+            if cp.tamamlandi(key):
+                resumed += 1
                 continue
-
-            # delta = (tgt - datetime.date.today()).days
-            # if delta > 14:
-            #     skipped_future += 1
-            #     # log, bekleme, devam
-            #     # print(f"Atlandı (future>14): {date_iso} {lat:.3f},{lon:.3f}")
-            #     time.sleep(delay) # Rate limit'i korumak için yine de bekle
-            #     continue
 
             try:
                 # --- 'province_filter' parametresi eklendi ---
@@ -480,13 +777,19 @@ def main():
                     # Bu atlama artık hem ülke (TR) hem de il (Şanlıurfa) filtresini içerir
                     # print(f"Atlandı (geocoding filtresi veya hata): {lat:.3f},{lon:.3f}")
                     skipped_filter += 1
-                    time.sleep(delay)
+                    cp.ekle(key)
                     continue
 
                 ex = {"input": build_input(sample), "output": build_comment(sample)}
-                w.write(json.dumps(ex, ensure_ascii=False) + "\n")
+                if depo:
+                    depo.ekle(key, sample)
+                cp.ekle(key, ex)
                 written += 1
                 print(f"[{written}] {lat:.3f},{lon:.3f}  ✔ ({sample.get('admin_area')})")
+            except GeocodeHatasi as ge:
+                # Günlüğe yazılmaz: bir sonraki çalıştırmada tekrar denenir
+                geocode_failed += 1
+                print(f"Atlandı (tekrar denenecek): {ge}")
             except ValueError as ve:
                 # fetch_weather çekince future>14 raise edilirse buraa düşer (önceden engellendi ama güvenlik)
                 print(f"Atlandı (ValueError): {ve}")
@@ -495,9 +798,14 @@ def main():
             except Exception as e:
                 print(f"Hata: {e}")
 
-            time.sleep(delay)
+    if depo:
+        depo.kapat()
 
-    print(f"\nTamamlandı. Toplam yazılan: {written}. Atlanan (filtre): {skipped_filter}. İşlenen satır: {total}")
+    print(f"\nTamamlandı. Toplam yazılan: {written}. Atlanan (filtre): {skipped_filter}. "
+          f"Atlanan (il sınırı, API'siz): {skipped_boundary}. "
+          f"Geocode hatası (tekrar denenecek): {geocode_failed}. "
+          f"Önceden işlenmiş: {resumed}. İşlenen satır: {total}")
+    _print_counters()
     print(f"Çıktı: {out_path.resolve()}")
 
 
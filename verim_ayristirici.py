@@ -0,0 +1,114 @@
+"""
+verim_ayristirici.py — TÜİK verim tablolarının (verimler.xls) vektörel ayrıştırıcısı.
+
+iterrows() + hücre başına float() denemesi yerine:
+  - "Kg/Dekar" başlık satırları sütun bazlı string işlemleriyle bulunur,
+  - ürün adı başlık satırından çıkarılıp aşağı doğru ileri doldurulur (ffill),
+  - yıl / verim çiftleri NumPy dizileri üzerinde maskelerle seçilir.
+Sonuç düzenli (urun, yil, verim) tablosudur; il/ilçe bazlı büyük tablolarda da
+satır sayısıyla doğrusal ve Python döngüsüz çalışır.
+"""
+
+import numpy as np
+import pandas as pd
+
+BASLIK_ISARETI = "Kg/Dekar"
+
+
+def _satir_metni(df):
+    """Her satırın hücrelerini boşlukla birleştirir (sütun sayısı kadar vektörel işlem)."""
+    metin = None
+    for c in df.columns:
+        # pandas 3'te astype(str) NaN'ı korur; eski str(x) davranışı için "nan"
+        sutun = df[c].astype(str).fillna("nan").str.strip()
+        metin = sutun if metin is None else metin + " " + sutun
+    return metin
+
+
+def _urun_adlari(metin):
+    """Başlık satırlarında ürün adı, diğer satırlarda NaN."""
+    baslik = metin.str.contains(BASLIK_ISARETI, regex=False)
+    # "Verim ve 01.11.20.00.00. (Mısır) - Kg/Dekar" -> "Mısır"; "(Arpa (Biralık)" -> "Arpa"
+    parantez = metin.str.extract(r"\((.*?)\)", expand=False).str.split("(").str[0].str.strip()
+    yedek = metin.str.split("-").str[0].str.strip().str[:30]
+    ad = parantez.where(parantez.notna(), yedek)
+    return ad.where(baslik)
+
+
+def _yil_verim(df):
+    """Satır başına (yıl, verim) dizileri; bulunamayanlar 0."""
+    sayisal = np.column_stack([
+        pd.to_numeric(df[c].astype(str).str.strip(), errors="coerce").to_numpy(dtype=float)
+        for c in df.columns
+    ])
+    with np.errstate(invalid="ignore"):
+        yil_mi = (sayisal > 2010) & (sayisal < 2030) & (sayisal == np.floor(sayisal))
+        verim_mi = (sayisal > 0) & ~yil_mi
+
+    # Satırdaki son eşleşen hücre (eski döngü sonrakini öncekinin üzerine yazıyordu)
+    m = sayisal.shape[1]
+    son_yil = m - 1 - np.argmax(yil_mi[:, ::-1], axis=1)
+    son_verim = m - 1 - np.argmax(verim_mi[:, ::-1], axis=1)
+    satir = np.arange(sayisal.shape[0])
+    yil = np.where(yil_mi.any(axis=1), sayisal[satir, son_yil], 0).astype(int)
+    verim = np.where(verim_mi.any(axis=1), sayisal[satir, son_verim], 0.0)
+    return yil, verim
+
+
+def verim_tablosu_ayristir(verim_df):
+    """
+    Başlıksız okunmuş verim tablosu -> (urunler, tablo)
+      urunler: başlık satırlarındaki ürün adları (sırayla, tekrarsız)
+      tablo: urun, yil, verim sütunlu DataFrame (satır sırası korunur)
+    """
+    if verim_df.empty:
+        return [], pd.DataFrame({"urun": [], "yil": [], "verim": []})
+    ad = _urun_adlari(_satir_metni(verim_df))
+    urunler = [u for u in pd.unique(ad.dropna()) if u]
+    yil, verim = _yil_verim(verim_df)
+
+    urun = ad.ffill()
+    gecerli = urun.notna().to_numpy() & (urun != "").to_numpy() & (yil != 0) & (verim != 0)
+    tablo = pd.DataFrame({
+        "urun": urun.to_numpy()[gecerli],
+        "yil": yil[gecerli],
+        "verim": verim[gecerli],
+    })
+    return urunler, tablo
+
+
+def verim_sozlugu(urunler, tablo):
+    """Düzenli tablodan {urun: {yil: verim}} (aynı yıl tekrar ederse sonuncusu geçerli)."""
+    sonuc = {u: {} for u in urunler}
+    for u, yil, verim in zip(tablo["urun"].tolist(), tablo["yil"].tolist(), tablo["verim"].tolist()):
+        sonuc.setdefault(u, {})[yil] = verim
+    return sonuc
+
+
+def baslik_ortalamalari(verim_df, ad_sutunu=1, ilk_deger_sutunu=2):
+    """
+    tarim_kutuphanesi biçimi: ad sütununda "Kg/Dekar" geçen satırların, sonraki sütunlardaki
+    pozitif sayısal değerlerinin tamsayı ortalaması -> {urun: ortalama}
+    """
+    ad_metni = verim_df.iloc[:, ad_sutunu].astype(str).fillna("nan")
+    baslik = ad_metni.str.contains(BASLIK_ISARETI, regex=False)
+    ad = ad_metni.str.extract(r"\((.*?)\)", expand=False).str.split("(").str[0].str.strip()
+    secili = (baslik & ad.notna()).to_numpy()
+    if not secili.any():
+        return {}
+
+    degerler = verim_df.iloc[secili, ilk_deger_sutunu:]
+    sayisal = np.column_stack([
+        pd.to_numeric(degerler[c].astype(str).str.replace(",", ".", regex=False), errors="coerce").to_numpy(dtype=float)
+        for c in degerler.columns
+    ]) if degerler.shape[1] else np.empty((int(secili.sum()), 0))
+    with np.errstate(invalid="ignore"):
+        pozitif = sayisal > 0
+    adet = pozitif.sum(axis=1)
+    toplam = np.where(pozitif, sayisal, 0.0).sum(axis=1)
+
+    sonuc = {}
+    for u, n, t in zip(ad.to_numpy()[secili], adet, toplam):
+        if n:
+            sonuc[u] = int(t / n)
+    return sonuc